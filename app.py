@@ -4,7 +4,9 @@ from controllers.auth_controller import auth_bp
 from controllers.mahasiswa_controller import mahasiswa_bp
 from controllers.dosen_controller import dosen_bp
 from controllers.akademik_controller import akademik_bp
+from controllers.metrics_controller import metrics_bp
 from extensions import db
+from services.model_loader import preload as preload_model
 
 DEFAULT_DB_URL = (
     "postgresql+psycopg://postgres:postgres@"
@@ -30,6 +32,11 @@ def create_app():
     app.register_blueprint(mahasiswa_bp)
     app.register_blueprint(dosen_bp)
     app.register_blueprint(akademik_bp)
+    app.register_blueprint(metrics_bp)
+
+    # model dimuat saat prediksi pertama; MODEL_PRELOAD=1 untuk eager load
+    if os.environ.get("MODEL_PRELOAD") == "1":
+        preload_model()
 
     return app
 
@@ -2,19 +2,33 @@ from flask import Blueprint, render_template, redirect, url_for, session, send_f
 import os
 
 from models.prediction_repository import (
-    load_predictions,
+    PAGE_SIZE,
+    filters_from_args,
+    iter_predictions,
+    page_start,
+    query_predictions,
+    save_predictions_bulk,
     delete_all_predictions,
     delete_predictions_by_nim,
     delete_prediction_by_id,
 )
 
-from services.report_service import export_excel, export_pdf
+from services.report_service import export_excel_stream, export_pdf
+from services.risk_summary import RISK_LEVELS, summarize, summarize_by
+from services.prediction_service import predict_many
 from services.auth_service import create_user, get_user_by_username
 from models.db_models import User, Student
+from models.schemas import CSV_COLUMNS
 from extensions import db
 
 akademik_bp = Blueprint("akademik", __name__, url_prefix="/dashboard/akademik")
 
+# kolom yang ditampilkan tabel dashboard
+DASHBOARD_COLUMNS = [
+    "record_id", "nama_mahasiswa", "nim", "prodi", "angkatan", "ipk", "sks_lulus",
+    "presensi", "mengulang", "probability", "risk", "timestamp",
+]
+
 
 # ----------------------------
 # List pages for akademik
@@ -147,10 +161,24 @@ def dashboard():
     if session.get("role") != "akademik":
         return redirect(url_for("auth.login"))
 
-    data = load_predictions()
-    # sort newest first
-    data = sorted(data, key=lambda x: str(x.get("timestamp", "")), reverse=True)
-    return render_template("dashboard_akademik.html", data=data)
+    try:
+        filters = filters_from_args(request.args)
+        start = page_start(request.args)
+        page = query_predictions(filters, columns=DASHBOARD_COLUMNS, after=request.args.get("after"))
+    except ValueError as e:
+        return str(e), 400
+
+    # newest first (the latest predictions are what staff look for), one
+    # page at a time; the cards count every matching row
+    return render_template(
+        "dashboard_akademik.html",
+        data=page["rows"],
+        next_cursor=page["next_cursor"],
+        start=start,
+        next_start=start + len(page["rows"]),
+        filters=filters,
+        summary=summarize(filters),
+    )
 
 
 @akademik_bp.route('/dosen/add', methods=['GET', 'POST'])
@@ -259,14 +287,74 @@ def risk_summary():
     if session.get("role") != "akademik":
         return jsonify({"labels": [], "values": []})
 
-    rows = load_predictions()
-    low = sum(1 for r in rows if r.get("risk") == "Low Risk")
-    med = sum(1 for r in rows if r.get("risk") == "Medium Risk")
-    high = sum(1 for r in rows if r.get("risk") == "High Risk")
+    # filters as /api/predictions; ?group_by=fakultas,kelas&bucket=month adds per-group summaries;
+    # ?current=1 counts each student once, by their latest prediction
+    group_by = [g.strip() for g in (request.args.get("group_by") or "").split(",") if g.strip()]
+    bucket = (request.args.get("bucket") or "").strip() or None
+    current = request.args.get("current") == "1"
+    try:
+        filters = filters_from_args(request.args)
+        summary = summarize(filters, latest_only=current)
+        groups = (
+            summarize_by(filters, group_by=group_by, bucket=bucket, latest_only=current)
+            if group_by or bucket else None
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    labels = [label for _, label in RISK_LEVELS]
+    body = {
+        "labels": labels,
+        "values": [summary[key] for key, _ in RISK_LEVELS],
+        "percentages": [summary[f"{key}_pct"] for key, _ in RISK_LEVELS],
+        "total": summary["total"],
+    }
+    if groups is not None:
+        body["groups"] = groups
+    return jsonify(body)
+
+
+@akademik_bp.route("/api/predictions", endpoint="predictions_api")
+def predictions_api():
+    # ?nim=&username=&kelas=&prodi=&risk=&date_from=&date_to=&fields=a,b&limit=&after=
+    if session.get("role") != "akademik":
+        return jsonify({"error": "unauthorized"}), 403
+
+    fields = [f.strip() for f in (request.args.get("fields") or "").split(",") if f.strip()] or None
+    try:
+        page = query_predictions(
+            filters_from_args(request.args),
+            columns=fields,
+            after=request.args.get("after"),
+            limit=request.args.get("limit", PAGE_SIZE, type=int),
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({"count": len(page["rows"]), "rows": page["rows"], "next_cursor": page["next_cursor"]})
+
+
+@akademik_bp.route("/api/predict-batch", methods=["POST"], endpoint="predict_batch")
+def predict_batch():
+    if session.get("role") != "akademik":
+        return jsonify({"error": "unauthorized"}), 403
+
+    payload = request.get_json(silent=True) or {}
+    records = payload.get("records") or []
+    if not isinstance(records, list):
+        return jsonify({"error": "records harus berupa list"}), 400
+    bad = [i for i, r in enumerate(records) if not isinstance(r, dict)]
+    if bad:
+        return jsonify({"error": "setiap record harus berupa object", "index": bad}), 400
+
+    try:
+        results = predict_many(records, explain=bool(payload.get("explain")))
+    except (ValueError, TypeError) as e:
+        return jsonify({"error": str(e)}), 400
 
-    labels = ["Low Risk", "Medium Risk", "High Risk"]
-    values = [low, med, high]
-    return jsonify({"labels": labels, "values": values})
+    if payload.get("save"):
+        save_predictions_bulk(results)
+
+    return jsonify({"count": len(results), "results": results})
 
 
 # ----------------------------
@@ -418,19 +506,10 @@ def detail_mahasiswa(nim):
     if session.get("role") not in ["akademik"]:
         return redirect(url_for("auth.login"))
 
-    nim = str(nim).strip().replace(".0", "")
-    rows = load_predictions()
-
-    history = []
-    for r in rows:
-        rn = str(r.get("nim", "")).strip().replace(".0", "")
-        if rn == nim:
-            history.append(r)
-
+    history = query_predictions({"nim": nim}, limit=None, newest_first=False)["rows"]
     if not history:
         return "Data mahasiswa tidak ditemukan", 404
 
-    history = sorted(history, key=lambda x: str(x.get("timestamp", "")))
     profile = history[0]
 
     # try to find student in DB to show advisor info
@@ -442,6 +521,11 @@ def detail_mahasiswa(nim):
     return render_template("detail_mahasiswa.html", profile=profile, history=history, back_url=url_for("akademik.dashboard"), advisor=advisor)
 
 
+def _latest_high_risk(filters: dict):
+    # students whose latest prediction is High Risk
+    return query_predictions({**filters, "risk": "High Risk"}, limit=None, latest_only=True)["rows"]
+
+
 @akademik_bp.route("/export/excel", endpoint="export_excel_route")
 def export_excel_route():
     if session.get("role") != "akademik":
@@ -449,8 +533,13 @@ def export_excel_route():
 
     os.makedirs("reports", exist_ok=True)
     path = "reports/laporan.xlsx"
-    rows = load_predictions()
-    export_excel(rows, path)
+    try:
+        filters = filters_from_args(request.args)
+        summary, high = summarize(filters), _latest_high_risk(filters)
+    except ValueError as e:
+        return str(e), 400
+    # AllData is streamed: memory stays at one chunk of rows
+    export_excel_stream(iter_predictions(filters, columns=CSV_COLUMNS), CSV_COLUMNS, path, summary, high)
     return send_file(path, as_attachment=True)
 
 
@@ -461,8 +550,12 @@ def export_pdf_route():
 
     os.makedirs("reports", exist_ok=True)
     path = "reports/laporan.pdf"
-    rows = load_predictions()
-    export_pdf(rows, path)
+    try:
+        filters = filters_from_args(request.args)
+        summary, high = summarize(filters), _latest_high_risk(filters)
+    except ValueError as e:
+        return str(e), 400
+    export_pdf(None, path, latest_high_risk=high, summary=summary)
     return send_file(path, as_attachment=True)
 
 
@@ -1,7 +1,12 @@
-from flask import Blueprint, render_template, redirect, url_for, session, request
+from flask import Blueprint, render_template, redirect, url_for, session, request, jsonify
 from services.auth_service import get_user_by_username
+from services.simulation_service import simulate, base_from_prediction
 from models.db_models import ClassModel, Student, User, Kelas, Fakultas
-from models.prediction_repository import load_predictions
+from models.prediction_repository import page_start, query_predictions, load_latest_prediction
+from services.risk_summary import empty_summary, summarize
+
+# kolom yang ditampilkan tabel dashboard
+DASHBOARD_COLUMNS = ["nama_mahasiswa", "nim", "kelas", "probability", "risk", "timestamp"]
 
 dosen_bp = Blueprint("dosen", __name__, url_prefix="/dashboard/dosen")
 
@@ -35,9 +40,11 @@ def dashboard():
             data=[],
             fakultas_list=[],
             kelas_list=[],
-            summary=_empty_summary(),
+            summary=empty_summary(),
             selected_fakultas="",
             selected_kelas="",
+            next_cursor=None,
+            start=0,
         )
 
     # ======================
@@ -101,62 +108,59 @@ def dashboard():
     }
 
     # ======================
-    # LOAD & FILTER PREDIKSI
+    # PREDIKSI (FILTER DI DB, SATU HALAMAN, TERBARU DULU)
     # ======================
-    rows = [
-        r for r in load_predictions()
-        if str(r.get("nim", "")).strip().replace(".0", "") in nims
-    ]
+    filters = {"nim": nims}
+    try:
+        start = page_start(request.args)
+        page = query_predictions(filters, columns=DASHBOARD_COLUMNS, after=request.args.get("after"))
+    except ValueError as e:
+        return str(e), 400
 
     # ======================
-    # SUMMARY
+    # SUMMARY (SEMUA BARIS YANG COCOK, GROUP BY DI DB)
     # ======================
-    summary = _build_summary(rows)
-
-    # ======================
-    # SORT TERBARU
-    # ======================
-    rows = sorted(
-        rows,
-        key=lambda x: str(x.get("timestamp", "")),
-        reverse=True
-    )
+    summary = summarize(filters)
 
     return render_template(
         "dashboard_dosen.html",
-        data=rows,
+        data=page["rows"],
         fakultas_list=fakultas_list,
         kelas_list=kelas_list,
         summary=summary,
         selected_fakultas=selected_fakultas,
         selected_kelas=selected_kelas,
+        next_cursor=page["next_cursor"],
+        start=start,
+        next_start=start + len(page["rows"]),
     )
 
 
-# ======================
-# HELPER FUNCTIONS
-# ======================
-def _empty_summary():
-    return {
-        "total": 0,
-        "low": 0, "low_pct": 0,
-        "med": 0, "med_pct": 0,
-        "high": 0, "high_pct": 0,
-    }
-
-
-def _build_summary(rows):
-    total = len(rows)
-    low = sum(1 for r in rows if r.get("risk") == "Low Risk")
-    med = sum(1 for r in rows if r.get("risk") == "Medium Risk")
-    high = sum(1 for r in rows if r.get("risk") == "High Risk")
-
-    def pct(x):
-        return round((x / total) * 100, 1) if total else 0
+@dosen_bp.route("/api/simulate", methods=["POST"], endpoint="simulate")
+def simulate_api():
+    # read-only what-if untuk mahasiswa di kelas / bimbingan dosen
+    if session.get("role") != "dosen":
+        return jsonify({"error": "unauthorized"}), 403
 
-    return {
-        "total": total,
-        "low": low, "low_pct": pct(low),
-        "med": med, "med_pct": pct(med),
-        "high": high, "high_pct": pct(high),
-    }
+    dosen = get_user_by_username(session.get("user"))
+    if not dosen:
+        return jsonify({"error": "unauthorized"}), 403
+
+    payload = request.get_json(silent=True) or {}
+    nim = str(payload.get("nim") or "").strip().replace(".0", "")
+    if not nim:
+        return jsonify({"error": "nim wajib diisi"}), 400
+
+    student = Student.query.filter(Student.nim == nim).first()
+    class_codes = [c.code for c in ClassModel.query.filter(ClassModel.dosen_id == dosen.id).all()]
+    if not student or (student.advisor_id != dosen.id and student.kelas_code not in class_codes):
+        return jsonify({"error": "mahasiswa tidak ditemukan"}), 404
+
+    latest = load_latest_prediction(nim=nim)
+    base = {**base_from_prediction(latest), **(payload.get("base") or {})}
+    try:
+        result = simulate(base, payload.get("sweeps") or [], profile=latest)
+    except (ValueError, TypeError) as e:
+        return jsonify({"error": str(e)}), 400
+    result["nim"] = nim
+    return jsonify(result)
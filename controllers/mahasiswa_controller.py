@@ -1,7 +1,9 @@
-from flask import Blueprint, render_template, request, redirect, url_for, session
+from flask import Blueprint, render_template, request, redirect, url_for, session, jsonify
 from services.auth_service import get_student_profile_by_username
+from services.metrics import span
 from services.prediction_service import predict_for_user
-from models.prediction_repository import save_prediction, load_predictions
+from services.simulation_service import simulate, base_from_prediction
+from models.prediction_repository import save_prediction, query_predictions, load_latest_prediction
 
 mahasiswa_bp = Blueprint("mahasiswa", __name__, url_prefix="/dashboard/mahasiswa")
 
@@ -15,9 +17,7 @@ def dashboard():
     profile = get_student_profile_by_username(username)
 
     # Riwayat hanya milik mahasiswa login
-    all_rows = load_predictions()
-    history = [r for r in all_rows if str(r.get("username", "")).strip() == username]
-    history = sorted(history, key=lambda x: str(x.get("timestamp","")))
+    history = query_predictions({"username": username}, limit=None, newest_first=False)["rows"]
 
     return render_template("dashboard_mahasiswa.html", profile=profile, history=history)
 
@@ -35,8 +35,31 @@ def predict():
         mengulang=request.form.get("mengulang", 0),
         presensi=request.form.get("presensi", 0),
         sks_lulus=request.form.get("sks_lulus", 0),
+        # tree-path explanation only on request (?explain=1 or the form checkbox)
+        explain=(request.args.get("explain") or request.form.get("explain")) == "1",
     )
 
     save_prediction(result)
-    session["result"] = result
-    return redirect(url_for("mahasiswa.dashboard"))
+    with span("predict.redirect"):
+        session["result"] = result
+        response = redirect(url_for("mahasiswa.dashboard"))
+    return response
+
+
+@mahasiswa_bp.route("/api/simulate", methods=["POST"], endpoint="simulate")
+def simulate_api():
+    # read-only: tidak menyimpan Prediction
+    if session.get("role") != "mahasiswa":
+        return jsonify({"error": "unauthorized"}), 403
+
+    username = (session.get("user") or "").strip()
+    payload = request.get_json(silent=True) or {}
+
+    # nilai dasar: prediksi terakhir mahasiswa, bisa ditimpa dari payload
+    latest = load_latest_prediction(username=username)
+    base = {**base_from_prediction(latest), **(payload.get("base") or {})}
+    try:
+        result = simulate(base, payload.get("sweeps") or [], profile=latest)
+    except (ValueError, TypeError) as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(result)
@@ -0,0 +1,79 @@
+import logging
+import time
+
+from flask import Blueprint, jsonify, request, g, abort
+
+from services import metrics
+from services.metrics import PREDICTION_SLOW_LOG_MS
+from services.model_loader import get_bundle, is_loaded
+
+metrics_bp = Blueprint("metrics", __name__, url_prefix="/metrics")
+
+log = logging.getLogger("prediction.slow")
+
+LOCAL_ADDRS = {"127.0.0.1", "::1", "localhost"}
+
+
+# ======================
+# REQUEST TIMING (SEMUA ROUTE)
+# ======================
+@metrics_bp.before_app_request
+def _start_request_timer():
+    g._metrics_start = time.perf_counter_ns()
+    g._metrics_trace = metrics.begin_trace()
+
+
+@metrics_bp.teardown_app_request
+def _finish_request_timer(exc=None):
+    start = g.pop("_metrics_start", None)
+    token = g.pop("_metrics_trace", None)
+    if start is None or token is None:
+        return
+    total_ns = time.perf_counter_ns() - start
+    stages = metrics.end_trace(token)
+
+    endpoint = request.endpoint or "unknown"
+    metrics.record(f"request.{endpoint}", total_ns)
+
+    if PREDICTION_SLOW_LOG_MS is not None and total_ns >= PREDICTION_SLOW_LOG_MS * 1e6:
+        staged = sum(ns for _, ns in stages)
+        breakdown = " ".join(f"{name}={ns / 1e6:.2f}ms" for name, ns in stages)
+        log.warning(
+            "slow request %s %s %.2fms: %s other=%.2fms",
+            request.method, request.path, total_ns / 1e6, breakdown, (total_ns - staged) / 1e6,
+        )
+
+
+# ======================
+# ENDPOINT (LOCAL ONLY)
+# ======================
+@metrics_bp.route("/latency", endpoint="latency")
+def latency():
+    # hanya dari mesin lokal (tidak lewat proxy publik)
+    if request.remote_addr not in LOCAL_ADDRS or request.headers.get("X-Forwarded-For"):
+        abort(404)
+
+    from services.batching import PREDICTION_BATCHING
+    from services.inference_pool import inference_pool
+    from services.prediction_cache import prediction_cache
+    from services.prediction_service import batcher
+
+    model = None
+    if is_loaded():
+        bundle = get_bundle()
+        model = {
+            "version": bundle.version,
+            "path": bundle.path,
+            "engine": bundle.engine is not None,
+            "grid": bundle.grid is not None,
+            "load_seconds": round(bundle.load_seconds, 3),
+        }
+
+    return jsonify({
+        "histograms": metrics.snapshot(),
+        "slow_log_ms": PREDICTION_SLOW_LOG_MS,
+        "model": model,
+        "prediction_cache": prediction_cache.stats(),
+        "batcher": batcher.stats() if PREDICTION_BATCHING else None,
+        "inference_pool": inference_pool.stats(),
+    })
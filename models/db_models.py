@@ -103,7 +103,7 @@ class Prediction(db.Model):
     __tablename__ = "predictions"
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     user_id = db.Column(db.Integer, db.ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
-    username = db.Column(db.String(50))
+    username = db.Column(db.String(50), index=True)
 
     nama_mahasiswa = db.Column(db.String(255))
     nim = db.Column(db.String(50), index=True)
@@ -119,11 +119,37 @@ class Prediction(db.Model):
     probability = db.Column(db.Numeric(5, 2))
     risk = db.Column(db.String(20), index=True)
     recommendation = db.Column(db.Text)
+    model_version = db.Column(db.String(64), index=True)
 
     timestamp = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     user = db.relationship("User", backref=db.backref("predictions", lazy=True))
 
+    # newest row per student (latest_predictions refresh, sql/add_predictions_nim_timestamp_index.sql);
+    # keyset pages of query_predictions (sql/add_predictions_query_indexes.sql)
+    __table_args__ = (
+        db.Index("ix_predictions_nim_timestamp", "nim", timestamp.desc()),
+        db.Index("ix_predictions_timestamp_id", "timestamp", "id"),
+    )
+
     def __repr__(self):
         return f"<Prediction {self.id} {self.nim} {self.probability}%>"
+
+
+class LatestPrediction(db.Model):
+    """Newest prediction per student (normalized nim), kept in step with
+    predictions by models/prediction_repository in the same transaction
+    as every insert and delete (backfill: scripts/backfill_latest_predictions.py)."""
+    __tablename__ = "latest_predictions"
+    nim = db.Column(db.String(50), primary_key=True)
+    prediction_id = db.Column(db.String(36), db.ForeignKey("predictions.id", ondelete="CASCADE"), nullable=False)
+    username = db.Column(db.String(50), index=True)
+    risk = db.Column(db.String(20), index=True)
+    probability = db.Column(db.Numeric(5, 2))
+    timestamp = db.Column(db.DateTime)
+
+    prediction = db.relationship("Prediction")
+
+    def __repr__(self):
+        return f"<LatestPrediction {self.nim} {self.risk}>"
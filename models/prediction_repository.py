@@ -1,6 +1,59 @@
+import base64
+import os
+import uuid
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import String, case, cast, delete, func, insert, or_, select, tuple_
+from sqlalchemy.orm import aliased
+
 from models.schemas import CSV_COLUMNS
 from extensions import db
-from models.db_models import Prediction
+from models.db_models import Prediction, LatestPrediction, Student, User, Kelas, Fakultas
+from services.metrics import span
+
+# dashboards show one page at a time; PREDICTION_PAGE_SIZE rows by default
+PAGE_SIZE = int(os.environ.get("PREDICTION_PAGE_SIZE", "50"))
+MAX_PAGE_SIZE = 1000
+
+# row key -> column, in the order of a full row
+ROW_COLUMNS = {
+    "record_id": Prediction.id,
+    "username": Prediction.username,
+    "nama_mahasiswa": Prediction.nama_mahasiswa,
+    "nim": Prediction.nim,
+    "prodi": Prediction.prodi,
+    "angkatan": Prediction.angkatan,
+    "kelas": Prediction.kelas,
+    "ipk": Prediction.ipk,
+    "mengulang": Prediction.mengulang,
+    "presensi": Prediction.presensi,
+    "sks_lulus": Prediction.sks_lulus,
+    "probability": Prediction.probability,
+    "risk": Prediction.risk,
+    "recommendation": Prediction.recommendation,
+    "model_version": Prediction.model_version,
+    "timestamp": Prediction.timestamp,
+}
+
+FILTER_KEYS = (
+    "nim", "username", "kelas", "prodi", "angkatan", "risk",
+    "fakultas", "advisor", "date_from", "date_to",
+)
+
+# rows per INSERT / COPY batch of save_predictions_bulk
+BULK_CHUNK_SIZE = int(os.environ.get("PREDICTION_BULK_CHUNK_SIZE", "5000"))
+
+# rows per fetch of iter_predictions (server-side cursor on Postgres)
+STREAM_CHUNK_SIZE = int(os.environ.get("PREDICTION_STREAM_CHUNK_SIZE", "5000"))
+
+# nims per statement when latest_predictions is refreshed for a set of students
+LATEST_REFRESH_CHUNK = 500
+
+# dimensions a risk count can be grouped by (count_by_risk)
+GROUP_KEYS = ("fakultas", "kelas", "prodi", "angkatan", "advisor")
+BUCKETS = ("day", "week", "month", "year")
 
 
 # -------------------------
@@ -29,53 +82,568 @@ def save_prediction(row: dict):
         probability=(None if row.get("probability") == "" else float(row.get("probability"))),
         risk=row.get("risk"),
         recommendation=row.get("recommendation"),
+        model_version=(row.get("model_version") or None),
     )
-    db.session.add(p)
-    db.session.commit()
+    with span("save.commit"):
+        db.session.add(p)
+        db.session.flush()
+        refresh_latest(db.session.connection(), [p.nim])
+        db.session.commit()
+
+
+# -------------------------
+# latest_predictions (newest row per nim)
+# -------------------------
+
+_LATEST_COLUMNS = ("nim", "prediction_id", "username", "risk", "probability", "timestamp")
+
+
+def _newest_per_nim(nims=None):
+    """SELECT of the newest prediction per nim (of ``nims``, or all), in
+    _LATEST_COLUMNS order."""
+    p = Prediction.__table__
+    rank = func.row_number().over(
+        partition_by=p.c.nim,
+        order_by=(p.c.timestamp.desc().nulls_last(), p.c.created_at.desc().nulls_last(), p.c.id.desc()),
+    )
+    ranked = select(p.c.nim, p.c.id, p.c.username, p.c.risk, p.c.probability, p.c.timestamp, rank.label("rn"))
+    ranked = ranked.where(p.c.nim.isnot(None), p.c.nim != "")
+    if nims is not None:
+        ranked = ranked.where(p.c.nim.in_(nims))
+    ranked = ranked.subquery()
+    return select(*[c for c in ranked.c if c.name != "rn"]).where(ranked.c.rn == 1)
+
+
+def refresh_latest(conn, nims=None):
+    """Recompute the latest_predictions rows of ``nims`` (every student
+    when None) from predictions, on ``conn`` and inside its transaction.
+    Each nim is one lookup on ix_predictions_nim_timestamp."""
+    latest = LatestPrediction.__table__
+    if nims is None:
+        conn.execute(delete(latest))
+        conn.execute(insert(latest).from_select(_LATEST_COLUMNS, _newest_per_nim()))
+        return
+    nims = sorted({_norm_nim(n) for n in nims if n is not None})
+    for start in range(0, len(nims), LATEST_REFRESH_CHUNK):
+        chunk = nims[start:start + LATEST_REFRESH_CHUNK]
+        conn.execute(delete(latest).where(latest.c.nim.in_(chunk)))
+        conn.execute(insert(latest).from_select(_LATEST_COLUMNS, _newest_per_nim(chunk)))
+
+
+def backfill_latest() -> int:
+    """Rebuild latest_predictions from the whole predictions table;
+    returns the number of students."""
+    try:
+        with span("latest.backfill"):
+            refresh_latest(db.session.connection())
+            db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return db.session.query(func.count(LatestPrediction.nim)).scalar()
+
+
+# -------------------------
+# Bulk insert
+# -------------------------
+
+_BULK_COLUMNS = (
+    "id", "username", "nama_mahasiswa", "nim", "prodi", "angkatan", "kelas",
+    "ipk", "mengulang", "presensi", "sks_lulus", "probability",
+    "risk", "recommendation", "model_version", "timestamp", "created_at",
+)
+
+
+def _numeric(s: pd.Series, integer: bool = False) -> pd.Series:
+    # "" / None -> NULL; anything else must parse, like save_prediction;
+    # integers truncate toward zero like its int()
+    values = pd.to_numeric(s.mask(s == ""), errors="raise")
+    return np.trunc(values.astype(float)).astype("Int64") if integer else values.astype(float)
+
+
+def _bulk_frame(rows: list[dict], keep_timestamp: bool = False) -> pd.DataFrame:
+    """Rows coerced column-wise to the Prediction column types, in
+    _BULK_COLUMNS order; missing values are None. New rows are stamped
+    with utcnow like Prediction.timestamp; ``keep_timestamp`` keeps the
+    row's own (stored, already UTC) timestamp instead."""
+    df = pd.DataFrame.from_records(rows, columns=CSV_COLUMNS)
+    now = datetime.utcnow()
+
+    out = pd.DataFrame({"id": [i if isinstance(i, str) and i else str(uuid.uuid4()) for i in df["record_id"]]})
+    for c in ("username", "nama_mahasiswa", "prodi", "angkatan", "kelas", "risk", "recommendation"):
+        out[c] = df[c].values
+    out["nim"] = df["nim"].fillna("").astype(str).str.strip().str.replace(".0", "", regex=False).values
+    out["ipk"] = _numeric(df["ipk"]).values
+    for c in ("mengulang", "presensi", "sks_lulus"):
+        out[c] = _numeric(df[c], integer=True).values
+    out["probability"] = _numeric(df["probability"]).values
+    out["model_version"] = df["model_version"].mask(df["model_version"] == "").values
+    if keep_timestamp:
+        out["timestamp"] = pd.to_datetime(df["timestamp"].mask(df["timestamp"] == ""), errors="coerce").fillna(now).values
+    else:
+        # predict_many stamps results with local time: same clock as save_prediction instead
+        out["timestamp"] = now
+    out["created_at"] = now
+
+    out = out[list(_BULK_COLUMNS)].astype(object)
+    return out.where(out.notna(), None)
+
+
+def _copy_rows(conn, frame: pd.DataFrame):
+    """COPY FROM STDIN through the psycopg (3) connection under ``conn``."""
+    cols = ", ".join(_BULK_COLUMNS)
+    raw = conn.connection.driver_connection
+    with raw.cursor() as cur, cur.copy(f"COPY {Prediction.__tablename__} ({cols}) FROM STDIN") as copy:
+        for row in frame.itertuples(index=False, name=None):
+            copy.write_row(row)
+
+
+def _bulk_method(conn, method: str) -> str:
+    if method not in ("auto", "insert", "copy"):
+        raise ValueError("method harus auto, insert atau copy")
+    is_copy_capable = conn.dialect.name == "postgresql" and conn.dialect.driver == "psycopg"
+    if method == "copy" and not is_copy_capable:
+        raise ValueError("COPY butuh PostgreSQL dengan driver psycopg")
+    if method == "auto":
+        return "copy" if is_copy_capable else "insert"
+    return method
+
+
+def _insert_bulk(conn, rows: list[dict], chunk_size: int, method: str, keep_timestamp: bool = False) -> set:
+    """Insert ``rows`` on ``conn``; returns the nims written."""
+    method = _bulk_method(conn, method)
+    table = Prediction.__table__
+    nims = set()
+    for start in range(0, len(rows), chunk_size):
+        frame = _bulk_frame(rows[start:start + chunk_size], keep_timestamp)
+        nims.update(frame["nim"])
+        if method == "copy":
+            _copy_rows(conn, frame)
+        else:
+            # executemany of one statement: multi-row VALUES batches
+            conn.execute(insert(table), frame.to_dict("records"))
+    return nims
+
+
+def save_predictions_bulk(rows: list[dict], chunk_size: int = BULK_CHUNK_SIZE, method: str = "auto") -> int:
+    """Save many prediction rows (same keys as save_prediction) in one
+    transaction; returns the number of rows written.
+
+    Types are coerced per column with pandas and rows are written
+    ``chunk_size`` at a time, with COPY FROM STDIN on PostgreSQL/psycopg
+    (``method="auto"`` or ``"copy"``) and a multi-row INSERT elsewhere
+    (``"insert"``). Nothing is written if any row fails to coerce.
+    Rows are stamped with utcnow, like save_prediction.
+    """
+    if not rows:
+        return 0
+    try:
+        with span("save.bulk"):
+            conn = db.session.connection()
+            refresh_latest(conn, _insert_bulk(conn, rows, max(1, int(chunk_size)), method))
+            db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return len(rows)
+
+
+def _text(v):
+    return v or ""
+
+
+def _number(v):
+    return str(v) if v is not None else ""
+
+
+def _probability(v):
+    return str(float(v)) if v is not None else ""
+
+
+def _timestamp(v):
+    return v.strftime("%Y-%m-%d %H:%M:%S") if v else ""
+
+
+# same string formatting as the CSV-era rows the templates expect
+_FORMAT = {
+    **{key: _text for key in ROW_COLUMNS},
+    "ipk": _number,
+    "mengulang": _number,
+    "presensi": _number,
+    "sks_lulus": _number,
+    "probability": _probability,
+    "timestamp": _timestamp,
+}
+
+
+def _to_row(p: Prediction) -> dict:
+    return {key: _FORMAT[key](getattr(p, col.key)) for key, col in ROW_COLUMNS.items()}
+
+
+# -------------------------
+# Query API (keyset pages)
+# -------------------------
+
+def _norm_nim(nim) -> str:
+    return str(nim).strip().replace(".0", "")
+
+
+def encode_cursor(timestamp: datetime, record_id: str) -> str:
+    """Opaque position after a row: its (timestamp, id) sort key; a row
+    without a timestamp gets an empty one."""
+    raw = f"{timestamp.isoformat() if timestamp is not None else ''}|{record_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+        ts, record_id = raw.split("|", 1)
+        return (datetime.fromisoformat(ts) if ts else None), record_id
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("cursor tidak valid")
+
+
+def _order(newest_first: bool) -> tuple:
+    """ORDER BY of the (timestamp, id) sort key. Rows without a timestamp
+    count as the newest: NULLS FIRST descending and NULLS LAST ascending
+    is PostgreSQL's own NULL order, so ix_predictions_timestamp_id still
+    serves both directions."""
+    if newest_first:
+        return Prediction.timestamp.desc().nulls_first(), Prediction.id.desc()
+    return Prediction.timestamp.asc().nulls_last(), Prediction.id.asc()
+
+
+def _after(position: tuple, newest_first: bool):
+    """Rows that come after ``position`` (a decoded cursor) in _order."""
+    ts, record_id = position
+    no_ts = Prediction.timestamp.is_(None)
+    if ts is None:
+        # inside the NULL group, ordered by id
+        later = no_ts & (Prediction.id < record_id if newest_first else Prediction.id > record_id)
+        return or_(later, Prediction.timestamp.isnot(None)) if newest_first else later
+    sort_key = tuple_(Prediction.timestamp, Prediction.id)
+    if newest_first:
+        return sort_key < position
+    return or_(sort_key > position, no_ts)
+
+
+def _parse_date(value: str) -> datetime:
+    try:
+        return datetime.strptime(value.strip(), "%Y-%m-%d")
+    except ValueError:
+        raise ValueError(f"tanggal harus YYYY-MM-DD: {value!r}")
+
+
+def filters_from_args(args) -> dict:
+    """Filters from query-string args (request.args); empty values are
+    dropped. Raises ValueError for a malformed date."""
+    filters = {}
+    for key in FILTER_KEYS:
+        value = (args.get(key) or "").strip()
+        if value:
+            filters[key] = value
+    for key in ("date_from", "date_to"):
+        if key in filters:
+            _parse_date(filters[key])
+    return filters
+
+
+def page_start(args) -> int:
+    """Rows before the requested page (``start`` query arg, carried next
+    to the cursor), so row numbers continue across pages."""
+    try:
+        return max(int(args.get("start") or 0), 0)
+    except ValueError:
+        raise ValueError("start harus bilangan bulat")
+
+
+def _one_or_many(column, value):
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return column.in_(list(value))
+    return column == value
+
+
+def _fakultas_id():
+    """Fakultas id of each prediction's kelas, as a correlated scalar
+    subquery. Profiles carry the kelas id (Student.kelas_code), older rows
+    the kelas code; when a value is both the id of one kelas and the code
+    of another, the id match wins, so every prediction resolves to
+    exactly one kelas and is never counted twice."""
+    by_id = cast(Kelas.id, String) == Prediction.kelas
+    return (
+        select(Kelas.fakultas_id)
+        .where(or_(by_id, Kelas.code == Prediction.kelas))
+        .order_by(case((by_id, 0), else_=1))
+        .limit(1)
+        .correlate(Prediction)
+        .scalar_subquery()
+    )
+
+
+def _apply_filters(q, filters: dict):
+    """nim, username, kelas, prodi, angkatan and risk match exactly (a
+    list/set means any of them); fakultas (Fakultas.code) and advisor (the
+    advisor's username) go through the kelas / students tables as
+    subqueries; date_from and date_to (YYYY-MM-DD or datetime) bound the
+    timestamp, both days inclusive."""
+    if not filters:
+        return q
+    unknown = set(filters) - set(FILTER_KEYS)
+    if unknown:
+        raise ValueError(f"filter tidak dikenal: {', '.join(sorted(unknown))}")
+
+    nim = filters.get("nim")
+    if nim is not None:
+        nim = [_norm_nim(n) for n in nim] if isinstance(nim, (list, tuple, set, frozenset)) else _norm_nim(nim)
+        q = q.filter(_one_or_many(Prediction.nim, nim))
+    for key in ("username", "kelas", "prodi", "angkatan", "risk"):
+        if filters.get(key) is not None:
+            q = q.filter(_one_or_many(ROW_COLUMNS[key], filters[key]))
+    if filters.get("fakultas") is not None:
+        ids = select(Fakultas.id).where(_one_or_many(Fakultas.code, filters["fakultas"]))
+        q = q.filter(_fakultas_id().in_(ids))
+    if filters.get("advisor") is not None:
+        nims = (
+            select(Student.nim)
+            .join(User, User.id == Student.advisor_id)
+            .where(_one_or_many(User.username, filters["advisor"]))
+        )
+        q = q.filter(Prediction.nim.in_(nims))
+
+    date_from, date_to = filters.get("date_from"), filters.get("date_to")
+    if date_from:
+        q = q.filter(Prediction.timestamp >= (date_from if isinstance(date_from, datetime) else _parse_date(date_from)))
+    if date_to:
+        end = date_to if isinstance(date_to, datetime) else _parse_date(date_to) + timedelta(days=1)
+        q = q.filter(Prediction.timestamp < end)
+    return q
+
+
+def query_predictions(filters: dict = None, columns=None, after: str = None, limit=PAGE_SIZE,
+                      newest_first: bool = True, latest_only: bool = False) -> dict:
+    """One page of predictions, ordered by (timestamp, id), newest first
+    unless ``newest_first=False``; rows without a timestamp count as the
+    newest.
+
+    ``columns`` projects the row keys to select (default: all of
+    ROW_COLUMNS); only those columns are transferred and no ORM objects
+    are built. ``after`` is the ``next_cursor`` of the previous page;
+    ``limit=None`` returns every matching row; ``latest_only`` keeps the
+    newest prediction of each student (latest_predictions). Returns
+    {"rows": [...], "next_cursor": str or None}.
+    """
+    keys = list(ROW_COLUMNS) if columns is None else list(columns)
+    unknown = set(keys) - set(ROW_COLUMNS)
+    if unknown:
+        raise ValueError(f"kolom tidak dikenal: {', '.join(sorted(unknown))}")
+    if limit is not None:
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+
+    # the sort key is always selected: it makes the cursor
+    selected = keys + [k for k in ("timestamp", "record_id") if k not in keys]
+    q = db.session.query(*[ROW_COLUMNS[k] for k in selected])
+    if latest_only:
+        q = q.join(LatestPrediction, LatestPrediction.prediction_id == Prediction.id)
+    q = _apply_filters(q, filters)
+
+    if after:
+        q = q.filter(_after(decode_cursor(after), newest_first))
+    q = q.order_by(*_order(newest_first))
+
+    with span("predictions.query"):
+        result = q.all() if limit is None else q.limit(limit + 1).all()
+
+    next_cursor = None
+    if limit is not None and len(result) > limit:
+        result = result[:limit]
+        last = result[-1]
+        next_cursor = encode_cursor(last[selected.index("timestamp")], last[selected.index("record_id")])
+
+    n = len(keys)
+    rows = [{key: _FORMAT[key](value) for key, value in zip(keys, r[:n])} for r in result]
+    return {"rows": rows, "next_cursor": next_cursor}
+
+
+# -------------------------
+# Streaming (every matching row)
+# -------------------------
+
+# numpy dtype per row key for records=True; other keys are object (str/None)
+_RECORD_DTYPES = {
+    "ipk": "f8",
+    "mengulang": "f8",
+    "presensi": "f8",
+    "sks_lulus": "f8",
+    "probability": "f8",
+    "timestamp": "M8[us]",
+}
+
+
+def _records(keys: list, chunk) -> np.ndarray:
+    dtype = [(k, _RECORD_DTYPES.get(k, "O")) for k in keys]
+    # NULL -> NaN / NaT in the numeric and timestamp fields
+    columns = [np.array(col, dtype=dt) for col, (_, dt) in zip(zip(*chunk), dtype)]
+    return np.rec.fromarrays(columns, dtype=dtype)
+
+
+def iter_predictions(filters: dict = None, columns=None, chunk_size: int = STREAM_CHUNK_SIZE,
+                     records: bool = False, latest_only: bool = False):
+    """Yield every prediction matching ``filters``, oldest first (rows
+    without a timestamp last), in chunks of up to ``chunk_size`` rows.
+
+    A chunk is a list of plain row tuples (raw column values, in
+    ``columns`` order, default all of ROW_COLUMNS) or, with
+    ``records=True``, a NumPy record array. Rows are fetched through a
+    server-side cursor (``yield_per``), so memory stays at one chunk
+    whatever the number of rows; consume the generator inside the app
+    context / request that created it.
+    """
+    keys = list(ROW_COLUMNS) if columns is None else list(columns)
+    unknown = set(keys) - set(ROW_COLUMNS)
+    if unknown:
+        raise ValueError(f"kolom tidak dikenal: {', '.join(sorted(unknown))}")
+    chunk_size = max(1, int(chunk_size))
+
+    q = db.session.query(*[ROW_COLUMNS[k] for k in keys])
+    if latest_only:
+        q = q.join(LatestPrediction, LatestPrediction.prediction_id == Prediction.id)
+    q = _apply_filters(q, filters).order_by(*_order(newest_first=False))
+
+    stmt = q.statement.execution_options(stream_results=True, yield_per=chunk_size)
+    result = db.session.execute(stmt)
+    try:
+        for part in result.partitions(chunk_size):
+            chunk = [tuple(r) for r in part]
+            yield _records(keys, chunk) if records else chunk
+    finally:
+        result.close()
+
+
+# -------------------------
+# Aggregates (GROUP BY risk)
+# -------------------------
+
+def _bucket_start(bucket: str):
+    """Start of the timestamp's day/week (Monday)/month/year."""
+    if bucket not in BUCKETS:
+        raise ValueError(f"bucket harus salah satu dari: {', '.join(BUCKETS)}")
+    ts = Prediction.timestamp
+    if db.engine.dialect.name == "postgresql":
+        return func.date_trunc(bucket, ts)
+    # SQLite in development
+    return {
+        "day": func.date(ts),
+        "week": func.date(ts, "weekday 0", "-6 days"),
+        "month": func.strftime("%Y-%m-01", ts),
+        "year": func.strftime("%Y-01-01", ts),
+    }[bucket]
+
+
+def _bucket_label(value) -> str:
+    if value is None:
+        return ""
+    return value.strftime("%Y-%m-%d") if isinstance(value, datetime) else str(value)
+
+
+def count_by_risk(filters: dict = None, group_by=(), bucket: str = None, latest_only: bool = False) -> list[dict]:
+    """Number of predictions per risk label, counted by the database in
+    one GROUP BY query.
+
+    ``group_by`` adds any of GROUP_KEYS to the grouping (fakultas and
+    advisor join the kelas / students tables); ``bucket`` adds the start
+    date (YYYY-MM-DD) of each day, week, month or year; ``latest_only``
+    counts students by their current risk (latest_predictions). Returns
+    one dict per group and risk: {<group keys>..., ["bucket"], "risk", "count"}.
+    """
+    group_by = list(group_by or ())
+    unknown = set(group_by) - set(GROUP_KEYS)
+    if unknown:
+        raise ValueError(f"group_by tidak dikenal: {', '.join(sorted(unknown))}")
+
+    advisor = aliased(User)
+    dims = {
+        "fakultas": Fakultas.code,
+        "kelas": Prediction.kelas,
+        "prodi": Prediction.prodi,
+        "angkatan": Prediction.angkatan,
+        "advisor": advisor.username,
+    }
+    keys = group_by + (["bucket"] if bucket else [])
+    exprs = [dims[k] for k in group_by] + ([_bucket_start(bucket)] if bucket else [])
+
+    q = db.session.query(*exprs, Prediction.risk, func.count())
+    if latest_only:
+        q = q.join(LatestPrediction, LatestPrediction.prediction_id == Prediction.id)
+    if "fakultas" in group_by:
+        q = q.outerjoin(Fakultas, Fakultas.id == _fakultas_id())
+    if "advisor" in group_by:
+        q = q.outerjoin(Student, Student.nim == Prediction.nim).outerjoin(advisor, advisor.id == Student.advisor_id)
+    q = _apply_filters(q, filters)
+    q = q.group_by(*exprs, Prediction.risk).order_by(*exprs, Prediction.risk)
+
+    with span("predictions.count_by_risk"):
+        result = q.all()
+
+    out = []
+    for r in result:
+        row = {k: (v if v is not None else "") for k, v in zip(group_by, r)}
+        if bucket:
+            row["bucket"] = _bucket_label(r[len(group_by)])
+        row["risk"] = r[len(keys)] or ""
+        row["count"] = int(r[len(keys) + 1])
+        out.append(row)
+    return out
+
+
+def load_latest_prediction(username: str = None, nim: str = None):
+    """Newest prediction of one student (by username or nim), or None:
+    one indexed lookup in latest_predictions."""
+    q = Prediction.query.join(LatestPrediction, LatestPrediction.prediction_id == Prediction.id)
+    if username:
+        q = q.filter(LatestPrediction.username == str(username).strip())
+    elif nim:
+        q = q.filter(LatestPrediction.nim == _norm_nim(nim))
+    else:
+        return None
+    p = q.order_by(LatestPrediction.timestamp.desc()).first()
+    return _to_row(p) if p else None
 
 
-def load_predictions() -> list[dict]:
-    rows = []
-    for p in Prediction.query.order_by(Prediction.timestamp).all():
-        rows.append({
-            "record_id": p.id,
-            "username": p.username or "",
-            "nama_mahasiswa": p.nama_mahasiswa or "",
-            "nim": p.nim or "",
-            "prodi": p.prodi or "",
-            "angkatan": p.angkatan or "",
-            "kelas": p.kelas or "",
-            "ipk": str(p.ipk) if p.ipk is not None else "",
-            "mengulang": str(p.mengulang) if p.mengulang is not None else "",
-            "presensi": str(p.presensi) if p.presensi is not None else "",
-            "sks_lulus": str(p.sks_lulus) if p.sks_lulus is not None else "",
-            "probability": str(float(p.probability)) if p.probability is not None else "",
-            "risk": p.risk or "",
-            "recommendation": p.recommendation or "",
-            "timestamp": p.timestamp.strftime("%Y-%m-%d %H:%M:%S") if p.timestamp else "",
-        })
-    return rows
-
-
-def rewrite_rows(rows: list[dict]):
-    # for DB backend, simplest approach: delete all and re-insert
-    delete_all_predictions()
-    for r in rows:
-        save_prediction(r)
+def rewrite_rows(rows: list[dict], chunk_size: int = BULK_CHUNK_SIZE, method: str = "auto"):
+    """Replace every prediction with ``rows`` in one transaction: on any
+    error the old rows stay. Rows keep their stored timestamps."""
+    try:
+        with span("save.rewrite"):
+            LatestPrediction.query.delete()
+            Prediction.query.delete()
+            conn = db.session.connection()
+            _insert_bulk(conn, rows, max(1, int(chunk_size)), method, keep_timestamp=True)
+            refresh_latest(conn)
+            db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
 
 
 def delete_all_predictions():
+    LatestPrediction.query.delete()
     Prediction.query.delete()
     db.session.commit()
 
 
 def delete_predictions_by_nim(nim: str):
     nim = str(nim).strip().replace(".0", "")
+    LatestPrediction.query.filter(LatestPrediction.nim == nim).delete()
     Prediction.query.filter(Prediction.nim == nim).delete()
     db.session.commit()
 
 
 def delete_prediction_by_id(record_id: str):
     record_id = str(record_id).strip()
+    nims = [n for (n,) in db.session.query(Prediction.nim).filter(Prediction.id == record_id)]
+    LatestPrediction.query.filter(LatestPrediction.prediction_id == record_id).delete()
     Prediction.query.filter(Prediction.id == record_id).delete()
+    # the student's previous prediction becomes the latest
+    refresh_latest(db.session.connection(), nims)
     db.session.commit()
@@ -15,5 +15,6 @@ CSV_COLUMNS = [
     "probability",
     "risk",
     "recommendation",
+    "model_version",
     "timestamp"
 ]
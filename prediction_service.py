@@ -1,88 +1,37 @@
-import joblib
 import pandas as pd
 from datetime import datetime
 import uuid
 
 from services.auth_service import STUDENT_PROFILES
+from services.business_rules import DEFAULT_CONTEXT, apply_rules_one, classify_risk, recommendation
+from services.model_loader import get_bundle
 
 # ======================================================
-# LOAD MODEL
+# LOAD MODEL (LAZY, SEE services/model_loader.py)
 # ======================================================
-MODEL_PATH = "model_kelulusan.joblib"
-model = joblib.load(MODEL_PATH)
-
-FEATURE_ORDER = list(
-    getattr(
-        model,
-        "feature_names_in_",
-        [
-            "ipk",
-            "sks_lulus",
-            "presensi",
-            "mengulang",
-            "semester_aktif",
-            "status_skripsi",
-            "status_administrasi",
-            "bekerja",
-            "cuti",
-        ]
-    )
-)
+DEFAULT_FEATURE_ORDER = [
+    "ipk",
+    "sks_lulus",
+    "presensi",
+    "mengulang",
+    "semester_aktif",
+    "status_skripsi",
+    "status_administrasi",
+    "bekerja",
+    "cuti",
+]
+
+
+def feature_order(model) -> list:
+    return list(getattr(model, "feature_names_in_", DEFAULT_FEATURE_ORDER))
 
 # ======================================================
-# LEGACY LOGIC (TIDAK DIUBAH)
+# LEGACY LOGIC + 🔥 BUSINESS RULE (POST-PROCESSING YANG SAH)
 # ======================================================
-def classify_risk(prob: float) -> str:
-    if prob >= 0.85:
-        return "Low Risk"
-    elif prob >= 0.60:
-        return "Medium Risk"
-    return "High Risk"
-
-
-def recommendation(risk: str) -> str:
-    return {
-        "Low Risk": "Pertahankan performa akademik dan tingkatkan konsistensi belajar.",
-        "Medium Risk": "Disarankan bimbingan akademik rutin dan evaluasi strategi belajar.",
-        "High Risk": "Perlu intervensi: konseling, pendampingan intensif, dan monitoring berkala."
-    }[risk]
+# aturan & threshold dideklarasikan sebagai data di services/business_rules.py,
+# dipakai bersama services/prediction_service.py
+apply_business_rule = apply_rules_one
 
-# ======================================================
-# 🔥 BUSINESS RULE (POST-PROCESSING YANG SAH)
-# ======================================================
-def apply_business_rule(prob, data):
-    """
-    Koreksi probabilitas berbasis logika akademik
-    (BUKAN manipulasi angka)
-    """
-
-    # Kasus mahasiswa sehat akademik
-    if (
-        data["ipk"] >= 3.5 and
-        data["sks_lulus"] >= 120 and
-        data["presensi"] >= 90 and
-        data["status_skripsi"] == 1 and
-        data["cuti"] == 0
-    ):
-        prob = max(prob, 0.60)
-
-    # Kasus hampir lulus
-    if (
-        data["sks_lulus"] >= 144 and
-        data["status_skripsi"] == 1 and
-        data["semester_aktif"] <= 8
-    ):
-        prob = max(prob, 0.75)
-
-    # Kasus red-flag akademik (biar tetap jujur)
-    if (
-        data["semester_aktif"] > 10 or
-        data["cuti"] == 1 or
-        data["status_administrasi"] == 0
-    ):
-        prob = min(prob, 0.30)
-
-    return prob
 
 # ======================================================
 # MAIN PREDICTION
@@ -108,23 +57,26 @@ def predict_for_user(
         "presensi": int(presensi),
         "mengulang": int(mengulang),
 
-        # default akademik (bisa kamu ganti nanti)
-        "semester_aktif": 8,
-        "status_skripsi": 1,
-        "status_administrasi": 1,
-        "bekerja": 0,
-        "cuti": 0
+        # default akademik (bisa kamu ganti nanti di services/business_rules.py)
+        **DEFAULT_CONTEXT,
     }
 
+    bundle = get_bundle()
+    model = bundle.model
+    columns = feature_order(model) if model is not None else bundle.feature_order
     X = pd.DataFrame(
-        [[raw_input[f] for f in FEATURE_ORDER]],
-        columns=FEATURE_ORDER
+        [[raw_input[f] for f in columns]],
+        columns=columns
     )
 
     # --------------------------
     # 1️⃣ PROBABILITAS DARI MODEL
     # --------------------------
-    prob = float(model.predict_proba(X)[0][1])
+    # artifact compact tidak membawa objek sklearn, hanya engine
+    if model is None:
+        prob = float(bundle.engine.predict_positive(X.to_numpy(dtype=float))[0])
+    else:
+        prob = float(model.predict_proba(X)[0][1])
 
     # --------------------------
     # 2️⃣ BUSINESS RULE (POST ML)
@@ -157,5 +109,6 @@ def predict_for_user(
         "probability": str(round(prob * 100, 2)),
         "risk": risk,
         "recommendation": rec,
+        "model_version": bundle.version,
         "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     }
@@ -0,0 +1,33 @@
+"""Fill latest_predictions (newest prediction per student) from the whole
+predictions table, in one transaction.
+
+Run once after creating the table (db.create_all() or
+sql/create_latest_predictions.sql); afterwards prediction_repository keeps
+it up to date on every insert and delete. Safe to run again at any time.
+
+Usage: python scripts/backfill_latest_predictions.py
+"""
+import os
+import sys
+import time
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ROOT_DIR)
+
+from app import create_app
+from extensions import db
+from models.db_models import LatestPrediction
+from models.prediction_repository import backfill_latest
+
+
+def main():
+    app = create_app()
+    with app.app_context():
+        LatestPrediction.__table__.create(db.engine, checkfirst=True)
+        t0 = time.perf_counter()
+        students = backfill_latest()
+        print(f"latest_predictions: {students:,} mahasiswa ({time.perf_counter() - t0:.1f} s)")
+
+
+if __name__ == "__main__":
+    main()
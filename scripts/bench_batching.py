@@ -0,0 +1,82 @@
+"""Throughput benchmark: concurrent single-row predictions with and without
+the micro-batching coalescer (services/batching.py).
+
+Every thread scores off-grid rows (so the lookup table and the prediction
+cache do not short-circuit the model), one row per call, like concurrent
+/predict requests do.
+
+Usage: python scripts/bench_batching.py [threads] [calls_per_thread] [model_path]
+"""
+import os
+import sys
+import threading
+import time
+import warnings
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ROOT_DIR)
+warnings.filterwarnings("ignore")
+
+import numpy as np
+
+from services.batching import PredictionBatcher
+from services.model_loader import load_bundle, warm_up
+
+
+def run(threads, calls, predict):
+    rng = np.random.default_rng(0)
+    rows = np.column_stack([
+        rng.uniform(0, 4, threads * calls) + 0.0005,  # 3+ decimals -> off the grid
+        rng.integers(0, 161, threads * calls),
+        rng.integers(0, 101, threads * calls),
+        rng.integers(0, 10, threads * calls),
+    ]).astype(float)
+    latencies = [[] for _ in range(threads)]
+
+    def worker(t):
+        for i in range(calls):
+            row = rows[t * calls + i]
+            t0 = time.perf_counter()
+            predict(row)
+            latencies[t].append(time.perf_counter() - t0)
+
+    pool = [threading.Thread(target=worker, args=(t,)) for t in range(threads)]
+    t0 = time.perf_counter()
+    for th in pool:
+        th.start()
+    for th in pool:
+        th.join()
+    elapsed = time.perf_counter() - t0
+
+    lat = np.concatenate([np.array(l) for l in latencies]) * 1e3
+    return threads * calls / elapsed, np.percentile(lat, 50), np.percentile(lat, 99)
+
+
+def main():
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    calls = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    model_path = sys.argv[3] if len(sys.argv) > 3 else os.path.join(ROOT_DIR, "model_kelulusan.joblib")
+
+    bundle = warm_up(load_bundle(model_path))
+    bundle.grid = None
+
+    def direct(row):
+        return bundle.engine.predict_positive(row[None, :])[0]
+
+    print(f"threads: {threads}, calls/thread: {calls}\n")
+    print(f"{'mode':<26}{'rows/s':>10}{'p50 (ms)':>10}{'p99 (ms)':>10}")
+
+    rps, p50, p99 = run(threads, calls, direct)
+    print(f"{'direct (no batching)':<26}{rps:>10.0f}{p50:>10.2f}{p99:>10.2f}")
+
+    for window_ms in (0.5, 2.0, 5.0):
+        batcher = PredictionBatcher(lambda X, b: b.engine.predict_positive(X), window_ms=window_ms, max_batch=64)
+        rps, p50, p99 = run(threads, calls, lambda row: batcher.predict(row, bundle))
+        stats = batcher.stats()
+        print(f"{f'batched {window_ms:g} ms / 64':<26}{rps:>10.0f}{p50:>10.2f}{p99:>10.2f}"
+              f"   mean batch {stats['mean_batch_size']:.1f}, "
+              f"queue wait p50 {stats['queue_wait_us']['p50']:.0f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Throughput benchmark: saving prediction rows one by one (save_prediction,
+one ORM object and one commit per row, what rewrite_rows used to do) vs
+save_predictions_bulk (one transaction, multi-row INSERT or COPY).
+
+The rows look like the CSV-era dicts the dashboards and exports carry
+(string values, "" for missing). The predictions table is emptied before
+every case, so point --database-url at a scratch database.
+
+Usage:
+    python scripts/bench_bulk_insert.py [--rows 100k] [--loop-rows 5k]
+                                        [--database-url URL]
+                                        [--chunk-size N] [--method auto|insert|copy]
+
+The per-row loop is timed on --loop-rows rows only (it is slow) and
+reported as rows/s next to the bulk paths.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ROOT_DIR)
+
+from services.synthetic_data import parse_rows
+
+DEFAULT_DB = os.path.join(tempfile.gettempdir(), "bench_bulk_insert.sqlite")
+RISKS = ("Low Risk", "Medium Risk", "High Risk")
+
+
+def make_rows(n: int, seed: int = 0) -> list[dict]:
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n):
+        s = rng.randrange(max(n // 10, 1))
+        prob = round(rng.uniform(5, 99), 2)
+        rows.append({
+            "record_id": "",
+            "username": f"mhs{s:07d}",
+            "nama_mahasiswa": f"Mahasiswa {s}",
+            "nim": f"{2000000000 + s}",
+            "prodi": f"Prodi {s % 12}",
+            "angkatan": str(2018 + s % 7),
+            "kelas": f"K{s % 60:02d}",
+            "ipk": f"{rng.uniform(1.5, 4.0):.2f}",
+            "mengulang": str(rng.randrange(6)),
+            "presensi": str(rng.randrange(50, 101)),
+            "sks_lulus": "" if i % 50 == 0 else str(rng.randrange(20, 150)),
+            "probability": str(prob),
+            "risk": RISKS[0] if prob >= 70 else RISKS[1] if prob >= 40 else RISKS[2],
+            "recommendation": "Pertahankan performa akademik.",
+            "model_version": "bench",
+            "timestamp": f"2025-{1 + i % 12:02d}-{1 + i % 28:02d} 08:00:00",
+        })
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark simpan prediksi: per baris vs bulk")
+    parser.add_argument("--rows", type=parse_rows, default=100_000)
+    parser.add_argument("--loop-rows", type=parse_rows, default=5_000)
+    parser.add_argument("--database-url", default=f"sqlite:///{DEFAULT_DB}")
+    parser.add_argument("--chunk-size", type=int, default=None)
+    parser.add_argument("--method", default="auto", choices=("auto", "insert", "copy"))
+    args = parser.parse_args(argv)
+
+    os.environ["DATABASE_URL"] = args.database_url
+    from app import create_app
+    from extensions import db
+    from models.db_models import Prediction
+    from models import prediction_repository as repo
+
+    chunk_size = args.chunk_size or repo.BULK_CHUNK_SIZE
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        print(f"Database: {args.database_url}")
+
+        def count():
+            return db.session.query(Prediction.id).count()
+
+        results = []
+
+        loop_rows = make_rows(args.loop_rows)
+        repo.delete_all_predictions()
+        t0 = time.perf_counter()
+        for r in loop_rows:
+            repo.save_prediction(r)
+        results.append(("save_prediction loop", len(loop_rows), time.perf_counter() - t0, count()))
+
+        rows = make_rows(args.rows)
+        repo.delete_all_predictions()
+        t0 = time.perf_counter()
+        repo.save_predictions_bulk(rows, chunk_size=chunk_size, method=args.method)
+        results.append((f"save_predictions_bulk ({args.method})", len(rows), time.perf_counter() - t0, count()))
+
+        t0 = time.perf_counter()
+        repo.rewrite_rows(rows, chunk_size=chunk_size, method=args.method)
+        results.append(("rewrite_rows", len(rows), time.perf_counter() - t0, count()))
+
+        repo.delete_all_predictions()
+
+        print(f"\nchunk size {chunk_size:,}")
+        print(f"{'case':<34}{'rows':>10}{'seconds':>10}{'rows/s':>12}{'in table':>10}")
+        for name, n, seconds, stored in results:
+            print(f"{name:<34}{n:>10,}{seconds:>10.2f}{n / seconds:>12,.0f}{stored:>10,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Cold start comparison: eager vs lazy model loading, with/without mmap.
+
+Every mode runs in a fresh interpreter (like a serverless cold start) and
+reports the time to import the app, the time until the first prediction
+can be served and the peak RSS.
+
+Usage: python scripts/bench_cold_start.py [runs]
+"""
+import json
+import os
+import subprocess
+import sys
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+PROBE = r"""
+import json, resource, time, warnings
+warnings.filterwarnings("ignore")
+t0 = time.perf_counter()
+from app import app
+t1 = time.perf_counter()
+from services.model_loader import get_bundle, is_loaded
+loaded_at_import = is_loaded()
+b = get_bundle()
+b.engine.predict_one(3.25, 110, 92, 1)
+t2 = time.perf_counter()
+print(json.dumps({
+    "import_app_ms": (t1 - t0) * 1e3,
+    "first_prediction_ms": (t2 - t0) * 1e3,
+    "loaded_at_import": loaded_at_import,
+    "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+}))
+"""
+
+MODES = [
+    ("eager", {"MODEL_PRELOAD": "1", "MODEL_MMAP": "0"}),
+    ("eager + mmap", {"MODEL_PRELOAD": "1", "MODEL_MMAP": "1"}),
+    ("lazy", {"MODEL_PRELOAD": "0", "MODEL_MMAP": "0"}),
+    ("lazy + mmap", {"MODEL_PRELOAD": "0", "MODEL_MMAP": "1"}),
+]
+
+
+def run(env_overrides):
+    env = dict(os.environ, **env_overrides)
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=ROOT_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    print(f"{'mode':<14}{'import app (ms)':>17}{'first pred (ms)':>17}{'peak RSS (MB)':>15}")
+    for name, env in MODES:
+        results = [run(env) for _ in range(runs)]
+        med = lambda k: sorted(r[k] for r in results)[len(results) // 2]
+        print(f"{name:<14}{med('import_app_ms'):>17.1f}{med('first_prediction_ms'):>17.1f}{med('peak_rss_mb'):>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
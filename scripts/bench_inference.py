@@ -0,0 +1,65 @@
+"""Latency benchmark: sklearn predict_proba vs compiled inference engine.
+
+Usage: python scripts/bench_inference.py [model_path]
+"""
+import os
+import sys
+import time
+import warnings
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ROOT_DIR)
+warnings.filterwarnings("ignore")
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from services.inference_engine import compile_model
+
+
+def timeit(fn, repeat):
+    fn()  # warm-up
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    samples = np.array(samples) * 1e6
+    return np.percentile(samples, 50), np.percentile(samples, 99)
+
+
+def main():
+    model_path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(ROOT_DIR, "model_kelulusan.joblib")
+    model = joblib.load(model_path)
+
+    t0 = time.perf_counter()
+    engine = compile_model(model)
+    compile_ms = (time.perf_counter() - t0) * 1e3
+
+    cols = engine.feature_names
+    row = [3.25, 110.0, 92.0, 1.0]
+    rng = np.random.default_rng(0)
+    batch = np.column_stack([
+        np.round(rng.uniform(0, 4, 10000), 2),
+        rng.integers(0, 161, 10000),
+        rng.integers(0, 101, 10000),
+        rng.integers(0, 10, 10000),
+    ]).astype(float)
+
+    print(f"trees: {sum(m.forest.n_trees for m in engine.members)}, nodes: {engine.node_count}, compile: {compile_ms:.1f} ms\n")
+    print(f"{'case':<34}{'p50 (us)':>12}{'p99 (us)':>12}")
+
+    cases = [
+        ("sklearn single row (DataFrame)", lambda: model.predict_proba(pd.DataFrame([row], columns=cols)), 50),
+        ("engine single row (floats)", lambda: engine.predict_one(*row), 2000),
+        ("sklearn batch 10k", lambda: model.predict_proba(pd.DataFrame(batch, columns=cols)), 5),
+        ("engine batch 10k", lambda: engine.predict_positive(batch), 5),
+    ]
+    for name, fn, repeat in cases:
+        p50, p99 = timeit(fn, repeat)
+        print(f"{name:<34}{p50:>12.1f}{p99:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Throughput benchmark: in-process scoring vs the inference process pool
+(services/inference_pool.py).
+
+Client threads submit batches of off-grid rows, as concurrent
+/api/predict-batch requests would. A side thread measures how long a small
+pure-Python task (standing in for a dashboard request) waits meanwhile:
+with in-process scoring it competes for the GIL, with the pool it does
+not. The gain grows with the number of cores; on one core only the
+dashboard latency improves.
+
+Usage: python scripts/bench_inference_pool.py [workers] [batch_rows] [model_path]
+"""
+import os
+import sys
+import threading
+import time
+import warnings
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ROOT_DIR)
+warnings.filterwarnings("ignore")
+
+import numpy as np
+
+from services.inference_pool import InferencePool
+from services.model_loader import load_bundle, warm_up
+from services.prediction_service import predict_proba
+
+CLIENTS = 8
+BATCHES_PER_CLIENT = 20
+
+
+def make_batch(rng, n):
+    return np.column_stack([
+        rng.uniform(0, 4, n) + 0.0005,  # off the grid
+        rng.integers(0, 161, n),
+        rng.integers(0, 101, n),
+        rng.integers(0, 10, n),
+    ]).astype(float)
+
+
+def dashboard_probe(stop, samples):
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        sum(i * i for i in range(2000))
+        samples.append(time.perf_counter() - t0)
+        time.sleep(0.005)
+
+
+def run(score, batches):
+    stop, probe = threading.Event(), []
+    prober = threading.Thread(target=dashboard_probe, args=(stop, probe))
+    prober.start()
+
+    def client(c):
+        for X in batches[c]:
+            score(X)
+
+    clients = [threading.Thread(target=client, args=(c,)) for c in range(CLIENTS)]
+    t0 = time.perf_counter()
+    for th in clients:
+        th.start()
+    for th in clients:
+        th.join()
+    elapsed = time.perf_counter() - t0
+    stop.set()
+    prober.join()
+
+    rows = sum(len(X) for per_client in batches for X in per_client)
+    probe = np.array(probe) * 1e3
+    return rows / elapsed, np.percentile(probe, 50), np.percentile(probe, 99)
+
+
+def main():
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else (os.cpu_count() or 1)
+    batch_rows = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    model_path = sys.argv[3] if len(sys.argv) > 3 else os.path.join(ROOT_DIR, "model_kelulusan.joblib")
+
+    bundle = warm_up(load_bundle(model_path))
+    rng = np.random.default_rng(0)
+    batches = [[make_batch(rng, batch_rows) for _ in range(BATCHES_PER_CLIENT)] for _ in range(CLIENTS)]
+
+    pool = InferencePool(size=workers, queue_depth=4 * workers, timeout=60)
+    # start the workers and load the model before timing
+    pool.submit(batches[0][0], bundle).result()
+    X = batches[0][0]
+    assert np.array_equal(pool.submit(X, bundle).result(), predict_proba(X, bundle))
+
+    print(f"cores: {os.cpu_count()}, pool workers: {workers}, clients: {CLIENTS}, batch: {batch_rows} rows\n")
+    print(f"{'mode':<14}{'rows/s':>12}{'probe p50 (ms)':>16}{'probe p99 (ms)':>16}")
+    cases = [
+        ("in-process", lambda X: predict_proba(X, bundle)),
+        ("process pool", lambda X: pool.submit(X, bundle).result()),
+    ]
+    for name, score in cases:
+        rps, p50, p99 = run(score, batches)
+        print(f"{name:<14}{rps:>12.0f}{p50:>16.2f}{p99:>16.2f}")
+    print(f"\npool: {pool.stats()}")
+    pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
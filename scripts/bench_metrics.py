@@ -0,0 +1,69 @@
+"""Overhead of the latency instrumentation (services/metrics.py).
+
+Times an empty ``with span(...)`` block with and without an active request
+trace and checks it against the budget of a few microseconds per span.
+
+Usage: python scripts/bench_metrics.py
+Exits with status 1 when the budget is missed.
+"""
+import os
+import sys
+import time
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ROOT_DIR)
+
+from services import metrics
+from services.metrics import span
+
+BUDGET_US = 3.0
+N = 200_000
+
+
+def per_call_us(fn) -> float:
+    t0 = time.perf_counter()
+    fn()
+    return (time.perf_counter() - t0) / N * 1e6
+
+
+def baseline():
+    for _ in range(N):
+        pass
+
+
+def spans():
+    for _ in range(N):
+        with span("bench.empty"):
+            pass
+
+
+def main():
+    base = per_call_us(baseline)
+    plain = per_call_us(spans) - base
+
+    token = metrics.begin_trace()
+    traced = 0.0
+    for _ in range(N // 1000):
+        # keep the trace list at request size
+        metrics.end_trace(token)
+        token = metrics.begin_trace()
+        t0 = time.perf_counter()
+        for _ in range(1000):
+            with span("bench.empty"):
+                pass
+        traced += time.perf_counter() - t0
+    metrics.end_trace(token)
+    traced = traced / N * 1e6 - base
+
+    failed = False
+    print(f"{'case':<20}{'us/span':>10}{'budget':>10}")
+    for name, us in (("no trace", plain), ("inside a trace", traced)):
+        ok = us <= BUDGET_US
+        failed |= not ok
+        print(f"{name:<20}{us:>10.2f}{BUDGET_US:>10.1f}{'' if ok else ' MISSED'}")
+    print(f"\nrecorded: {metrics.snapshot()['bench.empty']['count']:,} spans")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
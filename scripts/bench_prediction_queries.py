@@ -0,0 +1,169 @@
+"""Benchmark of the prediction query API (models/prediction_repository.py)
+against loading the whole table, at 1M prediction rows.
+
+The database is filled with synthetic predictions (random students,
+timestamps over two years) when it has fewer rows than --rows. Each case
+is timed (best of --repeat) and its Python peak allocation measured with
+tracemalloc:
+
+    full table     every row as an ORM object turned into a dict, oldest
+                   first: what every dashboard did before
+    first page     newest PAGE_SIZE rows, dashboard columns
+    deep page      a page starting at the middle of the table (keyset
+                   cursor, no OFFSET)
+    nim history    every row of one student
+    risk filter    first page of High Risk rows
+    date range     first page of one month
+    dosen page     first page of 300 students' rows (nim IN ...)
+    risk column    the risk column of every row (summary cards, before
+                   services/risk_summary.py)
+    risk summary   counts per risk level, one GROUP BY query
+    prodi/month    the same, sliced by prodi and month
+
+Usage:
+    python scripts/bench_prediction_queries.py [--rows 1M] [--database-url URL]
+                                               [--repeat N] [--skip-full-table]
+
+Without --database-url a SQLite file in the temp directory is used (and
+kept, so later runs skip the insert).
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ROOT_DIR)
+
+from services.synthetic_data import parse_rows
+
+DEFAULT_DB = os.path.join(tempfile.gettempdir(), "bench_prediction_queries.sqlite")
+INSERT_CHUNK = 50_000
+RISKS = ("Low Risk", "Medium Risk", "High Risk")
+
+
+def seed(db, Prediction, rows: int, seed: int = 0):
+    """Append synthetic predictions until the table has ``rows`` rows."""
+    have = db.session.query(Prediction.id).count()
+    if have >= rows:
+        return have
+    rng = random.Random(seed + have)
+    students = max(rows // 10, 1)
+    start = datetime(2024, 1, 1)
+    span_seconds = 2 * 365 * 86400
+    table = Prediction.__table__
+    t0 = time.perf_counter()
+    for offset in range(have, rows, INSERT_CHUNK):
+        batch = []
+        for _ in range(min(INSERT_CHUNK, rows - offset)):
+            s = rng.randrange(students)
+            prob = round(rng.uniform(5, 99), 2)
+            ts = start + timedelta(seconds=rng.randrange(span_seconds), microseconds=rng.randrange(1_000_000))
+            batch.append({
+                "id": str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+                "username": f"mhs{s:07d}",
+                "nama_mahasiswa": f"Mahasiswa {s}",
+                "nim": f"{2000000000 + s}",
+                "prodi": f"Prodi {s % 12}",
+                "angkatan": str(2018 + s % 7),
+                "kelas": f"K{s % 60:02d}",
+                "ipk": round(rng.uniform(1.5, 4.0), 2),
+                "mengulang": rng.randrange(6),
+                "presensi": rng.randrange(50, 101),
+                "sks_lulus": rng.randrange(20, 150),
+                "probability": prob,
+                "risk": RISKS[0] if prob >= 70 else RISKS[1] if prob >= 40 else RISKS[2],
+                "recommendation": "Pertahankan performa akademik.",
+                "model_version": "bench",
+                "timestamp": ts,
+                "created_at": ts,
+            })
+        db.session.execute(table.insert(), batch)
+        db.session.commit()
+        print(f"  inserted {offset + len(batch):,} / {rows:,} ({time.perf_counter() - t0:.0f} s)", flush=True)
+    return rows
+
+
+def measure(fn, repeat: int):
+    """(best seconds, rows returned, peak MB) of ``fn``."""
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        n = fn()
+        best = min(best, time.perf_counter() - t0)
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, n, peak / 1e6
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark query prediksi: halaman keyset vs seluruh tabel")
+    parser.add_argument("--rows", type=parse_rows, default=1_000_000)
+    parser.add_argument("--database-url", default=f"sqlite:///{DEFAULT_DB}")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--skip-full-table", action="store_true", help="lewati baseline seluruh tabel")
+    args = parser.parse_args(argv)
+
+    os.environ["DATABASE_URL"] = args.database_url
+    from app import create_app
+    from extensions import db
+    from models.db_models import Prediction
+    from models import prediction_repository as repo
+    from services import risk_summary
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        print(f"Database: {args.database_url}")
+        total = seed(db, Prediction, args.rows)
+
+        # fixtures (not timed): a mid-table cursor, one student, 300 students
+        mid = (
+            db.session.query(Prediction.timestamp, Prediction.id)
+            .order_by(Prediction.timestamp.desc(), Prediction.id.desc())
+            .offset(total // 2).first()
+        )
+        mid_cursor = repo.encode_cursor(*mid)
+        nim = db.session.query(Prediction.nim).order_by(Prediction.timestamp.desc()).first()[0]
+        nims = {r[0] for r in db.session.query(Prediction.nim).distinct().limit(300)}
+        columns = ["record_id", "nama_mahasiswa", "nim", "prodi", "angkatan", "ipk", "sks_lulus",
+                   "presensi", "mengulang", "probability", "risk", "timestamp"]
+
+        def page(**kw):
+            return lambda: len(repo.query_predictions(columns=columns, **kw)["rows"])
+
+        cases = []
+        if not args.skip_full_table:
+            cases.append(("full table", lambda: len(
+                [repo._to_row(p) for p in Prediction.query.order_by(Prediction.timestamp).all()]
+            ), 1))
+        cases += [
+            ("first page", page(), args.repeat),
+            ("deep page", page(after=mid_cursor), args.repeat),
+            ("nim history", lambda: len(repo.query_predictions({"nim": nim}, limit=None)["rows"]), args.repeat),
+            ("risk filter", page(filters={"risk": "High Risk"}), args.repeat),
+            ("date range", page(filters={"date_from": "2025-03-01", "date_to": "2025-03-31"}), args.repeat),
+            ("dosen page", page(filters={"nim": nims}), args.repeat),
+            ("risk column", lambda: len(repo.query_predictions(columns=["risk"], limit=None)["rows"]), 1),
+            ("risk summary", lambda: risk_summary.summarize()["total"], args.repeat),
+            ("prodi/month", lambda: len(risk_summary.summarize_by(group_by=["prodi"], bucket="month")),
+             args.repeat),
+        ]
+
+        print(f"\n{total:,} predictions, page size {repo.PAGE_SIZE}")
+        print(f"{'case':<14}{'rows':>11}{'ms':>11}{'peak MB':>10}")
+        for name, fn, repeat in cases:
+            seconds, n, peak = measure(fn, repeat)
+            db.session.expunge_all()
+            print(f"{name:<14}{n:>11,}{seconds * 1e3:>11.1f}{peak:>10.1f}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
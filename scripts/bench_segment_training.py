@@ -0,0 +1,100 @@
+"""Benchmark of per-segment training (services/segment_training.py):
+total training time against the number of segments.
+
+One synthetic dataset with a fixed number of rows is split into K
+segments (services/synthetic_data.generate_segmented, one label model per
+segment) for every K. Each run trains all K segment models from shared
+memory with the given number of worker processes. Recorded per (K, jobs):
+
+    wall and CPU seconds, shared block size, rows per segment,
+    mean segment test ROC AUC
+
+Usage:
+    python scripts/bench_segment_training.py [--rows 200k] [--segments 1,2,4,8,16]
+                                             [--jobs 1,-1] [--trees N]
+                                             [--out bench_segment_training.json]
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import warnings
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ROOT_DIR)
+warnings.filterwarnings("ignore")
+
+from services.synthetic_data import parse_rows
+
+COLUMN = "segmen"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark training per segmen")
+    parser.add_argument("--rows", type=parse_rows, default=200_000)
+    parser.add_argument("--segments", default="1,2,4,8,16")
+    parser.add_argument("--jobs", default="1,-1", help="jumlah proses per run, dipisah koma (-1 = semua CPU)")
+    parser.add_argument("--trees", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="bench_segment_training.json")
+    args = parser.parse_args(argv)
+
+    import numpy as np
+    import sklearn
+
+    import train_model
+    from services.synthetic_data import generate_segmented, load_profile, segment_profiles
+    from services.segment_training import train_segments
+
+    counts = [int(k) for k in args.segments.split(",")]
+    jobs = [int(j) for j in args.jobs.split(",")]
+    profile = load_profile(os.path.join(ROOT_DIR, "dataset_kelulusan_mahasiswa.csv"))
+    pipeline = train_model.build_pipeline().set_params(clf__n_estimators=args.trees)
+    report = {
+        "machine": {
+            "cpu_count": os.cpu_count(),
+            "python": platform.python_version(),
+            "sklearn": sklearn.__version__,
+            "platform": platform.platform(),
+        },
+        "rows": args.rows,
+        "trees": args.trees,
+        "runs": [],
+    }
+
+    print(f"{'segments':>9}{'jobs':>6}{'rows/seg':>10}{'wall s':>8}{'CPU s':>8}{'shm MB':>8}{'AUC':>7}")
+    with tempfile.TemporaryDirectory(prefix="bench_segments_") as tmp:
+        model_path = os.path.join(tmp, "model.joblib")
+        for k in counts:
+            values = [f"S{i:02d}" for i in range(k)]
+            df = generate_segmented(segment_profiles(profile, values, args.seed), COLUMN, args.rows, args.seed)
+            X, y = train_model.prepare_features(df)
+            split = train_model.split_codes(y)
+            for n_jobs in jobs:
+                r = train_segments(X, y, split, df[COLUMN], pipeline, model_path, None, "bench", COLUMN,
+                                   n_jobs=n_jobs, min_rows=1)
+                aucs = [e["test_roc_auc"] for e in r["segments"].values()]
+                run = {
+                    "segments": k,
+                    "n_jobs": r["n_jobs"],
+                    "rows_per_segment": args.rows // k,
+                    "wall_seconds": r["wall_seconds"],
+                    "cpu_seconds": r["cpu_seconds"],
+                    "shared_bytes": r["shared_bytes"],
+                    "segments_trained": r["segments_trained"],
+                    "mean_test_roc_auc": round(float(np.mean(aucs)), 4) if aucs else None,
+                }
+                report["runs"].append(run)
+                print(f"{k:>9}{run['n_jobs']:>6}{run['rows_per_segment']:>10,}{run['wall_seconds']:>8.1f}"
+                      f"{run['cpu_seconds']:>8.1f}{run['shared_bytes'] / 1e6:>8.1f}"
+                      f"{run['mean_test_roc_auc'] or 0:>7.3f}", flush=True)
+
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nReport: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
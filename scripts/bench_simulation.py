@@ -0,0 +1,69 @@
+"""Latency benchmark for the what-if simulation (services/simulation_service.py).
+
+Times a 100x100 ipk x presensi sweep (10,000 points)
+served from the lookup table and from the compiled engine alone, and
+checks the results against the latency targets:
+
+    lookup table  : p99 <= 20 ms
+    engine only   : p99 <= 150 ms
+
+Usage: python scripts/bench_simulation.py [model_path]
+Exits with status 1 when a target is missed.
+"""
+import os
+import sys
+import time
+import warnings
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ROOT_DIR)
+warnings.filterwarnings("ignore")
+
+import numpy as np
+
+from services.grid_lookup import ProbabilityGrid, grid_path_for
+from services.model_loader import load_bundle, warm_up
+from services.simulation_service import simulate
+
+TARGET_P99_MS = {"lookup table": 20.0, "engine only": 150.0}
+BASE = {"ipk": 2.8, "mengulang": 1, "presensi": 75, "sks_lulus": 100}
+SWEEPS = [
+    {"feature": "ipk", "min": 2.0, "max": 3.98, "steps": 100},
+    {"feature": "presensi", "min": 0, "max": 99, "steps": 100},
+]
+
+
+def main():
+    model_path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(ROOT_DIR, "model_kelulusan.joblib")
+    bundle = warm_up(load_bundle(model_path))
+    grid = bundle.grid
+    if grid is None and os.path.exists(grid_path_for(model_path)):
+        grid = ProbabilityGrid.load(grid_path_for(model_path))
+
+    cases = []
+    if grid is not None:
+        cases.append(("lookup table", grid))
+    else:
+        print("no lookup table next to the model (run scripts/build_grid.py); skipping that case\n")
+    cases.append(("engine only", None))
+
+    failed = False
+    print(f"{'case':<16}{'points':>8}{'p50 (ms)':>10}{'p99 (ms)':>10}{'target':>10}")
+    for name, case_grid in cases:
+        bundle.grid = case_grid
+        result = simulate(BASE, SWEEPS, bundle)
+        samples = []
+        for _ in range(100 if case_grid is not None else 20):
+            t0 = time.perf_counter()
+            simulate(BASE, SWEEPS, bundle)
+            samples.append((time.perf_counter() - t0) * 1e3)
+        p50, p99 = np.percentile(samples, [50, 99])
+        ok = p99 <= TARGET_P99_MS[name]
+        failed |= not ok
+        print(f"{name:<16}{result['points']:>8}{p50:>10.2f}{p99:>10.2f}{TARGET_P99_MS[name]:>9.0f}{'' if ok else ' MISSED'}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""Scaling benchmark for the training pipeline on synthetic data.
+
+For every size a synthetic dataset is generated (services/synthetic_data.py)
+and each training mode runs in a fresh interpreter, so peak RSS is per
+run. Recorded per (size, mode):
+
+    fit time, peak RSS, joblib and compact artifact size, node count,
+    single-row latency (compiled engine p50/p99, sklearn p50),
+    10k-row batch latency (compiled engine), test ROC AUC
+
+Modes:
+    in-memory    train_model.prepare_features + build_pipeline().fit on
+                 the whole CSV (the default training path, without the
+                 hyperparameter search)
+    out-of-core  services/chunked_training.train_out_of_core
+
+Usage:
+    python scripts/bench_training_scale.py [--sizes 10k,100k,1M] [--modes in-memory,out-of-core]
+                                           [--trees N] [--out bench_training_scale.json]
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ROOT_DIR)
+warnings.filterwarnings("ignore")
+
+from services.synthetic_data import parse_rows
+
+MODES = ("in-memory", "out-of-core")
+
+
+# ======================================================
+# WORKER (ONE FRESH PROCESS PER RUN)
+# ======================================================
+def _latency(compiled, model, X_test, features):
+    import numpy as np
+    import pandas as pd
+
+    rows = X_test[:1000]
+    single = []
+    for row in rows:
+        t0 = time.perf_counter_ns()
+        compiled.predict_one(*row)
+        single.append(time.perf_counter_ns() - t0)
+    sk = []
+    for row in rows[:50]:
+        frame = pd.DataFrame([row], columns=features)
+        t0 = time.perf_counter_ns()
+        model.predict_proba(frame)
+        sk.append(time.perf_counter_ns() - t0)
+    batch = np.resize(X_test, (10_000, X_test.shape[1]))
+    t0 = time.perf_counter()
+    compiled.predict_positive(batch)
+    batch_ms = (time.perf_counter() - t0) * 1e3
+    p50, p99 = np.percentile(single, [50, 99]) / 1e3
+    return {
+        "engine_single_p50_us": round(float(p50), 1),
+        "engine_single_p99_us": round(float(p99), 1),
+        "sklearn_single_p50_ms": round(float(np.median(sk)) / 1e6, 2),
+        "engine_batch_10k_ms": round(batch_ms, 1),
+    }
+
+
+def worker(mode: str, csv_path: str, trees: int) -> dict:
+    import joblib
+    import numpy as np
+    from sklearn.metrics import roc_auc_score
+
+    import train_model
+    from services.chunked_training import peak_rss_mb, train_out_of_core
+    from services.compact_model import export_compact
+    from services.inference_engine import compile_model
+
+    features = train_model.FEATURES
+    pipe = train_model.build_pipeline().set_params(clf__n_estimators=trees)
+
+    t0 = time.perf_counter()
+    if mode == "in-memory":
+        from sklearn.model_selection import train_test_split
+
+        X, y = train_model.prepare_features(train_model.load_data(csv_path))
+        X_train, X_test, y_train, y_test = train_test_split(
+            X, y, test_size=0.10, stratify=y, random_state=train_model.RANDOM_STATE
+        )
+        model = pipe.fit(X_train, y_train)
+        X_test = X_test.to_numpy(dtype=float)
+    else:
+        model, splits, _ = train_out_of_core(csv_path, features, train_model.TARGET, pipe, trees)
+        X_test, y_test = splits["test"]
+        X_test = X_test.astype(float)
+    fit_seconds = time.perf_counter() - t0
+    rss_after_fit = peak_rss_mb()
+
+    compiled = compile_model(model)
+    with tempfile.TemporaryDirectory() as tmp:
+        model_path = os.path.join(tmp, "model.joblib")
+        joblib.dump(model, model_path)
+        compact = export_compact(compiled, os.path.join(tmp, "model.compact.bin"), "bench")
+        model_bytes = os.path.getsize(model_path)
+
+    result = {
+        "fit_seconds": round(fit_seconds, 2),
+        "peak_rss_mb": rss_after_fit,
+        "model_bytes": model_bytes,
+        "compact_bytes": compact["file_bytes"],
+        "nodes": compiled.node_count,
+        "test_roc_auc": round(float(roc_auc_score(y_test, compiled.predict_positive(X_test))), 4),
+    }
+    result.update(_latency(compiled, model, np.nan_to_num(X_test, nan=3.0), features))
+    return result
+
+
+def run_worker(mode: str, csv_path: str, trees: int) -> dict:
+    out = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--worker", mode, "--csv", csv_path, "--trees", str(trees)],
+        cwd=ROOT_DIR, capture_output=True, text=True,
+    )
+    if out.returncode != 0:
+        return {"error": out.stderr.strip().splitlines()[-1] if out.stderr.strip() else f"exit {out.returncode}"}
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+# ======================================================
+# RUNNER
+# ======================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark skala training dengan data sintetis")
+    parser.add_argument("--sizes", default="10k,100k,1M")
+    parser.add_argument("--modes", default=",".join(MODES))
+    parser.add_argument("--trees", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="bench_training_scale.json")
+    parser.add_argument("--worker", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--csv", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        print(json.dumps(worker(args.worker, args.csv, args.trees)))
+        return
+
+    import sklearn
+
+    from services.synthetic_data import load_profile, write_csv
+
+    sizes = [parse_rows(s) for s in args.sizes.split(",")]
+    modes = [m.strip() for m in args.modes.split(",")]
+    profile = load_profile(os.path.join(ROOT_DIR, "dataset_kelulusan_mahasiswa.csv"))
+    report = {
+        "machine": {
+            "cpu_count": os.cpu_count(),
+            "python": platform.python_version(),
+            "sklearn": sklearn.__version__,
+            "platform": platform.platform(),
+        },
+        "trees": args.trees,
+        "runs": [],
+    }
+
+    header = (f"{'rows':>11} {'mode':<12}{'fit s':>8}{'RSS MB':>8}{'joblib MB':>10}{'compact MB':>11}"
+              f"{'1row p50 us':>12}{'p99 us':>8}{'10k ms':>8}{'AUC':>7}")
+    print(header)
+    with tempfile.TemporaryDirectory(prefix="bench_scale_") as tmp:
+        for rows in sizes:
+            csv_path = os.path.join(tmp, f"synthetic_{rows}.csv")
+            t0 = time.perf_counter()
+            gen = write_csv(csv_path, rows, args.seed, profile)
+            gen_seconds = round(time.perf_counter() - t0, 2)
+            for mode in modes:
+                r = run_worker(mode, csv_path, args.trees)
+                report["runs"].append({"rows": rows, "mode": mode, "csv_bytes": gen["file_bytes"],
+                                       "generate_seconds": gen_seconds, **r})
+                if "error" in r:
+                    print(f"{rows:>11,} {mode:<12}ERROR {r['error']}")
+                    continue
+                print(f"{rows:>11,} {mode:<12}{r['fit_seconds']:>8.1f}{r['peak_rss_mb'] or 0:>8.0f}"
+                      f"{r['model_bytes'] / 1e6:>10.1f}{r['compact_bytes'] / 1e6:>11.2f}"
+                      f"{r['engine_single_p50_us']:>12.0f}{r['engine_single_p99_us']:>8.0f}"
+                      f"{r['engine_batch_10k_ms']:>8.0f}{r['test_roc_auc']:>7.3f}", flush=True)
+            os.remove(csv_path)
+
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nReport: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+"""Build the probability lookup table for an existing model artifact.
+
+Usage: python scripts/build_grid.py [model_path]
+Writes <model>.grid.npz next to the model and prints the size report.
+Exits with status 1 (and writes nothing) when a cell next to a risk or
+business-rule cut classifies differently from the model.
+"""
+import os
+import sys
+import warnings
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ROOT_DIR)
+warnings.filterwarnings("ignore")
+
+import joblib
+
+from services.grid_lookup import export_grid, print_report
+from services.model_loader import artifact_version
+
+
+def main():
+    model_path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(ROOT_DIR, "model_kelulusan.joblib")
+    model = joblib.load(model_path)
+    report = export_grid(model, model_path, artifact_version(model_path))
+    print_report(report)
+    sys.exit(1 if report["cut_mismatches"] else 0)
+
+
+if __name__ == "__main__":
+    main()
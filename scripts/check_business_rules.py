@@ -0,0 +1,97 @@
+"""Parity check and timing: declarative business rules (services/business_rules.py)
+vs the original scalar if-chain from prediction_service.py.
+
+Usage: python scripts/check_business_rules.py [rows]
+Exits with status 1 when any probability or risk label differs.
+"""
+import os
+import sys
+import time
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ROOT_DIR)
+
+import numpy as np
+import pandas as pd
+
+from services.business_rules import apply_rules_one, assess, classify_risk
+
+
+def legacy_business_rule(prob, data):
+    """apply_business_rule as it was written before the rule table."""
+    if (
+        data["ipk"] >= 3.5 and
+        data["sks_lulus"] >= 120 and
+        data["presensi"] >= 90 and
+        data["status_skripsi"] == 1 and
+        data["cuti"] == 0
+    ):
+        prob = max(prob, 0.60)
+    if (
+        data["sks_lulus"] >= 144 and
+        data["status_skripsi"] == 1 and
+        data["semester_aktif"] <= 8
+    ):
+        prob = max(prob, 0.75)
+    if (
+        data["semester_aktif"] > 10 or
+        data["cuti"] == 1 or
+        data["status_administrasi"] == 0
+    ):
+        prob = min(prob, 0.30)
+    return prob
+
+
+def legacy_classify_risk(prob):
+    if prob >= 0.85:
+        return "Low Risk"
+    elif prob >= 0.60:
+        return "Medium Risk"
+    return "High Risk"
+
+
+def sample_inputs(n, seed=7):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "ipk": np.round(rng.uniform(2.5, 4, n), 2),
+        "sks_lulus": rng.integers(90, 161, n),
+        "presensi": rng.integers(70, 101, n),
+        "mengulang": rng.integers(0, 5, n),
+        "semester_aktif": rng.integers(6, 14, n),
+        "status_skripsi": rng.integers(0, 2, n),
+        "status_administrasi": rng.choice([0, 1], n, p=[0.1, 0.9]),
+        "bekerja": rng.integers(0, 2, n),
+        "cuti": rng.choice([0, 1], n, p=[0.9, 0.1]),
+    }), rng.uniform(0, 1, n)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    df, probs = sample_inputs(n)
+    records = df.to_dict("records")
+
+    t0 = time.perf_counter()
+    expected = np.array([legacy_business_rule(p, r) for p, r in zip(probs, records)])
+    expected_risk = np.array([legacy_classify_risk(p) for p in expected], dtype=object)
+    legacy_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    got, risks, _ = assess(probs, df)
+    vector_s = time.perf_counter() - t0
+
+    scalar = np.array([apply_rules_one(p, r) for p, r in zip(probs, records)])
+    scalar_risk = np.array([classify_risk(p) for p in scalar], dtype=object)
+
+    diffs = int((got != expected).sum() + (risks != expected_risk).sum()
+                + (scalar != expected).sum() + (scalar_risk != expected_risk).sum())
+    changed = int((expected != probs).sum())
+
+    print(f"rows: {n:,} ({changed:,} changed by a rule)")
+    print(f"legacy if-chain : {legacy_s * 1e3:8.1f} ms")
+    print(f"vectorized      : {vector_s * 1e3:8.1f} ms ({legacy_s / vector_s:.0f}x)")
+    print(f"mismatches      : {diffs}")
+    sys.exit(1 if diffs else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Check and time tree-path explanations (services/explain.py).
+
+Verifies that base + contributions reproduces the engine probability for
+every row and compares explanation cost with plain prediction cost.
+
+Usage: python scripts/check_explanations.py [model_path]
+Exits with status 1 when the additivity or the probability check fails.
+"""
+import os
+import sys
+import time
+import warnings
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ROOT_DIR)
+warnings.filterwarnings("ignore")
+
+import joblib
+import numpy as np
+
+from services.explain import TreeExplainer
+from services.inference_engine import compile_model
+
+TOLERANCE = 1e-9
+
+
+def timeit(fn, repeat):
+    fn()
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - t0) / repeat * 1e6
+
+
+def main():
+    model_path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(ROOT_DIR, "model_kelulusan.joblib")
+    engine = compile_model(joblib.load(model_path))
+
+    t0 = time.perf_counter()
+    explainer = TreeExplainer(engine)
+    build_ms = (time.perf_counter() - t0) * 1e3
+
+    rng = np.random.default_rng(0)
+    X = np.column_stack([
+        np.round(rng.uniform(0, 4, 5000), 2),
+        rng.integers(0, 161, 5000),
+        rng.integers(0, 101, 5000),
+        rng.integers(0, 10, 5000),
+    ]).astype(float)
+    X[::53, 0] = np.nan
+
+    probs, contribs = explainer.explain(X)
+    prob_err = float(np.abs(probs - engine.predict_positive(X)).max())
+    sum_err = float(np.abs(explainer.base + contribs.sum(axis=1) - probs).max())
+
+    print(f"precompute: {build_ms:.1f} ms, base value: {explainer.base:.4f}")
+    print(f"max |prob - engine|        : {prob_err:.2e}")
+    print(f"max |base + sum - prob|    : {sum_err:.2e}")
+    print(f"mean |contribution|        : " + ", ".join(
+        f"{f} {v:.4f}" for f, v in zip(explainer.feature_names, np.abs(contribs).mean(axis=0))))
+
+    print(f"\n{'case':<22}{'predict (us)':>14}{'explain (us)':>14}")
+    for name, rows, repeat in (("single row", X[:1], 500), ("batch 5k", X, 5)):
+        p = timeit(lambda: engine.predict_positive(rows), repeat)
+        e = timeit(lambda: explainer.explain(rows), repeat)
+        print(f"{name:<22}{p:>14.1f}{e:>14.1f}")
+
+    sys.exit(0 if prob_err < TOLERANCE and sum_err < TOLERANCE else 1)
+
+
+if __name__ == "__main__":
+    main()
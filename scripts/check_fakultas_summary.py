@@ -0,0 +1,90 @@
+"""Check that risk summaries find the fakultas of predictions written by the
+app (prediction_repository: fakultas filter and group_by=["fakultas"]).
+
+Predictions are built from real Student rows the way the mahasiswa
+dashboard does (auth_service profile -> save_prediction), so their kelas
+is Student.kelas_code, the kelas id; one extra row carries a kelas code
+like older rows. An FE kelas whose code equals the id of the FT kelas
+checks that the id match wins and no prediction is counted twice.
+Everything runs in a throwaway SQLite database.
+
+Usage: python scripts/check_fakultas_summary.py
+Exits with status 1 when a fakultas count is empty or wrong.
+"""
+import os
+import sys
+import tempfile
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ROOT_DIR)
+
+DB_PATH = os.path.join(tempfile.gettempdir(), "check_fakultas_summary.sqlite")
+
+
+def main():
+    if os.path.exists(DB_PATH):
+        os.remove(DB_PATH)
+    os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+
+    from app import create_app
+    from extensions import db
+    from models.db_models import Fakultas, Kelas, Student
+    from models.prediction_repository import count_by_risk, save_prediction
+    from services.auth_service import _profile_dict
+
+    app = create_app()
+    failures = []
+    with app.app_context():
+        db.create_all()
+        fakultas = {code: Fakultas(code=code, name=code) for code in ("FT", "FE")}
+        db.session.add_all(fakultas.values())
+        db.session.flush()
+        kelas = {
+            "TI-1": Kelas(code="TI-1", fakultas_id=fakultas["FT"].id),
+            "MN-1": Kelas(code="MN-1", fakultas_id=fakultas["FE"].id),
+        }
+        db.session.add_all(kelas.values())
+        db.session.flush()
+        # code that collides with the TI-1 id: predictions with that id stay FT
+        db.session.add(Kelas(code=str(kelas["TI-1"].id), fakultas_id=fakultas["FE"].id))
+        db.session.flush()
+
+        # FT: 3 students, FE: 2 students, one prediction each
+        plan = [("TI-1", "High Risk")] * 2 + [("TI-1", "Low Risk")] + [("MN-1", "Medium Risk")] * 2
+        students = []
+        for i, (code, risk) in enumerate(plan):
+            s = Student(nama_mahasiswa=f"Mahasiswa {i}", nim=f"2400{i:04d}", prodi="X",
+                        angkatan="2024", kelas_code=kelas[code].id)
+            students.append((s, risk))
+        db.session.add_all(s for s, _ in students)
+        db.session.commit()
+
+        for s, risk in students:
+            save_prediction({**_profile_dict(s), "probability": "50.0", "risk": risk})
+        # older row: kelas code instead of id
+        save_prediction({"nim": "23000001", "kelas": "MN-1", "probability": "50.0", "risk": "Low Risk"})
+
+        expected = {("FT", "High Risk"): 2, ("FT", "Low Risk"): 1, ("FE", "Medium Risk"): 2, ("FE", "Low Risk"): 1}
+        got = {(r["fakultas"], r["risk"]): r["count"] for r in count_by_risk(group_by=["fakultas"])}
+        print("group_by fakultas:", got)
+        if got != expected:
+            failures.append(f"group_by fakultas: expected {expected}, got {got}")
+
+        for code, total in (("FT", 3), ("FE", 3)):
+            n = sum(r["count"] for r in count_by_risk({"fakultas": code}))
+            print(f"filter fakultas={code}: {n}")
+            if n != total:
+                failures.append(f"filter fakultas={code}: expected {total}, got {n}")
+
+        db.session.remove()
+        db.engine.dispose()
+    os.remove(DB_PATH)
+
+    for f in failures:
+        print("FAIL", f)
+    print("OK" if not failures else f"{len(failures)} failure(s)")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Parity check: compiled inference engine vs sklearn model.predict_proba.
+
+Usage: python scripts/check_inference_engine.py [model_path]
+Exits with status 1 when any probability differs by more than
+PARITY_TOLERANCE (1e-12).
+"""
+import os
+import sys
+import warnings
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ROOT_DIR)
+warnings.filterwarnings("ignore")
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from services.inference_engine import PARITY_TOLERANCE, compile_model
+
+
+def sample_inputs(n, seed=42):
+    rng = np.random.default_rng(seed)
+    X = np.column_stack([
+        np.round(rng.uniform(0, 4, n), 2),      # ipk
+        rng.integers(0, 161, n),                # sks_lulus
+        rng.integers(0, 101, n),                # presensi
+        rng.integers(0, 10, n),                 # mengulang
+    ]).astype(float)
+    # missing values go through the imputer medians
+    X[::97, 0] = np.nan
+    X[::89, 1] = np.nan
+    return X
+
+
+def main():
+    model_path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(ROOT_DIR, "model_kelulusan.joblib")
+    model = joblib.load(model_path)
+    engine = compile_model(model)
+
+    feature_order = engine.feature_names
+    X = sample_inputs(20000)
+    # dataset rows (exact training values) and threshold edge cases
+    df = pd.read_csv(os.path.join(ROOT_DIR, "dataset_kelulusan_mahasiswa.csv"))
+    X = np.vstack([X, df[["ipk", "sks_lulus", "presensi", "mengulang"]].to_numpy(dtype=float)])
+    X = X[:, [["ipk", "sks_lulus", "presensi", "mengulang"].index(f) for f in feature_order]]
+
+    expected = model.predict_proba(pd.DataFrame(X, columns=feature_order))
+    got = engine.predict_proba(X)
+    single = np.array([engine.predict_one(*row) for row in X[:500]])
+
+    diff = np.abs(expected - got).max()
+    diff_single = np.abs(expected[:500, 1] - single).max()
+    print(f"rows checked     : {len(X)}")
+    print(f"max |diff| batch : {diff:.3e}")
+    print(f"max |diff| single: {diff_single:.3e}")
+
+    if diff > PARITY_TOLERANCE or diff_single > PARITY_TOLERANCE:
+        print(f"FAIL: compiled engine differs from model.predict_proba by more than {PARITY_TOLERANCE:.0e}")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""Bounded-memory check for prediction_repository.iter_predictions and the
+streamed Excel export (report_service.export_excel_stream).
+
+For every size a SQLite database in the temp directory is filled with
+synthetic predictions (kept, so later runs skip the insert), then the
+Python peak allocation (tracemalloc) of each case is measured:
+
+    tuples     consume iter_predictions() chunk by chunk
+    records    the same with records=True (NumPy record arrays)
+    excel      export_excel_stream() of every row to an .xlsx file
+
+Peak memory must not grow with the number of rows: the check fails when
+any case at the largest size peaks above --max-ratio times its peak at
+the smallest size.
+
+Usage:
+    python scripts/check_prediction_streaming.py [--sizes 10k,200k]
+                                                 [--chunk-size N] [--max-ratio R]
+                                                 [--skip-excel]
+
+Use e.g. --sizes 10k,1M,10M for the full range (the 10M insert takes a
+while the first time). Exits with status 1 when the check fails.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ROOT_DIR)
+
+from services.synthetic_data import parse_rows
+
+INSERT_CHUNK = 50_000
+RISKS = ("Low Risk", "Medium Risk", "High Risk")
+
+
+def seed(db, Prediction, rows: int):
+    have = db.session.query(Prediction.id).count()
+    if have >= rows:
+        return have
+    rng = random.Random(have)
+    start = datetime(2024, 1, 1)
+    table = Prediction.__table__
+    for offset in range(have, rows, INSERT_CHUNK):
+        batch = []
+        for _ in range(min(INSERT_CHUNK, rows - offset)):
+            s = rng.randrange(max(rows // 10, 1))
+            prob = round(rng.uniform(5, 99), 2)
+            ts = start + timedelta(seconds=rng.randrange(2 * 365 * 86400))
+            batch.append({
+                "id": str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+                "username": f"mhs{s:07d}",
+                "nama_mahasiswa": f"Mahasiswa {s}",
+                "nim": f"{2000000000 + s}",
+                "prodi": f"Prodi {s % 12}",
+                "angkatan": str(2018 + s % 7),
+                "kelas": f"K{s % 60:02d}",
+                "ipk": round(rng.uniform(1.5, 4.0), 2),
+                "mengulang": rng.randrange(6),
+                "presensi": rng.randrange(50, 101),
+                "sks_lulus": rng.randrange(20, 150),
+                "probability": prob,
+                "risk": RISKS[0] if prob >= 70 else RISKS[1] if prob >= 40 else RISKS[2],
+                "recommendation": "Pertahankan performa akademik.",
+                "model_version": "check",
+                "timestamp": ts,
+                "created_at": ts,
+            })
+        db.session.execute(table.insert(), batch)
+        db.session.commit()
+    return rows
+
+
+def peak_mb(fn):
+    """(peak MB, seconds, result) of ``fn`` under tracemalloc."""
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    result = fn()
+    seconds = time.perf_counter() - t0
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1e6, seconds, result
+
+
+def measure_size(rows: int, chunk_size: int, skip_excel: bool) -> dict:
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.gettempdir(), f'check_streaming_{rows}.sqlite')}"
+    from app import create_app
+    from extensions import db
+    from models.db_models import Prediction
+    from models import prediction_repository as repo
+    from models.schemas import CSV_COLUMNS
+    from services.report_service import export_excel_stream
+    from services.risk_summary import empty_summary
+
+    app = create_app()
+    out = {}
+    with app.app_context():
+        db.create_all()
+        seed(db, Prediction, rows)
+
+        def consume(**kw):
+            return sum(len(chunk) for chunk in repo.iter_predictions(chunk_size=chunk_size, **kw))
+
+        def export():
+            path = os.path.join(tempfile.gettempdir(), f"check_streaming_{rows}.xlsx")
+            chunks = repo.iter_predictions(columns=CSV_COLUMNS, chunk_size=chunk_size)
+            export_excel_stream(chunks, CSV_COLUMNS, path, empty_summary(), [])
+            return rows
+
+        out["tuples"] = peak_mb(lambda: consume())
+        out["records"] = peak_mb(lambda: consume(records=True))
+        if not skip_excel:
+            out["excel"] = peak_mb(export)
+        db.session.remove()
+        db.engine.dispose()
+    return out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cek memori iter_predictions: puncak tidak tumbuh dengan jumlah baris")
+    parser.add_argument("--sizes", default="10k,200k")
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--max-ratio", type=float, default=2.0)
+    parser.add_argument("--skip-excel", action="store_true")
+    args = parser.parse_args(argv)
+    sizes = sorted(parse_rows(s) for s in args.sizes.split(","))
+
+    results = {}
+    for rows in sizes:
+        results[rows] = measure_size(rows, args.chunk_size, args.skip_excel)
+
+    print(f"chunk size {args.chunk_size:,}")
+    print(f"{'rows':>12}{'case':>10}{'read':>12}{'seconds':>10}{'peak MB':>10}")
+    for rows in sizes:
+        for case, (peak, seconds, n) in results[rows].items():
+            print(f"{rows:>12,}{case:>10}{n:>12,}{seconds:>10.2f}{peak:>10.1f}")
+
+    failed = False
+    smallest, largest = sizes[0], sizes[-1]
+    for case in results[smallest]:
+        base, top = results[smallest][case][0], results[largest][case][0]
+        ratio = top / base if base else float("inf")
+        ok = ratio <= args.max_ratio
+        failed |= not ok
+        print(f"{case}: peak {base:.1f} MB -> {top:.1f} MB (x{ratio:.2f}) {'OK' if ok else 'FAIL'}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
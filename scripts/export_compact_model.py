@@ -0,0 +1,85 @@
+"""Export a trained model to the compact binary format and check parity.
+
+Usage:
+    python scripts/export_compact_model.py [model_path] [--precision exact|float32]
+                                           [--check-only]
+
+Writes ``<model>.compact.bin`` next to the joblib file (train_model.py
+does this automatically) and compares it with the joblib model on random
+inputs plus every dataset row. Exits with status 1 when an exact export
+differs by more than the engine's parity tolerance (1e-12) or a float32
+export by more than 1e-6.
+"""
+import argparse
+import os
+import sys
+import time
+import warnings
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ROOT_DIR)
+warnings.filterwarnings("ignore")
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from services.compact_model import (
+    PRECISIONS,
+    compact_path_for,
+    export_compact,
+    load_compact,
+    read_header,
+    sample_inputs,
+    validate_compact,
+)
+from services.inference_engine import PARITY_TOLERANCE, compile_model
+from services.model_loader import artifact_version
+
+FLOAT32_TOLERANCE = 1e-6
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export/validasi model compact")
+    parser.add_argument("model", nargs="?", default=os.path.join(ROOT_DIR, "model_kelulusan.joblib"))
+    parser.add_argument("--precision", choices=sorted(PRECISIONS), default="exact")
+    parser.add_argument("--check-only", action="store_true", help="validasi file yang sudah ada")
+    args = parser.parse_args(argv)
+
+    path = compact_path_for(args.model)
+    t0 = time.perf_counter()
+    model = joblib.load(args.model)
+    compiled = compile_model(model)
+    joblib_seconds = time.perf_counter() - t0
+
+    if not args.check_only:
+        report = export_compact(compiled, path, artifact_version(args.model), args.precision,
+                                source=os.path.basename(args.model))
+        print(f"exported           : {path} ({report['precision']}, {report['nodes']:,} nodes)")
+
+    header = read_header(path)
+    _, loaded = load_compact(path)
+    joblib_bytes, compact_bytes = os.path.getsize(args.model), os.path.getsize(path)
+    print(f"model version      : {header['model_version']} (from {header['source_version']})")
+    print(f"size               : {compact_bytes / 1e3:.0f} KB vs {joblib_bytes / 1e3:.0f} KB joblib "
+          f"({joblib_bytes / compact_bytes:.1f}x smaller)")
+    print(f"load + compile     : {loaded['load_seconds'] * 1e3:.1f} ms vs {joblib_seconds * 1e3:.1f} ms joblib "
+          f"(map {loaded['map_seconds'] * 1e3:.1f} ms, decode {loaded['decode_seconds'] * 1e3:.1f} ms, "
+          f"mask tables {loaded['build_seconds'] * 1e3:.1f} ms)")
+
+    X = sample_inputs(compiled.feature_names, 20000)
+    df = pd.read_csv(os.path.join(ROOT_DIR, "dataset_kelulusan_mahasiswa.csv"))
+    X = np.vstack([X, df[compiled.feature_names].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)])
+    result = validate_compact(model, path, X)
+    print(f"rows checked       : {result['rows']:,}")
+    print(f"max |diff|         : {result['max_abs_diff']:.3e} ({result['mismatched_rows']:,} rows differ)")
+
+    tolerance = PARITY_TOLERANCE if header["precision"] == "exact" else FLOAT32_TOLERANCE
+    if result["max_abs_diff"] > tolerance:
+        print("FAIL: compact model does not match the joblib model")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
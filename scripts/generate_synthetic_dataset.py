@@ -0,0 +1,49 @@
+"""Generate a synthetic training dataset shaped like dataset_kelulusan_mahasiswa.csv.
+
+Usage:
+    python scripts/generate_synthetic_dataset.py ROWS [--out PATH] [--seed N]
+                                                 [--chunk-rows N] [--segments COLUMN=V1,V2,...]
+
+ROWS accepts suffixes: 10k, 1M, 10M. The output has the same columns as
+the real dataset (see services/synthetic_data.py for how they are drawn)
+and is written in chunks, so memory use does not grow with ROWS.
+--segments adds a segment column whose values label rows with their own
+label model, e.g. --segments fakultas=FTI,FEB,FISIP.
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ROOT_DIR)
+
+from services.synthetic_data import CHUNK_ROWS, load_profile, parse_rows, write_csv
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Buat dataset sintetis prediksi kelulusan")
+    parser.add_argument("rows", type=parse_rows)
+    parser.add_argument("--out", help="default: dataset_sintetis_<rows>.csv")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--segments", help="kolom segmen dan nilainya, mis. fakultas=FTI,FEB,FISIP")
+    args = parser.parse_args(argv)
+
+    segments = None
+    if args.segments:
+        column, _, values = args.segments.partition("=")
+        if not column or not values:
+            parser.error("--segments harus berbentuk KOLOM=NILAI1,NILAI2")
+        segments = (column.strip(), [v.strip() for v in values.split(",") if v.strip()])
+
+    out = args.out or f"dataset_sintetis_{args.rows}.csv"
+    t0 = time.perf_counter()
+    profile = load_profile(os.path.join(ROOT_DIR, "dataset_kelulusan_mahasiswa.csv"))
+    report = write_csv(out, args.rows, args.seed, profile, args.chunk_rows, segments)
+    print(f"{report['rows']:,} rows -> {out} ({report['file_bytes'] / 1e6:.1f} MB) in {time.perf_counter() - t0:.1f} s")
+    print(f"positive rate: {report['positive_rate']} (source: {report['source_positive_rate']})")
+
+
+if __name__ == "__main__":
+    main()
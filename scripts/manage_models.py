@@ -0,0 +1,43 @@
+"""Inspect and switch versions in the local model registry.
+
+Usage:
+    python scripts/manage_models.py list
+    python scripts/manage_models.py activate <version>
+    python scripts/manage_models.py publish <model.joblib> [summary.json]
+
+Running servers pick up a new ACTIVE version within MODEL_CHECK_INTERVAL
+seconds without a restart.
+"""
+import os
+import sys
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ROOT_DIR)
+
+from services import model_registry
+
+
+def main(argv):
+    if not argv or argv[0] == "list":
+        versions = model_registry.list_versions()
+        if not versions:
+            print(f"No versions in {model_registry.REGISTRY_DIR}/")
+        for v in versions:
+            metrics = v.get("summary", {}).get("metrics", {}).get("test_calibrated", {})
+            auc = metrics.get("roc_auc")
+            mark = "*" if v["active"] else " "
+            auc_txt = f"test AUC {auc:.4f}" if auc is not None else ""
+            print(f"{mark} {v['version']}  {v['created_at']}  {auc_txt}")
+    elif argv[0] == "activate" and len(argv) == 2:
+        model_registry.activate(argv[1])
+        print(f"Active version: {argv[1]}")
+    elif argv[0] == "publish" and len(argv) in (2, 3):
+        version = model_registry.publish(argv[1], argv[2] if len(argv) == 3 else None)
+        print(f"Published and activated: {version}")
+    else:
+        print(__doc__)
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,63 @@
+"""Re-score every student's latest prediction inputs with a new model.
+
+Usage:
+    python scripts/rescore_predictions.py [--model PATH] [--chunk-size N]
+                                          [--checkpoint FILE] [--restart]
+
+Without --model the served model is used (registry ACTIVE version, else
+MODEL_PATH). An interrupted run continues from its checkpoint when started
+again with the same model; --restart ignores the checkpoint (students that
+already have a row for this model version are still skipped).
+train_model.py --rescore starts this script in the background.
+"""
+import argparse
+import os
+import sys
+import warnings
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ROOT_DIR)
+warnings.filterwarnings("ignore")
+
+from app import create_app
+from services.model_loader import load_bundle, warm_up
+from services.rescore_service import RESCORE_CHECKPOINT, RESCORE_CHUNK_SIZE, rescore_all
+
+
+def print_progress(report):
+    total = report.get("remaining_at_start") or 0
+    rate = report.get("rate_per_minute")
+    print(
+        f"[{report['updated_at']}] chunk {report['chunks']}: {report['rescored']:,} rescored"
+        f" (of <= {total:,}), last nim {report['last_nim']}"
+        + (f", {rate:,}/min" if rate else ""),
+        flush=True,
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Re-score prediksi terakhir setiap mahasiswa")
+    parser.add_argument("--model", help="artifact model (default: model yang sedang dilayani)")
+    parser.add_argument("--chunk-size", type=int, default=RESCORE_CHUNK_SIZE)
+    parser.add_argument("--checkpoint", default=RESCORE_CHECKPOINT)
+    parser.add_argument("--restart", action="store_true", help="abaikan checkpoint")
+    args = parser.parse_args(argv)
+
+    app = create_app()
+    with app.app_context():
+        bundle = warm_up(load_bundle(args.model)) if args.model else None
+        report = rescore_all(
+            bundle,
+            chunk_size=args.chunk_size,
+            checkpoint_path=args.checkpoint,
+            resume=not args.restart,
+            progress=print_progress,
+        )
+
+    rate = report.get("rate_per_minute")
+    print(f"\nDone: {report['rescored']:,} students on model {report['model_version']}"
+          f" in {report['seconds']} s" + (f" ({rate:,}/min)" if rate else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -34,31 +34,63 @@ def create_user(username: str, password: str, role: str = "mahasiswa") -> User:
     return u
 
 
+def _profile_dict(s: Student) -> Dict:
+    return {
+        "nama_mahasiswa": s.nama_mahasiswa,
+        "nim": s.nim,
+        "prodi": s.prodi,
+        "angkatan": s.angkatan,
+        "kelas": s.kelas_code,
+    }
+
+
 def get_student_profile_by_username(username: str) -> Optional[Dict]:
     """Return a dict similar to previous STUDENT_PROFILES value or None."""
     user = get_user_by_username(username)
     if user and getattr(user, "student", None):
-        s = user.student
-        return {
-            "nama_mahasiswa": s.nama_mahasiswa,
-            "nim": s.nim,
-            "prodi": s.prodi,
-            "angkatan": s.angkatan,
-            "kelas": s.kelas_code,
-        }
+        return _profile_dict(user.student)
     # fallback: try find student by nim=username
     s = Student.query.filter_by(nim=str(username).strip()).first()
     if s:
-        return {
-            "nama_mahasiswa": s.nama_mahasiswa,
-            "nim": s.nim,
-            "prodi": s.prodi,
-            "angkatan": s.angkatan,
-            "kelas": s.kelas_code,
-        }
+        return _profile_dict(s)
     return None
 
 
+# keep IN (...) lists well below driver parameter limits
+PROFILE_LOOKUP_CHUNK = 1000
+
+
+def get_student_profiles_by_usernames(usernames) -> Dict[str, Dict]:
+    """Batched get_student_profile_by_username.
+
+    Resolves every username with at most two queries per chunk (by user,
+    then by nim for the leftovers) instead of two queries per username.
+    Usernames without a profile are absent from the returned dict.
+    """
+    wanted = list(dict.fromkeys(str(u).strip() for u in usernames if u))
+    profiles: Dict[str, Dict] = {}
+
+    for i in range(0, len(wanted), PROFILE_LOOKUP_CHUNK):
+        chunk = wanted[i:i + PROFILE_LOOKUP_CHUNK]
+
+        pairs = (
+            db.session.query(User.username, Student)
+            .join(Student, Student.user_id == User.id)
+            .filter(User.username.in_(chunk))
+            .all()
+        )
+        for username, s in pairs:
+            profiles[username] = _profile_dict(s)
+
+        # fallback: try find student by nim=username
+        rest = [u for u in chunk if u not in profiles]
+        if rest:
+            for s in Student.query.filter(Student.nim.in_(rest)).all():
+                profiles[s.nim] = _profile_dict(s)
+
+    return profiles
+
+
 def get_class_by_code(code: str) -> Optional[ClassModel]:
     if not code:
         return None
@@ -0,0 +1,136 @@
+"""Micro-batching of concurrent single-row predictions.
+
+Request threads hand their feature row to a PredictionBatcher and block
+on a Future. One background thread collects rows for up to ``window_ms``
+after the first one arrives (or until ``max_batch`` rows are queued),
+scores them with a single batched call and resolves every Future.
+
+Rows are grouped by the model bundle they were submitted with, so a hot
+swap in the middle of a window never scores a request with a different
+model than the one it started with.
+
+Environment:
+    PREDICTION_BATCHING         "1" enables coalescing (default: off)
+    PREDICTION_BATCH_WINDOW_MS  collection window (default: 2)
+    PREDICTION_BATCH_MAX        rows per batch (default: 64)
+"""
+import os
+import queue
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import Future
+
+import numpy as np
+
+PREDICTION_BATCHING = os.environ.get("PREDICTION_BATCHING") == "1"
+PREDICTION_BATCH_WINDOW_MS = float(os.environ.get("PREDICTION_BATCH_WINDOW_MS", "2"))
+PREDICTION_BATCH_MAX = int(os.environ.get("PREDICTION_BATCH_MAX", "64"))
+
+# recent queue waits kept for percentiles
+LATENCY_SAMPLES = 10000
+
+
+class PredictionBatcher:
+    def __init__(self, predict_fn, window_ms: float = PREDICTION_BATCH_WINDOW_MS,
+                 max_batch: int = PREDICTION_BATCH_MAX):
+        """``predict_fn(X, bundle)`` returns one probability per row of X."""
+        self.predict_fn = predict_fn
+        self.window = window_ms / 1000.0
+        self.max_batch = max_batch
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+        self._stats_lock = threading.Lock()
+        self.batch_sizes = Counter()
+        self.queue_waits = deque(maxlen=LATENCY_SAMPLES)
+        self.rows = 0
+        self.batches = 0
+
+    def _ensure_thread(self):
+        # (re)start after fork: threads do not survive into gunicorn workers
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+                self._queue = queue.Queue()
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name="prediction-batcher", daemon=True)
+                self._thread.start()
+
+    def submit(self, row, bundle) -> Future:
+        self._ensure_thread()
+        future = Future()
+        self._queue.put((np.asarray(row, dtype=np.float64), bundle, future, time.perf_counter()))
+        return future
+
+    def predict(self, row, bundle) -> float:
+        return self.submit(row, bundle).result()
+
+    def _collect(self):
+        first = self._queue.get()
+        batch = [first]
+        deadline = first[3] + self.window
+        while len(batch) < self.max_batch:
+            timeout = deadline - time.perf_counter()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        # drain whatever is already waiting, up to the batch limit
+        while len(batch) < self.max_batch:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            started = time.perf_counter()
+
+            groups = {}
+            for item in batch:
+                groups.setdefault(id(item[1]), []).append(item)
+
+            for items in groups.values():
+                bundle = items[0][1]
+                try:
+                    probs = self.predict_fn(np.vstack([it[0] for it in items]), bundle)
+                except Exception as e:
+                    for it in items:
+                        it[2].set_exception(e)
+                    continue
+                for it, prob in zip(items, probs):
+                    it[2].set_result(float(prob))
+
+            with self._stats_lock:
+                self.batches += 1
+                self.rows += len(batch)
+                self.batch_sizes[len(batch)] += 1
+                self.queue_waits.extend(started - it[3] for it in batch)
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            waits = np.array(self.queue_waits) * 1e6
+            sizes = dict(sorted(self.batch_sizes.items()))
+            return {
+                "window_ms": self.window * 1000.0,
+                "max_batch": self.max_batch,
+                "batches": self.batches,
+                "rows": self.rows,
+                "mean_batch_size": round(self.rows / self.batches, 2) if self.batches else 0.0,
+                "batch_size_distribution": sizes,
+                "queue_wait_us": {
+                    "p50": float(np.percentile(waits, 50)) if len(waits) else 0.0,
+                    "p90": float(np.percentile(waits, 90)) if len(waits) else 0.0,
+                    "p99": float(np.percentile(waits, 99)) if len(waits) else 0.0,
+                    "max": float(waits.max()) if len(waits) else 0.0,
+                },
+            }
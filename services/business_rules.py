@@ -0,0 +1,175 @@
+"""Business rules and risk classification over whole arrays.
+
+The rules that correct the model probability with academic logic are
+declared as data (BUSINESS_RULES): each rule is a list of conditions on
+input fields, joined with "all" or "any", and a clamp applied to the rows
+that match ("floor" raises the probability to at least ``value``, "ceil"
+caps it). Rules run in order, so a later cap wins over an earlier floor.
+
+apply_rules evaluates every rule as one NumPy mask over the batch;
+apply_rules_one walks the same table for a single dict, for the
+per-request path where array set-up would dominate. Fields the caller
+does not supply take their value from DEFAULT_CONTEXT.
+"""
+import operator
+from typing import Mapping
+
+import numpy as np
+
+# default akademik untuk field yang belum diinput mahasiswa
+DEFAULT_CONTEXT = {
+    "semester_aktif": 8,
+    "status_skripsi": 1,
+    "status_administrasi": 1,
+    "bekerja": 0,
+    "cuti": 0,
+}
+
+BUSINESS_RULES = (
+    {
+        # mahasiswa sehat akademik
+        "name": "sehat_akademik",
+        "when": "all",
+        "conditions": [
+            ("ipk", ">=", 3.5),
+            ("sks_lulus", ">=", 120),
+            ("presensi", ">=", 90),
+            ("status_skripsi", "==", 1),
+            ("cuti", "==", 0),
+        ],
+        "action": "floor",
+        "value": 0.60,
+    },
+    {
+        # hampir lulus
+        "name": "hampir_lulus",
+        "when": "all",
+        "conditions": [
+            ("sks_lulus", ">=", 144),
+            ("status_skripsi", "==", 1),
+            ("semester_aktif", "<=", 8),
+        ],
+        "action": "floor",
+        "value": 0.75,
+    },
+    {
+        # red-flag akademik (biar tetap jujur)
+        "name": "red_flag",
+        "when": "any",
+        "conditions": [
+            ("semester_aktif", ">", 10),
+            ("cuti", "==", 1),
+            ("status_administrasi", "==", 0),
+        ],
+        "action": "ceil",
+        "value": 0.30,
+    },
+)
+
+# (minimum probability, label), highest first; below every threshold -> LOWEST_RISK_LABEL
+RISK_THRESHOLDS = (
+    (0.85, "Low Risk"),
+    (0.60, "Medium Risk"),
+)
+LOWEST_RISK_LABEL = "High Risk"
+
+RECOMMENDATIONS = {
+    "Low Risk": "Pertahankan performa akademik dan tingkatkan konsistensi belajar.",
+    "Medium Risk": "Disarankan bimbingan akademik rutin dan evaluasi strategi belajar.",
+    "High Risk": "Perlu intervensi: konseling, pendampingan intensif, dan monitoring berkala.",
+}
+
+OPERATORS = {
+    ">=": operator.ge,
+    ">": operator.gt,
+    "<=": operator.le,
+    "<": operator.lt,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+
+# index 0 = above every threshold, last = below all of them
+RISK_LABELS = np.array([label for _, label in RISK_THRESHOLDS] + [LOWEST_RISK_LABEL], dtype=object)
+RECOMMENDATION_TEXTS = np.array([RECOMMENDATIONS[label] for label in RISK_LABELS], dtype=object)
+
+
+# ======================================================
+# BUSINESS RULES
+# ======================================================
+def _column(columns: Mapping, field: str, n: int) -> np.ndarray:
+    if field in columns:
+        return np.asarray(columns[field])
+    return np.full(n, DEFAULT_CONTEXT[field])
+
+
+def rule_mask(rule: dict, columns: Mapping, n: int) -> np.ndarray:
+    """Rows of the batch that match ``rule``."""
+    masks = [OPERATORS[op](_column(columns, field, n), value) for field, op, value in rule["conditions"]]
+    if rule["when"] == "any":
+        return np.logical_or.reduce(masks)
+    return np.logical_and.reduce(masks)
+
+
+def apply_rules(probs, columns: Mapping, rules=BUSINESS_RULES) -> np.ndarray:
+    """Corrected probabilities for a batch.
+
+    ``columns`` maps field names to arrays of the same length as ``probs``
+    (a dict of arrays or a DataFrame); missing fields use DEFAULT_CONTEXT.
+    """
+    probs = np.array(probs, dtype=float)
+    n = len(probs)
+    for rule in rules:
+        mask = rule_mask(rule, columns, n)
+        clamp = np.maximum if rule["action"] == "floor" else np.minimum
+        probs = np.where(mask, clamp(probs, rule["value"]), probs)
+    return probs
+
+
+def apply_rules_one(prob: float, data: Mapping, rules=BUSINESS_RULES) -> float:
+    """Scalar apply_rules for one input dict."""
+    for rule in rules:
+        hits = (
+            OPERATORS[op](data[field] if field in data else DEFAULT_CONTEXT[field], value)
+            for field, op, value in rule["conditions"]
+        )
+        if any(hits) if rule["when"] == "any" else all(hits):
+            prob = max(prob, rule["value"]) if rule["action"] == "floor" else min(prob, rule["value"])
+    return prob
+
+
+# ======================================================
+# RISK & REKOMENDASI
+# ======================================================
+def classify_risk(prob: float) -> str:
+    for threshold, label in RISK_THRESHOLDS:
+        if prob >= threshold:
+            return label
+    return LOWEST_RISK_LABEL
+
+
+def risk_index(probs) -> np.ndarray:
+    """Position in RISK_LABELS for every probability: one mask per threshold."""
+    probs = np.asarray(probs, dtype=float)
+    idx = np.full(probs.shape, len(RISK_THRESHOLDS))
+    for i, (threshold, _) in reversed(list(enumerate(RISK_THRESHOLDS))):
+        idx[probs >= threshold] = i
+    return idx
+
+
+def classify_risk_many(probs) -> np.ndarray:
+    """Vectorized classify_risk."""
+    return RISK_LABELS[risk_index(probs)]
+
+
+def recommendation(risk: str) -> str:
+    return RECOMMENDATIONS[risk]
+
+
+def assess(probs, columns: Mapping, rules=BUSINESS_RULES):
+    """Rules, risk and recommendation for a whole batch in one pass.
+
+    Returns (corrected probabilities, risk labels, recommendations).
+    """
+    probs = apply_rules(probs, columns, rules)
+    idx = risk_index(probs)
+    return probs, RISK_LABELS[idx], RECOMMENDATION_TEXTS[idx]
@@ -0,0 +1,301 @@
+"""Out-of-core training on datasets too large for one DataFrame.
+
+The source (a CSV file or a table/query behind a database URL) is read in
+chunks of CHUNK_ROWS rows; only the feature and target columns are kept,
+coerced like train_model.prepare_features and downcast (features float32,
+target int8), so one chunk is ~17 bytes per row whatever the file holds.
+
+Splitting is stratified and single-pass: the rows of each class are cut
+into consecutive blocks of ten and every block sends eight rows to train,
+one to validation and one to test, at positions fixed by a hash of the
+block number. Every class therefore lands 80/10/10 (to within one block)
+and cohorts or semesters are spread evenly however the file is ordered.
+Validation and test rows stay in memory; training rows are appended to
+temporary binary files and read back in blocks.
+
+The forest is built incrementally: one warm_start RandomForest grows a
+share of its trees on each training chunk (a strided sample of the
+spilled rows), so peak memory is set by the chunk size, not the dataset.
+The result is the usual Pipeline(SimpleImputer, RandomForestClassifier), so calibration, the
+compiled engine, the grid and the compact export all apply unchanged.
+The imputer medians are exact: one pass over the spilled rows merges the
+per-block value counts of every column, so their memory grows with the
+number of distinct values (a few hundred for IPK at 0.01 steps and the
+integer counts), not with rows; a truly continuous column would make it
+O(rows) again.
+
+Environment:
+    TRAIN_CHUNK_ROWS  rows per read/fit chunk (default: 1000000)
+"""
+import math
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.impute import SimpleImputer
+from sklearn.pipeline import Pipeline
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+CHUNK_ROWS = int(os.environ.get("TRAIN_CHUNK_ROWS", "1000000"))
+
+BLOCK = 10
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far (None if unknown)."""
+    if resource is None:
+        return None
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+# ======================================================
+# INGESTION
+# ======================================================
+def iter_source(source: str, columns: list, chunk_rows: int = CHUNK_ROWS, table: str = None):
+    """Yield raw DataFrame chunks of ``columns`` from a CSV path or, when
+    ``source`` is a database URL, from ``table`` (a table name or SELECT)."""
+    if "://" not in source:
+        yield from pd.read_csv(source, usecols=columns, chunksize=chunk_rows)
+        return
+
+    from sqlalchemy import create_engine, text
+
+    if not table:
+        raise ValueError("A database source needs a table name or query")
+    query = table if table.lstrip().lower().startswith("select") else f"SELECT {', '.join(columns)} FROM {table}"
+    engine = create_engine(source)
+    try:
+        with engine.connect() as conn:
+            conn = conn.execution_options(stream_results=True, yield_per=chunk_rows)
+            yield from pd.read_sql_query(text(query), conn, chunksize=chunk_rows)
+    finally:
+        engine.dispose()
+
+
+def downcast_chunk(df: pd.DataFrame, features: list, target: str):
+    """(float32 feature matrix, int8 target) for one raw chunk."""
+    X = np.empty((len(df), len(features)), dtype=np.float32)
+    for j, col in enumerate(features):
+        X[:, j] = pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=np.float32, na_value=np.nan)
+    y = pd.to_numeric(df[target], errors="coerce")
+    keep = y.notna().to_numpy()
+    return X[keep], y[keep].to_numpy().astype(np.int8)
+
+
+# ======================================================
+# SPLIT
+# ======================================================
+def _block_hash(blocks: np.ndarray, seed: int) -> np.ndarray:
+    """splitmix64 of (seed, block, slot) for every slot of every block."""
+    z = (blocks.astype(np.uint64)[:, None] * np.uint64(BLOCK) + np.arange(BLOCK, dtype=np.uint64)
+         + np.uint64(seed) * np.uint64(0x9E3779B97F4A7C15))
+    with np.errstate(over="ignore"):
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+class StratifiedStreamSplitter:
+    """Assigns streamed rows to train (0) / val (1) / test (2), 8:1:1 per class."""
+
+    def __init__(self, seed: int = 42):
+        self.seed = seed
+        self.seen = {}
+
+    def assign(self, y: np.ndarray) -> np.ndarray:
+        codes = np.zeros(len(y), dtype=np.int8)
+        for c in np.unique(y):
+            idx = np.flatnonzero(y == c)
+            pos = self.seen.get(int(c), 0) + np.arange(len(idx))
+            self.seen[int(c)] = int(pos[-1]) + 1
+            blocks, slot = np.divmod(pos, BLOCK)
+            uniq, inv = np.unique(blocks, return_inverse=True)
+            # slot with the lowest hash -> val, second lowest -> test
+            rank = np.argsort(np.argsort(_block_hash(uniq + int(c) * (1 << 40), self.seed), axis=1), axis=1)
+            r = rank[inv, slot]
+            codes[idx] = np.where(r == 0, 1, np.where(r == 1, 2, 0))
+        return codes
+
+
+def stream_splits(source: str, features: list, target: str, train_rows: "SpilledRows", chunk_rows: int = CHUNK_ROWS,
+                  table: str = None, seed: int = 42) -> dict:
+    """Read the source once: training rows go to ``train_rows``, validation
+    and test rows are returned as in-memory arrays."""
+    splitter = StratifiedStreamSplitter(seed)
+    held = {"val": ([], []), "test": ([], [])}
+    rows = chunks = 0
+
+    train_rows.open()
+    try:
+        for raw in iter_source(source, features + [target], chunk_rows, table):
+            X, y = downcast_chunk(raw, features, target)
+            del raw
+            codes = splitter.assign(y)
+            train_rows.append(X[codes == 0], y[codes == 0])
+            for code, name in ((1, "val"), (2, "test")):
+                held[name][0].append(X[codes == code])
+                held[name][1].append(y[codes == code])
+            rows += len(y)
+            chunks += 1
+    finally:
+        train_rows.close()
+
+    if not train_rows.rows:
+        raise ValueError(f"No training rows read from {source}")
+
+    out = {"rows": rows, "chunks": chunks}
+    for name, (xs, ys) in held.items():
+        out[name] = (np.concatenate(xs), np.concatenate(ys))
+    return out
+
+
+# ======================================================
+# INCREMENTAL FOREST
+# ======================================================
+class SpilledRows:
+    """Training rows appended to raw binary files, read back in blocks
+    (plain reads rather than a mapping, so resident memory stays at one
+    block however large the files are)."""
+
+    def __init__(self, directory: str, n_features: int):
+        self.x_path = os.path.join(directory, "train_X.f32")
+        self.y_path = os.path.join(directory, "train_y.i8")
+        self.n_features = n_features
+        self.rows = 0
+        self.classes = set()
+
+    def open(self):
+        self._fx, self._fy = open(self.x_path, "wb"), open(self.y_path, "wb")
+        return self
+
+    def append(self, X: np.ndarray, y: np.ndarray):
+        self._fx.write(np.ascontiguousarray(X, dtype=np.float32).tobytes())
+        self._fy.write(np.ascontiguousarray(y, dtype=np.int8).tobytes())
+        self.rows += len(y)
+        self.classes.update(int(c) for c in np.unique(y))
+
+    def close(self):
+        self._fx.close()
+        self._fy.close()
+
+    def blocks(self, block_rows: int = CHUNK_ROWS):
+        """Yield (start row, X, y) blocks in file order."""
+        with open(self.x_path, "rb") as fx, open(self.y_path, "rb") as fy:
+            for start in range(0, self.rows, block_rows):
+                n = min(block_rows, self.rows - start)
+                X = np.fromfile(fx, dtype=np.float32, count=n * self.n_features).reshape(n, self.n_features)
+                yield start, X, np.fromfile(fy, dtype=np.int8, count=n)
+
+    def medians(self, block_rows: int = CHUNK_ROWS) -> np.ndarray:
+        """Exact per-column median (NaN ignored) from merged value counts."""
+        values = [np.empty(0, dtype=np.float32)] * self.n_features
+        counts = [np.empty(0, dtype=np.int64)] * self.n_features
+        for _, X, _ in self.blocks(block_rows):
+            for j in range(self.n_features):
+                col = X[:, j]
+                v, n = np.unique(col[~np.isnan(col)], return_counts=True)
+                merged, inv = np.unique(np.concatenate([values[j], v]), return_inverse=True)
+                counts[j] = np.bincount(inv, weights=np.concatenate([counts[j], n]), minlength=len(merged)).astype(np.int64)
+                values[j] = merged
+
+        out = np.full(self.n_features, np.nan)
+        for j in range(self.n_features):
+            total = int(counts[j].sum())
+            if not total:
+                continue
+            cum = np.cumsum(counts[j])
+            lo = values[j][np.searchsorted(cum, (total - 1) // 2, side="right")]
+            hi = values[j][np.searchsorted(cum, total // 2, side="right")]
+            out[j] = (float(lo) + float(hi)) / 2
+        return out
+
+    def strided(self, offset: int, step: int, block_rows: int = CHUNK_ROWS):
+        """Rows offset, offset + step, ...: a sample spread over the whole file."""
+        xs, ys = [], []
+        for start, X, y in self.blocks(block_rows):
+            first = (offset - start) % step
+            xs.append(X[first::step].copy())
+            ys.append(y[first::step].copy())
+        return np.concatenate(xs), np.concatenate(ys)
+
+
+def fit_incremental_forest(forest, rows: SpilledRows, medians, n_estimators: int, chunk_rows: int = CHUNK_ROWS):
+    """Grow ``forest`` (unfitted RandomForestClassifier) to ``n_estimators``
+    trees, an equal share on each training chunk. Chunk i holds every
+    n_chunks-th row starting at i, so each chunk samples the whole file
+    rather than whatever cohort happens to be stored next to each other.
+    Chunks grow when needed so every row is used by at least one tree.
+    Every chunk must hold every class of the training rows, or its trees
+    would be fitted on a different ``classes_``; a chunk that misses one
+    raises ValueError."""
+    chunk_rows = max(chunk_rows, math.ceil(rows.rows / n_estimators))
+    n_chunks = max(1, math.ceil(rows.rows / chunk_rows))
+    per_chunk = n_estimators // n_chunks
+    extra = n_estimators % n_chunks
+    forest = clone(forest).set_params(warm_start=True, n_estimators=0)
+
+    for i in range(n_chunks):
+        X_chunk, y_chunk = rows.strided(i, n_chunks, chunk_rows)
+        missing = rows.classes - {int(c) for c in np.unique(y_chunk)}
+        if missing:
+            raise ValueError(
+                f"Training chunk {i + 1}/{n_chunks} has no rows of class {sorted(missing)}; "
+                "use fewer, larger chunks (TRAIN_CHUNK_ROWS)"
+            )
+        nan = np.isnan(X_chunk)
+        if nan.any():
+            X_chunk[nan] = np.take(medians, np.nonzero(nan)[1])
+        forest.set_params(n_estimators=forest.n_estimators + per_chunk + (1 if i < extra else 0))
+        forest.fit(X_chunk, y_chunk)
+        del X_chunk, y_chunk, nan
+
+    forest.set_params(warm_start=False)
+    return forest, n_chunks
+
+
+def train_out_of_core(source: str, features: list, target: str, base_pipeline: Pipeline, n_estimators: int = None,
+                      chunk_rows: int = CHUNK_ROWS, table: str = None, seed: int = 42,
+                      train_sample_rows: int = 100_000):
+    """Stream, split and fit. Returns (pipeline, splits dict, report);
+    splits["train_sample"] holds up to ``train_sample_rows`` training
+    inputs spread over the whole training set."""
+    t0 = time.perf_counter()
+    forest = base_pipeline.named_steps["clf"]
+    n_estimators = n_estimators or forest.n_estimators
+
+    with tempfile.TemporaryDirectory(prefix="train_ooc_") as spill_dir:
+        rows = SpilledRows(spill_dir, len(features))
+        splits = stream_splits(source, features, target, rows, chunk_rows, table, seed)
+        ingest_seconds = time.perf_counter() - t0
+
+        medians = rows.medians(chunk_rows)
+        imputer = SimpleImputer(strategy="median").fit(pd.DataFrame([medians], columns=features))
+
+        t_fit = time.perf_counter()
+        clf, fit_chunks = fit_incremental_forest(forest, rows, medians.astype(np.float32), n_estimators, chunk_rows)
+        fit_seconds = time.perf_counter() - t_fit
+
+        step = max(1, math.ceil(rows.rows / train_sample_rows))
+        splits["train_sample"] = rows.strided(0, step, chunk_rows)[0]
+
+    pipeline = Pipeline([("imputer", imputer), ("clf", clf)])
+    report = {
+        "source": source if "://" not in source else source.split("://", 1)[0] + "://...",
+        "rows": splits["rows"],
+        "read_chunks": splits["chunks"],
+        "chunk_rows": chunk_rows,
+        "fit_chunks": fit_chunks,
+        "split_rows": {"train": rows.rows, "val": len(splits["val"][1]), "test": len(splits["test"][1])},
+        "trees": len(clf.estimators_),
+        "ingest_seconds": round(ingest_seconds, 2),
+        "fit_seconds": round(fit_seconds, 2),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+    return pipeline, splits, report
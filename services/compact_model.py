@@ -0,0 +1,277 @@
+"""Compact binary model artifact for the compiled inference engine.
+
+The joblib pickle carries every sklearn object with float64 thresholds,
+int64 child arrays, per-class node values and bookkeeping the engine
+never reads. ``<model>.compact.bin`` keeps only what CompiledModel needs:
+
+- thresholds as float32, rounded *down*: the trees compare float32 inputs
+  (``x <= t``), and for a float32 x that test gives the same answer
+  against the largest float32 <= t, so no decision changes;
+- per node a uint16 (or narrower/wider, as needed) index into the sorted
+  unique thresholds of its feature instead of the value itself;
+- node features as int8 and child indices relative to their tree in the
+  narrowest unsigned type that fits;
+- one fused positive-class probability per node (float64 by default, so
+  predictions match the compiled engine exactly; float32 optionally).
+
+Layout: 8-byte magic, uint32 header length, a JSON header (feature names,
+imputer medians, calibration parameters, array offsets/dtypes), then the
+raw little-endian arrays, each 64-byte aligned. Loading memory-maps the
+file and wraps the arrays with ``numpy.frombuffer``; neither sklearn nor
+joblib is imported. The narrow stored arrays are not served in place:
+they are decoded into the engine's absolute intp/float64 node arrays and
+CompiledForest rebuilds its leaf mask tables from them, so every array is
+copied once. The header returned by load_compact reports that cost
+(``map_seconds``, ``decode_seconds``, ``build_seconds``, ``load_seconds``).
+
+The header records the version of the joblib model it was exported from.
+An exact export serves under that same version (cache keys, lookup grid
+and Prediction.model_version stay valid); a float32 export gets its own.
+"""
+import json
+import mmap
+import os
+import struct
+import time
+
+import numpy as np
+
+from services.inference_engine import PARITY_TOLERANCE, CompiledForest, CompiledMember, CompiledModel
+
+MAGIC = b"KLSCMPT\x00"
+FORMAT_VERSION = 1
+COMPACT_SUFFIX = ".compact.bin"
+ALIGN = 64
+PRECISIONS = {"exact": "<f8", "float32": "<f4"}
+
+
+def compact_path_for(model_path: str) -> str:
+    root, _ = os.path.splitext(model_path)
+    return root + COMPACT_SUFFIX
+
+
+def is_compact_path(path: str) -> bool:
+    return path.endswith(COMPACT_SUFFIX)
+
+
+def _unsigned_for(max_value: int) -> str:
+    for dtype in ("<u1", "<u2", "<u4"):
+        if max_value <= np.iinfo(dtype).max:
+            return dtype
+    return "<u8"
+
+
+def float32_floor(values: np.ndarray) -> np.ndarray:
+    """Largest float32 <= each value."""
+    out = values.astype(np.float32)
+    above = out.astype(np.float64) > values
+    out[above] = np.nextafter(out[above], np.float32(-np.inf))
+    return out
+
+
+# ======================================================
+# EXPORT
+# ======================================================
+def _member_arrays(member: CompiledMember, precision: str) -> dict:
+    forest = member.forest
+    n_nodes = forest.node_count
+    is_leaf = forest.left == -1
+    sizes = np.diff(np.append(forest.roots, n_nodes))
+    root_of = np.repeat(forest.roots, sizes)
+
+    thresholds = float32_floor(forest.threshold)
+    split_index = np.zeros(n_nodes, dtype=np.int64)
+    tables, offsets = [], [0]
+    for f in range(forest.n_features):
+        nodes = np.flatnonzero(~is_leaf & (forest.feature == f))
+        values = np.unique(thresholds[nodes])
+        split_index[nodes] = np.searchsorted(values, thresholds[nodes])
+        tables.append(values)
+        offsets.append(offsets[-1] + len(values))
+
+    left = np.where(is_leaf, 0, forest.left - root_of)
+    right = np.where(is_leaf, 0, forest.right - root_of)
+    child_dtype = _unsigned_for(int(max(left.max(), right.max(), 0)))
+
+    return {
+        "tree_sizes": sizes.astype(_unsigned_for(int(sizes.max()))),
+        "feature": forest.feature.astype("<i1"),
+        "split_index": split_index.astype(_unsigned_for(max(int(split_index.max()), 0))),
+        "split_offsets": np.array(offsets, dtype="<u4"),
+        "split_values": np.concatenate(tables).astype("<f4"),
+        "left": left.astype(child_dtype),
+        "right": right.astype(child_dtype),
+        "value": forest.value.astype(PRECISIONS[precision]),
+    }
+
+
+def export_compact(compiled: CompiledModel, path: str, model_version: str, precision: str = "exact",
+                   source: str = None) -> dict:
+    """Write ``compiled`` to ``path``; returns a size report."""
+    if precision not in PRECISIONS:
+        raise ValueError(f"precision must be one of {sorted(PRECISIONS)}")
+    if any(m.forest.n_features > 127 for m in compiled.members):
+        raise ValueError("Compact format supports at most 127 features")
+
+    members, blobs = [], []
+    offset = 0
+    for m in compiled.members:
+        layout = {}
+        for name, arr in _member_arrays(m, precision).items():
+            arr = np.ascontiguousarray(arr)
+            offset += -offset % ALIGN
+            layout[name] = {"offset": offset, "dtype": arr.dtype.str, "shape": list(arr.shape)}
+            blobs.append((offset, arr))
+            offset += arr.nbytes
+        members.append({
+            "fill": None if m.fill is None else [float(v) for v in m.fill],
+            "a": m.a,
+            "b": m.b,
+            "n_features": m.forest.n_features,
+            "arrays": layout,
+        })
+
+    header = {
+        "format": FORMAT_VERSION,
+        "model_version": model_version if precision == "exact" else f"{model_version}-f32",
+        "source_version": model_version,
+        "source": source,
+        "precision": precision,
+        "feature_names": list(compiled.feature_names),
+        "members": members,
+    }
+    header_bytes = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    data_start = len(MAGIC) + 4 + len(header_bytes)
+    data_start += -data_start % ALIGN
+
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", len(header_bytes)))
+        f.write(header_bytes)
+        for blob_offset, arr in blobs:
+            f.seek(data_start + blob_offset)
+            f.write(arr.tobytes())
+    os.replace(tmp, path)
+
+    return {
+        "path": path,
+        "precision": precision,
+        "model_version": header["model_version"],
+        "file_bytes": os.path.getsize(path),
+        "nodes": compiled.node_count,
+    }
+
+
+# ======================================================
+# LOAD
+# ======================================================
+def _read_header(buf) -> tuple[dict, int]:
+    if buf[:len(MAGIC)] != MAGIC:
+        raise ValueError("Not a compact model file")
+    (n,) = struct.unpack_from("<I", buf, len(MAGIC))
+    start = len(MAGIC) + 4
+    header = json.loads(bytes(buf[start:start + n]).decode("utf-8"))
+    if header.get("format") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported compact model format: {header.get('format')}")
+    data_start = start + n
+    return header, data_start + (-data_start % ALIGN)
+
+
+def read_header(path: str) -> dict:
+    with open(path, "rb") as f:
+        head = f.read(len(MAGIC) + 4)
+        if head[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"Not a compact model file: {path}")
+        (n,) = struct.unpack_from("<I", head, len(MAGIC))
+        return _read_header(head + f.read(n))[0]
+
+
+def _decode_nodes(a: dict) -> tuple:
+    """(feature, threshold, left, right, value, roots) in the engine's
+    absolute layout, decoded from the stored relative arrays."""
+    sizes = a["tree_sizes"].astype(np.intp)
+    roots = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+    root_of = np.repeat(roots, sizes)
+
+    feature = a["feature"].astype(np.intp)
+    is_leaf = feature < 0
+    pos = a["split_offsets"][np.where(is_leaf, 0, feature)] + a["split_index"]
+    threshold = np.where(is_leaf, -2.0, a["split_values"][np.where(is_leaf, 0, pos)].astype(np.float64))
+    left = np.where(is_leaf, -1, a["left"].astype(np.intp) + root_of)
+    right = np.where(is_leaf, -1, a["right"].astype(np.intp) + root_of)
+    return feature, threshold, left, right, a["value"], roots
+
+
+def load_compact(path: str) -> tuple[CompiledModel, dict]:
+    """(CompiledModel, header) from a compact artifact.
+
+    The file is memory-mapped, but the model built from it owns its
+    arrays; the header gains the time spent mapping, decoding the node
+    arrays and building the mask tables."""
+    t0 = time.perf_counter()
+    with open(path, "rb") as f:
+        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    header, data_start = _read_header(buf)
+    timings = {"map_seconds": time.perf_counter() - t0, "decode_seconds": 0.0, "build_seconds": 0.0}
+
+    members = []
+    for meta in header["members"]:
+        t = time.perf_counter()
+        arrays = {
+            name: np.frombuffer(
+                buf, dtype=np.dtype(spec["dtype"]), count=int(np.prod(spec["shape"])),
+                offset=data_start + spec["offset"],
+            ).reshape(spec["shape"])
+            for name, spec in meta["arrays"].items()
+        }
+        nodes = _decode_nodes(arrays)
+        timings["decode_seconds"] += time.perf_counter() - t
+
+        t = time.perf_counter()
+        forest = CompiledForest(*nodes, meta["n_features"])
+        timings["build_seconds"] += time.perf_counter() - t
+        members.append(CompiledMember(forest, meta["fill"], meta["a"], meta["b"]))
+
+    header.update(timings)
+    header["load_seconds"] = time.perf_counter() - t0
+    return CompiledModel(members, header["feature_names"]), header
+
+
+# ======================================================
+# VALIDATION
+# ======================================================
+def sample_inputs(feature_names, n: int, seed: int = 0) -> np.ndarray:
+    """Random inputs over the serving ranges, with some missing values."""
+    from services.grid_lookup import GRID_SPEC
+
+    rng = np.random.default_rng(seed)
+    cols = []
+    for f in feature_names:
+        start, stop, step = GRID_SPEC.get(f, (0, 100, 1))
+        k = int(round((stop - start) / step))
+        cols.append(np.round(start + rng.integers(0, k + 1, n) * step, 6))
+    X = np.column_stack(cols).astype(float)
+    X[::97, 0] = np.nan
+    return X
+
+
+def validate_compact(model, path: str, X=None, n: int = 20000) -> dict:
+    """Compare the compact artifact with ``model.predict_proba`` (the
+    joblib model); ``exact`` is True when every probability is within
+    PARITY_TOLERANCE, the compiled engine's own parity with sklearn."""
+    import pandas as pd
+
+    compiled, header = load_compact(path)
+    if X is None:
+        X = sample_inputs(compiled.feature_names, n)
+    expected = model.predict_proba(pd.DataFrame(X, columns=compiled.feature_names))[:, 1]
+    got = compiled.predict_positive(X)
+    diff = np.abs(expected - got)
+    return {
+        "rows": len(X),
+        "precision": header["precision"],
+        "max_abs_diff": float(diff.max()),
+        "mismatched_rows": int((diff > PARITY_TOLERANCE).sum()),
+        "exact": bool((diff <= PARITY_TOLERANCE).all()),
+    }
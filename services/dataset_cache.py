@@ -0,0 +1,249 @@
+"""Columnar binary cache of the training CSV.
+
+Parsing the CSV as text and coercing every column with
+``pd.to_numeric(errors="coerce")`` is most of the cost of loading a large
+dataset, and it is repeated by every training run. The cache does it once:
+
+- every numeric column is coerced exactly like train_model.prepare_features
+  and downcast: integer-valued columns without missing values to the
+  smallest of int8/int16/int32; everything else (ipk, columns with missing
+  values) stays float64, so the imputer medians fitted on it are the ones
+  the CSV path gets; text columns (fakultas, prodi, ...) become category
+  codes with the categories kept in the metadata;
+- each column is stored as its own ``.npy`` file in
+  ``<DATASET_CACHE_DIR>/<csv name>-<hash>/``, next to a ``meta.json``
+  holding the sha256 of the CSV's bytes, the dtypes and the CSV-side
+  load figures;
+- loads hash the CSV, and when the hash matches, memory-map the columns
+  into a DataFrame. Any change to the file means a new hash, so a stale
+  cache is never read; it is rebuilt and the old entry for the same file
+  name removed.
+
+The frame starts out with one block per mapped column, but pandas copies
+same-dtype columns into one in-memory block as soon as something
+consolidates the frame (selecting several columns, most reductions), so
+the memory map saves the parse, not the copy. The load report counts the
+columns still backed by the files (``mapped_columns``).
+
+Environment:
+    DATASET_CACHE_DIR  cache location (default: .dataset_cache; empty
+                       disables the cache)
+"""
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+DATASET_CACHE_DIR = os.environ.get("DATASET_CACHE_DIR", ".dataset_cache") or None
+
+FORMAT_VERSION = 3
+META_FILE = "meta.json"
+INT_TYPES = (np.int8, np.int16, np.int32)
+
+
+def source_hash(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def entry_dir(path: str, digest: str, cache_dir: str = DATASET_CACHE_DIR) -> str:
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(cache_dir, f"{stem}-{digest[:16]}")
+
+
+def frame_bytes(df: pd.DataFrame) -> int:
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+def mapped_columns(df: pd.DataFrame) -> int:
+    """Number of numeric columns whose data still lives in a memory map."""
+    n = 0
+    for col in df.columns:
+        if not isinstance(df[col].dtype, np.dtype):
+            continue
+        base = df[col].to_numpy()
+        while base is not None and not isinstance(base, np.memmap):
+            base = getattr(base, "base", None)
+        n += base is not None
+    return n
+
+
+# ======================================================
+# BUILD
+# ======================================================
+def _smallest_int(arr: np.ndarray):
+    lo, hi = arr.min(initial=0), arr.max(initial=0)
+    for dtype in INT_TYPES:
+        info = np.iinfo(dtype)
+        if info.min <= lo and hi <= info.max:
+            return arr.astype(dtype)
+    return None
+
+
+def downcast_column(values: pd.Series):
+    """(array, categories) for one raw column; categories is None for a
+    numeric column, else the labels the codes (-1 = missing) refer to."""
+    numeric = pd.to_numeric(values, errors="coerce")
+    if numeric.isna().all() and values.notna().any():
+        codes, categories = pd.factorize(values.astype("string"), use_na_sentinel=True)
+        return _smallest_int(codes), [str(c) for c in categories]
+    arr = numeric.to_numpy(dtype=np.float64, na_value=np.nan)
+    if len(arr) and not np.isnan(arr).any() and np.array_equal(arr, np.floor(arr)):
+        small = _smallest_int(arr)
+        if small is not None:
+            return small, None
+    return arr, None
+
+
+def build(path: str, digest: str = None, cache_dir: str = DATASET_CACHE_DIR) -> dict:
+    """Parse ``path`` once and write its cache entry; returns the metadata."""
+    digest = digest or source_hash(path)
+    t0 = time.perf_counter()
+    df = pd.read_csv(path)
+    parse_seconds = time.perf_counter() - t0
+
+    target = entry_dir(path, digest, cache_dir)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp = tempfile.mkdtemp(prefix=".build_", dir=cache_dir)
+    columns = {}
+    try:
+        for i, col in enumerate(df.columns):
+            arr, categories = downcast_column(df[col])
+            # column names may not be valid file names; files are numbered
+            np.save(os.path.join(tmp, f"{i:03d}.npy"), arr)
+            columns[col] = {"file": f"{i:03d}.npy", "dtype": arr.dtype.str}
+            if categories is not None:
+                columns[col]["categories"] = categories
+
+        meta = {
+            "format": FORMAT_VERSION,
+            "source": os.path.basename(path),
+            "source_sha256": digest,
+            "source_bytes": os.path.getsize(path),
+            "rows": len(df),
+            "columns": columns,
+            "csv": {
+                "parse_seconds": round(parse_seconds, 4),
+                "frame_bytes": frame_bytes(df),
+            },
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        with open(os.path.join(tmp, META_FILE), "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+
+        existing = read_meta(target)
+        if existing is None or existing.get("format") != FORMAT_VERSION:
+            # leftover of an interrupted or older build
+            shutil.rmtree(target, ignore_errors=True)
+        try:
+            os.replace(tmp, target)
+        except OSError:
+            # another run built the same entry first
+            shutil.rmtree(tmp, ignore_errors=True)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+
+    _remove_stale(path, target, cache_dir)
+    return meta
+
+
+def _remove_stale(path: str, keep: str, cache_dir: str):
+    """Entries of older versions of the same CSV (exactly <stem>-<16 hex>,
+    so data-v2.csv's entries survive a rebuild of data.csv)."""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    pattern = re.compile(re.escape(stem) + r"-[0-9a-f]{16}")
+    for name in os.listdir(cache_dir):
+        entry = os.path.join(cache_dir, name)
+        if pattern.fullmatch(name) and entry != keep and os.path.isfile(os.path.join(entry, META_FILE)):
+            shutil.rmtree(entry, ignore_errors=True)
+
+
+# ======================================================
+# LOAD
+# ======================================================
+def read_meta(entry: str):
+    try:
+        with open(os.path.join(entry, META_FILE), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def load_entry(entry: str, meta: dict) -> pd.DataFrame:
+    """DataFrame of a cache entry, one memory-mapped block per numeric
+    column until pandas consolidates it; text columns come back as pandas
+    categoricals."""
+    data = {}
+    for col, spec in meta["columns"].items():
+        arr = np.load(os.path.join(entry, spec["file"]), mmap_mode="r")
+        if "categories" in spec:
+            arr = pd.Categorical.from_codes(arr, categories=spec["categories"])
+        data[col] = arr
+    return pd.DataFrame(data, copy=False)
+
+
+def load_dataset(path: str, cache_dir: str = DATASET_CACHE_DIR):
+    """(DataFrame, report) for the CSV at ``path``, through the cache when
+    ``cache_dir`` is set. The report compares CSV parsing with the cache
+    load: seconds, in-memory frame bytes and file bytes."""
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Dataset not found: {path}")
+
+    if not cache_dir:
+        t0 = time.perf_counter()
+        df = pd.read_csv(path)
+        return df, {
+            "source": path,
+            "cache": "disabled",
+            "rows": len(df),
+            "load_seconds": round(time.perf_counter() - t0, 4),
+            "frame_bytes": frame_bytes(df),
+        }
+
+    t0 = time.perf_counter()
+    digest = source_hash(path)
+    hash_seconds = time.perf_counter() - t0
+
+    entry = entry_dir(path, digest, cache_dir)
+    meta = read_meta(entry)
+    status = "hit"
+    if meta is None or meta.get("format") != FORMAT_VERSION or meta.get("source_sha256") != digest:
+        meta = build(path, digest, cache_dir)
+        status = "built"
+
+    t_load = time.perf_counter()
+    df = load_entry(entry, meta)
+    load_seconds = time.perf_counter() - t_load
+
+    cache_bytes = sum(os.path.getsize(os.path.join(entry, spec["file"])) for spec in meta["columns"].values())
+    csv = meta["csv"]
+    cache = {
+        "dir": entry,
+        "hash_seconds": round(hash_seconds, 4),
+        "load_seconds": round(load_seconds, 4),
+        "frame_bytes": frame_bytes(df),
+        "mapped_columns": mapped_columns(df),
+        "file_bytes": cache_bytes,
+        "dtypes": {col: "category" if "categories" in spec else spec["dtype"] for col, spec in meta["columns"].items()},
+    }
+    return df, {
+        "source": path,
+        "sha256": digest,
+        "cache": status,
+        "rows": meta["rows"],
+        # CSV figures are from the run that built the entry
+        "csv": {**csv, "file_bytes": meta["source_bytes"]},
+        "columnar": cache,
+        "load_speedup": round(csv["parse_seconds"] / (hash_seconds + load_seconds), 1)
+        if hash_seconds + load_seconds else None,
+    }
@@ -0,0 +1,288 @@
+"""Precomputed probability table over the discretized input grid.
+
+Every model input is bounded and discrete (IPK at 0.01 steps, the rest
+integers), so the calibrated probability of every grid point can be
+computed once per trained model and served as an array lookup.
+
+Grid points that no tree threshold separates always get the same
+prediction, so they share one cell: the table is stored over these
+threshold bins (a few hundred per feature) and small per-feature index
+arrays map a grid position to its bin. The table is filled by adding each
+leaf's value over its bin box with a difference array (2**n_features
+corner updates per leaf), then prefix-summing every axis.
+
+The table is stored as float64: risk labels and business rules cut the
+probability at fixed values (CLASSIFICATION_CUTS), and a float32 cell
+next to a cut can land on the other side of it. export_grid checks every
+cell within CUT_MARGIN of a cut against the model and does not save a
+grid that classifies any of them differently.
+
+The artifact is ``<model>.grid.npz`` next to the joblib file and records
+the model version it was built from; a mismatching grid is ignored.
+"""
+import itertools
+import math
+import os
+import time
+
+import numpy as np
+
+from services.business_rules import BUSINESS_RULES, RISK_THRESHOLDS
+
+# feature -> (start, stop, step), inclusive
+GRID_SPEC = {
+    "ipk": (0.0, 4.0, 0.01),
+    "sks_lulus": (0, 160, 1),
+    "presensi": (0, 100, 1),
+    "mengulang": (0, 10, 1),
+}
+
+# probabilities where the label or a business rule changes
+CLASSIFICATION_CUTS = tuple(sorted(
+    {threshold for threshold, _ in RISK_THRESHOLDS} | {rule["value"] for rule in BUSINESS_RULES}
+))
+# cells this close to a cut are re-scored by the model during export
+CUT_MARGIN = 1e-6
+
+
+def grid_path_for(model_path: str) -> str:
+    root, _ = os.path.splitext(model_path)
+    return root + ".grid.npz"
+
+
+def _grid_values(start, stop, step) -> np.ndarray:
+    n = int(round((stop - start) / step)) + 1
+    # round so 0.01 steps produce the same doubles as typed literals
+    return np.round(start + step * np.arange(n), 10)
+
+
+class ProbabilityGrid:
+    def __init__(self, table, index, values, features, model_version):
+        self.table = table
+        self.index = [np.asarray(i) for i in index]
+        self.values = [np.asarray(v, dtype=np.float64) for v in values]
+        # trees compare float32 inputs, so on-grid means float32-equal
+        self._values32 = [v.astype(np.float32) for v in self.values]
+        self.start = [float(v[0]) for v in self.values]
+        self.step = [float(np.round(v[1] - v[0], 10)) if len(v) > 1 else 1.0 for v in self.values]
+        self.features = list(features)
+        self.model_version = model_version
+
+    @property
+    def nbytes(self) -> int:
+        return (
+            self.table.nbytes
+            + sum(i.nbytes for i in self.index)
+            + sum(v.nbytes for v in self.values)
+            + sum(v.nbytes for v in self._values32)
+        )
+
+    def lookup(self, X: np.ndarray):
+        """Return (probabilities, on_grid) for a 2-D array in feature order.
+
+        Rows with on_grid False have undefined probabilities and must be
+        scored by the model.
+        """
+        X = np.asarray(X, dtype=np.float64)
+        on_grid = np.ones(len(X), dtype=bool)
+        cells = []
+        for j, values in enumerate(self._values32):
+            pos = np.rint((X[:, j] - self.start[j]) / self.step[j])
+            pos = np.where(np.isfinite(pos), pos, -1)
+            inside = (pos >= 0) & (pos < len(values))
+            pos = np.where(inside, pos, 0).astype(np.intp)
+            on_grid &= inside & (X[:, j].astype(np.float32) == values[pos])
+            cells.append(self.index[j][pos])
+        return self.table[tuple(cells)].astype(np.float64), on_grid
+
+    def lookup_one(self, row):
+        """Scalar fast path of lookup() for one row; None when off the grid."""
+        cell = []
+        for j, x in enumerate(row):
+            x = float(x)
+            if not math.isfinite(x):
+                return None
+            pos = round((x - self.start[j]) / self.step[j])
+            values = self._values32[j]
+            if not 0 <= pos < len(values) or np.float32(x) != values[pos]:
+                return None
+            cell.append(self.index[j][pos])
+        return float(self.table[tuple(cell)])
+
+    def save(self, path: str):
+        arrays = {"table": self.table}
+        for j, f in enumerate(self.features):
+            arrays[f"index_{j}"] = self.index[j]
+            arrays[f"values_{j}"] = self.values[j]
+        np.savez_compressed(
+            path,
+            features=np.array(self.features),
+            model_version=np.array(self.model_version),
+            **arrays,
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "ProbabilityGrid":
+        with np.load(path) as z:
+            features = [str(f) for f in z["features"]]
+            return cls(
+                z["table"],
+                [z[f"index_{j}"] for j in range(len(features))],
+                [z[f"values_{j}"] for j in range(len(features))],
+                features,
+                str(z["model_version"]),
+            )
+
+
+# ======================================================
+# BUILD
+# ======================================================
+def _fill_member(member, rep, shape) -> np.ndarray:
+    """Uncalibrated forest mean over the bin table of one member."""
+    forest = member.forest
+    n_dims = len(shape)
+    is_leaf = forest.left == -1
+
+    corners, weights = [], []
+    for root in forest.roots:
+        stack = [(root, [0] * n_dims, list(shape))]
+        while stack:
+            node, lo, hi = stack.pop()
+            if is_leaf[node]:
+                corners.append((lo, hi))
+                weights.append(forest.value[node])
+                continue
+            f = forest.feature[node]
+            c = int(np.searchsorted(rep[f], forest.threshold[node], side="right"))
+            c = min(max(c, lo[f]), hi[f])
+            if c > lo[f]:
+                left_hi = list(hi)
+                left_hi[f] = c
+                stack.append((forest.left[node], lo, left_hi))
+            if c < hi[f]:
+                right_lo = list(lo)
+                right_lo[f] = c
+                stack.append((forest.right[node], right_lo, hi))
+
+    lo = np.array([c[0] for c in corners])
+    hi = np.array([c[1] for c in corners])
+    weights = np.array(weights)
+
+    diff = np.zeros(tuple(s + 1 for s in shape))
+    for choice in itertools.product((0, 1), repeat=n_dims):
+        choice = np.array(choice, dtype=bool)
+        idx = np.where(choice, hi, lo)
+        sign = -1.0 if choice.sum() % 2 else 1.0
+        np.add.at(diff, tuple(idx.T), sign * weights)
+    for axis in range(n_dims):
+        np.cumsum(diff, axis=axis, out=diff)
+    return diff[tuple(slice(0, s) for s in shape)] / forest.n_trees
+
+
+def build_grid(compiled, model_version: str, spec=GRID_SPEC, dtype=np.float64):
+    """Build a ProbabilityGrid from a CompiledModel (services.inference_engine).
+
+    Returns (grid, report) where report describes sizes and build time.
+    """
+    t0 = time.perf_counter()
+    features = compiled.feature_names
+    missing = [f for f in features if f not in spec]
+    if missing:
+        raise KeyError(f"No grid range for features: {missing}")
+
+    index, values, rep = [], [], []
+    for j, f in enumerate(features):
+        gv = _grid_values(*spec[f])
+        gv32 = gv.astype(np.float32).astype(np.float64)
+        thresholds = np.unique(np.concatenate([m.forest.split_values[j] for m in compiled.members]))
+        bins = np.searchsorted(thresholds, gv32, side="left")
+        uniq, first, inverse = np.unique(bins, return_index=True, return_inverse=True)
+        index.append(inverse.astype(np.uint16 if len(uniq) < 2 ** 16 else np.intp))
+        values.append(gv)
+        rep.append(gv32[first])
+
+    shape = tuple(len(r) for r in rep)
+    prob = np.zeros(shape)
+    for member in compiled.members:
+        p = _fill_member(member, rep, shape)
+        if member.a is not None:
+            p = member._expit(-(member.a * p + member.b))
+        prob += p
+    prob /= len(compiled.members)
+
+    grid = ProbabilityGrid(prob.astype(dtype), index, values, features, model_version)
+    full_cells = int(np.prod([len(v) for v in values]))
+    report = {
+        "features": {f: {"range": list(spec[f]), "points": len(values[j]), "bins": shape[j]} for j, f in enumerate(features)},
+        "grid_points": full_cells,
+        "table_cells": int(prob.size),
+        "table_dtype": np.dtype(dtype).name,
+        "memory_bytes": int(grid.nbytes),
+        "dense_grid_bytes": full_cells * np.dtype(dtype).itemsize,
+        "build_seconds": round(time.perf_counter() - t0, 3),
+    }
+    return grid, report
+
+
+def export_grid(model, model_path: str, model_version: str, spec=GRID_SPEC, sample_size: int = 20000):
+    """Build, validate and save the grid next to ``model_path``; returns the report."""
+    from services.inference_engine import compile_model
+
+    compiled = compile_model(model)
+    grid, report = build_grid(compiled, model_version, spec)
+
+    # compare against the model on random grid points
+    rng = np.random.default_rng(0)
+    X = np.column_stack([rng.choice(v, sample_size) for v in grid.values])
+    got, on_grid = grid.lookup(X)
+    report["validation_max_abs_error"] = float(np.abs(got - compiled.predict_positive(X)).max())
+    report["validation_on_grid"] = bool(on_grid.all())
+    report.update(check_cuts(grid, compiled))
+
+    path = grid_path_for(model_path)
+    if report["cut_mismatches"]:
+        report["path"] = None
+        return report
+    grid.save(path)
+    report["path"] = path
+    report["file_bytes"] = os.path.getsize(path)
+    return report
+
+
+def check_cuts(grid: ProbabilityGrid, compiled, cuts=CLASSIFICATION_CUTS, margin: float = CUT_MARGIN) -> dict:
+    """Re-score every cell within ``margin`` of a cut with the model and
+    count the cells that fall on a different side of any cut."""
+    # one grid point per bin stands for the whole cell
+    reps = [values[np.unique(index, return_index=True)[1]] for index, values in zip(grid.index, grid.values)]
+    near = np.zeros(grid.table.shape, dtype=bool)
+    for cut in cuts:
+        near |= np.abs(grid.table - cut) <= margin
+    cells = np.argwhere(near)
+    if not len(cells):
+        return {"cut_cells": 0, "cut_mismatches": 0}
+
+    X = np.column_stack([reps[j][cells[:, j]] for j in range(len(reps))])
+    expected = compiled.predict_positive(X)
+    got = grid.table[tuple(cells.T)].astype(np.float64)
+    flipped = np.zeros(len(cells), dtype=bool)
+    for cut in cuts:
+        flipped |= (expected >= cut) != (got >= cut)
+    return {"cut_cells": int(len(cells)), "cut_mismatches": int(flipped.sum())}
+
+
+def print_report(report: dict):
+    print(f"Grid points         : {report['grid_points']:,}")
+    for f, info in report["features"].items():
+        print(f"  {f:<12}: {info['points']} points -> {info['bins']} bins")
+    print(f"Table cells         : {report['table_cells']:,} ({report['table_dtype']})")
+    print(f"Memory (loaded)     : {report['memory_bytes'] / 1e6:.2f} MB "
+          f"(dense grid would be {report['dense_grid_bytes'] / 1e6:.1f} MB)")
+    if "file_bytes" in report:
+        print(f"File (compressed)   : {report['file_bytes'] / 1e6:.2f} MB -> {report['path']}")
+    if "cut_cells" in report:
+        print(f"Cells near a cut    : {report['cut_cells']:,} ({report['cut_mismatches']:,} classify differently)")
+        if report["cut_mismatches"]:
+            print("Grid NOT saved: it would change risk labels next to a cut")
+    if "validation_max_abs_error" in report:
+        print(f"Max |error| vs model: {report['validation_max_abs_error']:.2e}")
+    print(f"Build time          : {report['build_seconds']:.2f} s")
@@ -0,0 +1,311 @@
+"""DataFrame-free inference for the calibrated RandomForest model.
+
+The fitted trees are flattened into contiguous NumPy node arrays and
+compiled into per-feature leaf bitmasks, so a prediction is a handful
+of vectorized gathers over all trees at once instead of a trip through
+pandas, sklearn input validation, the Pipeline imputer, joblib dispatch
+per tree and the CalibratedClassifierCV wrapper.
+
+The arithmetic mirrors sklearn step by step (median imputation, float32
+cast before threshold comparison, tree-by-tree accumulation, mean over
+trees, sigmoid calibration, mean over calibrated members), so the output
+matches ``model.predict_proba`` within PARITY_TOLERANCE (1e-12). It is
+not guaranteed bit for bit: sklearn sums the trees from parallel jobs in
+whatever order they finish, which moves the last bits of the mean.
+"""
+import numpy as np
+
+# max |difference| to model.predict_proba (scripts/check_inference_engine.py)
+PARITY_TOLERANCE = 1e-12
+
+# rows evaluated together; bounds the (rows x trees) temporaries
+ROW_BLOCK = 64
+
+
+def _low_bits(n: np.ndarray) -> np.ndarray:
+    """uint64 words with the lowest ``n`` (0..64) bits set."""
+    n = n.astype(np.uint64)
+    shifted = np.left_shift(np.uint64(1), np.minimum(n, np.uint64(63))) - np.uint64(1)
+    return np.where(n >= 64, ~np.uint64(0), shifted)
+
+
+class CompiledForest:
+    """All trees of one forest packed into flat node arrays.
+
+    Leaves are located with a bitmask scheme (QuickScorer): every internal
+    node owns a mask that clears the leaves of its left subtree, and for
+    each feature the masks are pre-ANDed in threshold order. Finding the
+    exit leaf of every tree is then one ``searchsorted`` plus one table
+    gather per feature, an AND across features and a lowest-set-bit
+    lookup; no per-level pointer chasing.
+    """
+
+    def __init__(self, feature, threshold, left, right, value, roots, n_features):
+        self.feature = np.ascontiguousarray(feature, dtype=np.intp)
+        self.threshold = np.ascontiguousarray(threshold, dtype=np.float64)
+        self.left = np.ascontiguousarray(left, dtype=np.intp)
+        self.right = np.ascontiguousarray(right, dtype=np.intp)
+        self.value = np.ascontiguousarray(value, dtype=np.float64)
+        self.roots = np.ascontiguousarray(roots, dtype=np.intp)
+        self.n_features = int(n_features)
+        self.n_trees = len(self.roots)
+        self._build_tables()
+
+    @classmethod
+    def from_estimators(cls, estimators, n_features, pos_index=1):
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        for est in estimators:
+            t = est.tree_
+            is_leaf = t.children_left == -1
+
+            # sklearn >= 1.4 stores per-node class fractions and
+            # DecisionTreeClassifier.predict_proba returns them as-is
+            v = t.value[:, 0, :]
+
+            features.append(np.where(is_leaf, -1, t.feature))
+            thresholds.append(t.threshold)
+            lefts.append(np.where(is_leaf, -1, t.children_left + offset))
+            rights.append(np.where(is_leaf, -1, t.children_right + offset))
+            values.append(v[:, pos_index])
+            roots.append(offset)
+            offset += t.node_count
+
+        return cls(
+            np.concatenate(features),
+            np.concatenate(thresholds),
+            np.concatenate(lefts),
+            np.concatenate(rights),
+            np.concatenate(values),
+            np.array(roots),
+            n_features,
+        )
+
+    @property
+    def node_count(self) -> int:
+        return len(self.feature)
+
+    def _build_tables(self):
+        n_nodes = self.node_count
+        is_leaf = self.left == -1
+
+        # in-order leaf ranks; lo/hi = leaf rank range covered by each node
+        rank = np.full(n_nodes, -1, dtype=np.intp)
+        lo = np.zeros(n_nodes, dtype=np.intp)
+        hi = np.zeros(n_nodes, dtype=np.intp)
+        n_leaves = np.zeros(self.n_trees, dtype=np.intp)
+        for t, root in enumerate(self.roots):
+            counter = 0
+            stack = [(root, False)]
+            while stack:
+                node, expanded = stack.pop()
+                if is_leaf[node]:
+                    rank[node] = counter
+                    lo[node], hi[node] = counter, counter + 1
+                    counter += 1
+                elif expanded:
+                    lo[node] = lo[self.left[node]]
+                    hi[node] = hi[self.right[node]]
+                else:
+                    stack.append((node, True))
+                    stack.append((self.right[node], False))
+                    stack.append((self.left[node], False))
+            n_leaves[t] = counter
+
+        max_leaves = int(n_leaves.max())
+        self.n_words = (max_leaves + 63) // 64
+        self.max_leaves = max_leaves
+
+        tree_of = np.repeat(np.arange(self.n_trees), np.diff(np.append(self.roots, n_nodes)))
+        leaves = np.flatnonzero(is_leaf)
+        self.leaf_node = np.zeros((self.n_trees, max_leaves), dtype=np.intp)
+        self.leaf_node[tree_of[leaves], rank[leaves]] = leaves
+        self.leaf_value = self.value[self.leaf_node]
+        self._tree_base = np.arange(self.n_trees) * max_leaves
+
+        # a false test (x > threshold) removes the left subtree's leaves:
+        # in word w, clear the bits of leaf ranks [lo, hi) of the left child
+        internal = np.flatnonzero(~is_leaf)
+        left = self.left[internal]
+        masks = np.empty((len(internal), self.n_words), dtype=np.uint64)
+        for w in range(self.n_words):
+            start = np.clip(lo[left] - 64 * w, 0, 64)
+            stop = np.clip(hi[left] - 64 * w, 0, 64)
+            masks[:, w] = ~(_low_bits(stop) ^ _low_bits(start))
+
+        self.split_values = []
+        self.split_masks = []
+        ones = ~np.uint64(0)
+        for f in range(self.n_features):
+            sel = self.feature[internal] == f
+            nodes = internal[sel]
+            values = np.unique(self.threshold[nodes])
+            table = np.full((len(values) + 1, self.n_trees, self.n_words), ones, dtype=np.uint64)
+            pos = np.searchsorted(values, self.threshold[nodes]) + 1
+            np.bitwise_and.at(table, (pos, tree_of[nodes]), masks[sel])
+            np.bitwise_and.accumulate(table, axis=0, out=table)
+            self.split_values.append(values)
+            self.split_masks.append(table)
+
+    def leaf_ranks(self, X: np.ndarray) -> np.ndarray:
+        """In-order rank of the exit leaf of every (row, tree) pair."""
+        acc = None
+        for f in range(self.n_features):
+            k = np.searchsorted(self.split_values[f], X[:, f], side="left")
+            m = self.split_masks[f][k]
+            acc = m if acc is None else (acc & m)
+
+        if self.n_words == 1:
+            w = acc[..., 0]
+            first = 0
+        else:
+            first = np.argmax(acc != 0, axis=-1)
+            w = np.take_along_axis(acc, first[..., None], axis=-1)[..., 0]
+        lowest = w & (~w + np.uint64(1))
+        return np.log2(lowest.astype(np.float64)).astype(np.intp) + 64 * first
+
+    def leaves(self, X: np.ndarray) -> np.ndarray:
+        """Return the leaf node index reached by every (row, tree) pair."""
+        return self.leaf_node.ravel()[self._tree_base + self.leaf_ranks(X)]
+
+    def predict_positive(self, X: np.ndarray) -> np.ndarray:
+        """Mean positive-class probability over trees (uncalibrated)."""
+        if len(X) <= ROW_BLOCK:
+            values = self.leaf_value.ravel()[self._tree_base + self.leaf_ranks(X)]
+            # cumulative sum adds trees one by one, like the sklearn accumulator
+            return np.cumsum(values, axis=1)[:, -1] / self.n_trees
+
+        # keep the (rows x trees) intermediates cache-sized
+        out = np.empty(len(X))
+        for i in range(0, len(X), ROW_BLOCK):
+            out[i:i + ROW_BLOCK] = self.predict_positive(X[i:i + ROW_BLOCK])
+        return out
+
+
+class CompiledMember:
+    """One calibrated member: imputer medians + forest + sigmoid params."""
+
+    def __init__(self, forest: CompiledForest, fill=None, a=None, b=None):
+        # same function _SigmoidCalibration.predict uses
+        from scipy.special import expit
+
+        self._expit = expit
+        self.forest = forest
+        self.fill = None if fill is None else np.asarray(fill, dtype=np.float64)
+        self.a = a
+        self.b = b
+
+    def prepare(self, X: np.ndarray) -> np.ndarray:
+        """Impute and round the inputs exactly as the pipeline does."""
+        if self.fill is not None:
+            nan = np.isnan(X)
+            if nan.any():
+                X = np.where(nan, self.fill, X)
+        # trees compare float32 features against float64 thresholds
+        return X.astype(np.float32).astype(np.float64)
+
+    def predict_positive(self, X: np.ndarray) -> np.ndarray:
+        prob = self.forest.predict_positive(self.prepare(X))
+        if self.a is not None:
+            prob = self._expit(-(self.a * prob + self.b))
+        return prob
+
+
+class CompiledModel:
+    """Drop-in replacement for ``model.predict_proba`` on plain arrays."""
+
+    def __init__(self, members, feature_names):
+        self.members = list(members)
+        self.feature_names = list(feature_names)
+        self.n_features = len(self.feature_names)
+
+    def _as_2d(self, X) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(
+                f"Expected input with {self.n_features} features "
+                f"({', '.join(self.feature_names)}), got shape {X.shape}"
+            )
+        return X
+
+    def predict_positive(self, X) -> np.ndarray:
+        """Positive-class probability for a 2-D array, shape (n_rows,)."""
+        X = self._as_2d(X)
+        prob = np.zeros(X.shape[0])
+        for m in self.members:
+            prob += m.predict_positive(X)
+        return prob / len(self.members)
+
+    def predict_proba(self, X) -> np.ndarray:
+        """Same shape and columns as the sklearn model, shape (n_rows, 2)."""
+        pos = self.predict_positive(X)
+        return np.column_stack([1.0 - pos, pos])
+
+    def predict_one(self, *values) -> float:
+        """Probability for a single row given as plain floats in feature order."""
+        return float(self.predict_positive(np.array(values, dtype=np.float64))[0])
+
+    @property
+    def node_count(self) -> int:
+        return sum(m.forest.node_count for m in self.members)
+
+
+# ======================================================
+# COMPILATION FROM FITTED SKLEARN OBJECTS
+# ======================================================
+def _compile_pipeline(est):
+    """Split a fitted estimator into (imputer medians, CompiledForest)."""
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.impute import SimpleImputer
+    from sklearn.pipeline import Pipeline
+
+    fill = None
+    if isinstance(est, Pipeline):
+        steps = [s for _, s in est.steps if s is not None and s != "passthrough"]
+        if len(steps) == 2 and isinstance(steps[0], SimpleImputer):
+            imputer, est = steps
+            if imputer.strategy not in ("median", "mean") or getattr(imputer, "add_indicator", False):
+                raise TypeError(f"Unsupported imputer configuration: {imputer}")
+            if not (isinstance(imputer.missing_values, float) and np.isnan(imputer.missing_values)):
+                raise TypeError("Only NaN missing_values is supported")
+            fill = imputer.statistics_
+        elif len(steps) == 1:
+            est = steps[0]
+        else:
+            raise TypeError(f"Unsupported pipeline: {est}")
+
+    if not isinstance(est, RandomForestClassifier):
+        raise TypeError(f"Unsupported estimator: {type(est).__name__}")
+    if getattr(est, "n_outputs_", 1) != 1 or len(est.classes_) != 2:
+        raise TypeError("Only single-output binary forests are supported")
+    return fill, CompiledForest.from_estimators(est.estimators_, est.n_features_in_)
+
+
+def compile_model(model) -> CompiledModel:
+    """Build a CompiledModel from the object stored in model_kelulusan.joblib.
+
+    Supports CalibratedClassifierCV(method="sigmoid") over a
+    Pipeline(SimpleImputer, RandomForestClassifier), the bare pipeline and
+    a bare forest. Raises TypeError for anything else so callers can fall
+    back to ``model.predict_proba``.
+    """
+    from sklearn.calibration import CalibratedClassifierCV
+
+    members = []
+    if isinstance(model, CalibratedClassifierCV):
+        if model.method != "sigmoid" or len(model.classes_) != 2:
+            raise TypeError("Only binary sigmoid calibration is supported")
+        for cc in model.calibrated_classifiers_:
+            fill, forest = _compile_pipeline(cc.estimator)
+            cal = cc.calibrators[0]
+            members.append(CompiledMember(forest, fill, float(cal.a_), float(cal.b_)))
+    else:
+        fill, forest = _compile_pipeline(model)
+        members.append(CompiledMember(forest, fill))
+
+    feature_names = getattr(model, "feature_names_in_", None)
+    if feature_names is None:
+        feature_names = [f"x{i}" for i in range(model.n_features_in_)]
+    return CompiledModel(members, feature_names)
@@ -0,0 +1,240 @@
+"""Process-pool inference, off the Flask request threads.
+
+Scoring is CPU-bound and holds the GIL for most of its run, so in a
+threaded worker one large batch stalls every other request of the process.
+InferencePool moves it into separate worker processes. Each worker loads
+the model once (initializer) and keeps it for its lifetime; a task names
+the artifact path and version it must be scored with, and a worker that
+holds a different version reloads before scoring, so hot swaps stay
+consistent with the request's bundle. Workers keep one bundle per path,
+so batches of different segment models do not evict each other.
+
+Small batches travel pickled over the executor's pipes. Batches of at
+least PREDICTION_POOL_SHM_BYTES go through one shared-memory block that
+holds the input rows followed by the output probabilities, so neither
+side pickles the arrays.
+
+Environment:
+    PREDICTION_POOL_SIZE     worker processes, 0 disables the pool (default: 0)
+    PREDICTION_POOL_QUEUE    batches in flight before submit() waits
+                             (default: 4 x pool size)
+    PREDICTION_POOL_TIMEOUT  seconds submit() waits for a free slot (default: 5)
+    PREDICTION_POOL_SHM_BYTES
+                             input size from which shared memory is used
+                             (default: 262144)
+    PREDICTION_POOL_START    multiprocessing start method (default: spawn)
+"""
+import atexit
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+PREDICTION_POOL_SIZE = int(os.environ.get("PREDICTION_POOL_SIZE", "0"))
+PREDICTION_POOL_QUEUE = int(os.environ.get("PREDICTION_POOL_QUEUE", "0")) or 4 * max(PREDICTION_POOL_SIZE, 1)
+PREDICTION_POOL_TIMEOUT = float(os.environ.get("PREDICTION_POOL_TIMEOUT", "5"))
+PREDICTION_POOL_SHM_BYTES = int(os.environ.get("PREDICTION_POOL_SHM_BYTES", str(256 * 1024)))
+PREDICTION_POOL_START = os.environ.get("PREDICTION_POOL_START", "spawn")
+
+log = logging.getLogger(__name__)
+
+
+# ======================================================
+# WORKER PROCESS
+# ======================================================
+_worker_bundles = {}
+
+
+def _remember(bundle):
+    # segment bundles are loaded with their global bundle
+    _worker_bundles[bundle.path] = bundle
+    if bundle.segments is not None:
+        for seg in bundle.segments.bundles.values():
+            _worker_bundles[seg.path] = seg
+    return bundle
+
+
+def _worker_init(path):
+    from services.model_loader import load_bundle, warm_up
+
+    if path:
+        _remember(warm_up(load_bundle(path)))
+
+
+def _worker_get_bundle(path, version):
+    from services.model_loader import load_bundle, warm_up
+
+    bundle = _worker_bundles.get(path)
+    if bundle is None or bundle.version != version:
+        bundle = warm_up(load_bundle(path))
+        if bundle.version != version:
+            # artifact changed again since the parent loaded it
+            raise RuntimeError(f"Model at {path} is {bundle.version}, expected {version}")
+        _remember(bundle)
+    return bundle
+
+
+def _worker_score(path, version, X):
+    from services.prediction_service import predict_proba
+
+    return predict_proba(X, _worker_get_bundle(path, version))
+
+
+def _worker_score_shm(path, version, shm_name, n_rows, n_cols):
+    from services.prediction_service import predict_proba
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        buf = np.ndarray((n_rows * (n_cols + 1),), dtype=np.float64, buffer=shm.buf)
+        X = buf[:n_rows * n_cols].reshape(n_rows, n_cols)
+        buf[n_rows * n_cols:] = predict_proba(X, _worker_get_bundle(path, version))
+        del buf, X
+    finally:
+        shm.close()
+    return n_rows
+
+
+# ======================================================
+# PARENT SIDE
+# ======================================================
+class InferencePool:
+    def __init__(self, size: int = PREDICTION_POOL_SIZE, queue_depth: int = PREDICTION_POOL_QUEUE,
+                 timeout: float = PREDICTION_POOL_TIMEOUT, shm_bytes: int = PREDICTION_POOL_SHM_BYTES,
+                 start_method: str = PREDICTION_POOL_START):
+        self.size = size
+        self.queue_depth = queue_depth
+        self.timeout = timeout
+        self.shm_bytes = shm_bytes
+        self.start_method = start_method
+
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(queue_depth)
+        self._stats_lock = threading.Lock()
+
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.shm_batches = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.size > 0
+
+    def _get_executor(self, path):
+        if self._executor is not None and self._pid == os.getpid():
+            return self._executor
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.size,
+                    mp_context=multiprocessing.get_context(self.start_method),
+                    initializer=_worker_init,
+                    initargs=(path,),
+                )
+                self._pid = os.getpid()
+                log.info("Inference pool started: %d workers, queue depth %d", self.size, self.queue_depth)
+        return self._executor
+
+    def submit(self, X: np.ndarray, bundle) -> Future:
+        """Score X (2-D, model feature order) with ``bundle``'s model in a
+        worker process. The Future resolves to the probability array.
+
+        Waits up to ``timeout`` seconds when ``queue_depth`` batches are
+        already in flight, then raises TimeoutError.
+        """
+        if not self._slots.acquire(timeout=self.timeout):
+            raise TimeoutError("Antrian inferensi penuh, coba lagi nanti.")
+
+        try:
+            X = np.ascontiguousarray(X, dtype=np.float64)
+            executor = self._get_executor(bundle.path)
+            if X.nbytes >= self.shm_bytes:
+                future = self._submit_shm(executor, X, bundle)
+            else:
+                future = executor.submit(_worker_score, bundle.path, bundle.version, X)
+        except BaseException:
+            self._slots.release()
+            raise
+
+        with self._stats_lock:
+            self.submitted += 1
+        future.add_done_callback(self._on_done)
+        return future
+
+    def _submit_shm(self, executor, X, bundle) -> Future:
+        n_rows, n_cols = X.shape
+        shm = shared_memory.SharedMemory(create=True, size=X.nbytes + n_rows * 8)
+        try:
+            buf = np.ndarray((n_rows * (n_cols + 1),), dtype=np.float64, buffer=shm.buf)
+            buf[:X.size] = X.ravel()
+            inner = executor.submit(_worker_score_shm, bundle.path, bundle.version, shm.name, n_rows, n_cols)
+        except BaseException:
+            # never handed to a worker: nobody else will free the block
+            buf = None
+            shm.close()
+            shm.unlink()
+            raise
+        with self._stats_lock:
+            self.shm_batches += 1
+
+        result = Future()
+
+        def _finish(f):
+            nonlocal buf
+            probs, error = None, None
+            try:
+                if f.cancelled():
+                    error = RuntimeError("Inference task cancelled")
+                elif f.exception() is not None:
+                    error = f.exception()
+                else:
+                    probs = buf[n_rows * n_cols:].copy()
+            finally:
+                # views must be gone before the block can be closed
+                buf = None
+                shm.close()
+                shm.unlink()
+            if error is not None:
+                result.set_exception(error)
+            else:
+                result.set_result(probs)
+
+        inner.add_done_callback(_finish)
+        return result
+
+    def _on_done(self, future: Future):
+        self._slots.release()
+        with self._stats_lock:
+            if future.cancelled() or future.exception() is not None:
+                self.failed += 1
+            else:
+                self.completed += 1
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None and self._pid == os.getpid():
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                "enabled": self.enabled,
+                "workers": self.size,
+                "queue_depth": self.queue_depth,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "in_flight": self.submitted - self.completed - self.failed,
+                "shm_batches": self.shm_batches,
+            }
+
+
+inference_pool = InferencePool()
+atexit.register(inference_pool.shutdown)
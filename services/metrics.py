@@ -0,0 +1,153 @@
+"""In-process latency histograms and timing spans.
+
+Wrap a stage in ``with span("predict.model"):`` and its duration lands in
+the histogram of that name. Histograms use fixed log-spaced buckets
+(about 19% apart, 1 us to 100 s) and memory stays constant: recording
+only appends to a queue, which is folded into the buckets every 1024
+samples and on read. Percentiles are read from the bucket bounds.
+
+While a request trace is active (services.metrics.begin_trace, done by the
+metrics blueprint for every request) spans also record their duration in
+the trace, so a slow request can be logged with its per-stage breakdown.
+
+Environment:
+    PREDICTION_SLOW_LOG_MS  log requests slower than this with their stage
+                            timings (default: unset, no logging)
+"""
+import bisect
+import os
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+
+_slow = os.environ.get("PREDICTION_SLOW_LOG_MS", "").strip()
+PREDICTION_SLOW_LOG_MS = float(_slow) if _slow else None
+
+# bucket upper bounds in nanoseconds: 1 us .. 100 s, 2**0.25 apart
+BUCKET_BOUNDS_NS = [int(1000 * 2 ** (i / 4)) for i in range(0, 4 * 27)]
+
+_trace = ContextVar("prediction_trace", default=None)
+
+
+class Histogram:
+    __slots__ = ("name", "counts", "count", "total_ns", "max_ns", "_pending", "_lock")
+
+    FOLD_EVERY = 1024
+
+    def __init__(self, name: str):
+        self.name = name
+        self.counts = [0] * (len(BUCKET_BOUNDS_NS) + 1)
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        # deque.append is atomic, so the hot path takes no lock; samples are
+        # folded into the buckets in batches
+        self._pending = deque()
+        self._lock = threading.Lock()
+
+    def observe_ns(self, ns: int):
+        self._pending.append(ns)
+        if len(self._pending) >= self.FOLD_EVERY:
+            self._fold()
+
+    def _fold(self):
+        with self._lock:
+            pending = self._pending
+            counts = self.counts
+            for _ in range(len(pending)):
+                ns = pending.popleft()
+                counts[bisect.bisect_left(BUCKET_BOUNDS_NS, ns)] += 1
+                self.count += 1
+                self.total_ns += ns
+                if ns > self.max_ns:
+                    self.max_ns = ns
+
+    def percentile_ns(self, q: float) -> int:
+        """Upper bound of the bucket holding the q-th percentile."""
+        if not self.count:
+            return 0
+        rank = q / 100.0 * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank and c:
+                return min(BUCKET_BOUNDS_NS[i], self.max_ns) if i < len(BUCKET_BOUNDS_NS) else self.max_ns
+        return self.max_ns
+
+    def snapshot(self) -> dict:
+        self._fold()
+        with self._lock:
+            count, total, peak = self.count, self.total_ns, self.max_ns
+        return {
+            "count": count,
+            "mean_us": round(total / count / 1e3, 2) if count else 0.0,
+            "p50_us": round(self.percentile_ns(50) / 1e3, 2),
+            "p90_us": round(self.percentile_ns(90) / 1e3, 2),
+            "p99_us": round(self.percentile_ns(99) / 1e3, 2),
+            "max_us": round(peak / 1e3, 2),
+        }
+
+
+_histograms = {}
+_histograms_lock = threading.Lock()
+
+
+def histogram(name: str) -> Histogram:
+    h = _histograms.get(name)
+    if h is None:
+        with _histograms_lock:
+            h = _histograms.setdefault(name, Histogram(name))
+    return h
+
+
+class span:
+    """Context manager timing one stage into histogram ``name``."""
+
+    __slots__ = ("hist", "start")
+
+    def __init__(self, name: str):
+        self.hist = _histograms.get(name) or histogram(name)
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        ns = time.perf_counter_ns() - self.start
+        self.hist.observe_ns(ns)
+        trace = _trace.get()
+        if trace is not None:
+            trace.append((self.hist.name, ns))
+        return False
+
+
+def record(name: str, ns: int):
+    """Add an externally measured duration (nanoseconds)."""
+    histogram(name).observe_ns(ns)
+
+
+# ======================================================
+# REQUEST TRACES
+# ======================================================
+def begin_trace():
+    """Start collecting span timings for the current request; returns a token."""
+    return _trace.set([])
+
+
+def end_trace(token) -> list:
+    """Stop collecting; returns [(span name, ns), ...] in completion order."""
+    trace = _trace.get() or []
+    _trace.reset(token)
+    return trace
+
+
+def snapshot() -> dict:
+    with _histograms_lock:
+        items = list(_histograms.items())
+    return {name: h.snapshot() for name, h in sorted(items)}
+
+
+def reset():
+    with _histograms_lock:
+        _histograms.clear()
@@ -0,0 +1,230 @@
+"""Smaller models for a latency or size budget.
+
+Four features do not need hundreds of depth-12 trees, and per-request
+latency and the artifact size grow with the node count. After training,
+two kinds of smaller model are searched, smallest first, and the first
+one whose validation ROC AUC and Brier score stay within a tolerance of
+the full model is kept:
+
+- sub-forest: the first k trees of the fitted forest (the trees of a
+  random forest are exchangeable, so a prefix is a fair sample);
+- distilled: a new shallow RandomForestClassifier fitted to the full
+  model's probabilities on a transfer set: the training inputs, jittered
+  copies of them up to TRANSFER_ROWS, and a share of synthetic inputs
+  over the serving ranges (compact_model.sample_inputs). Each input is
+  used twice, as a positive with weight p and as a negative with weight
+  1 - p, so every leaf learns the teacher's average probability.
+
+Both keep the Pipeline(SimpleImputer, RandomForestClassifier) shape with
+the full model's imputer and are sigmoid-calibrated on the validation
+split like the full model, so the compiled engine, compact export and
+grid apply unchanged. Latency is the compiled engine's single-row
+``predict_one`` (p50/p99 over validation rows), size the compact
+artifact's bytes.
+"""
+import copy
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.calibration import CalibratedClassifierCV
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import brier_score_loss, roc_auc_score
+from sklearn.pipeline import Pipeline
+
+from services.compact_model import export_compact, sample_inputs
+from services.inference_engine import compile_model
+
+SUBFOREST_SIZES = (5, 10, 15, 20, 30, 40, 50, 75, 100, 150, 200, 300)
+# (trees, max_depth), ordered by worst-case node count
+DISTILL_GRID = sorted(
+    ((t, d) for t in (5, 10, 20, 40) for d in (4, 6, 8)),
+    key=lambda c: (c[0] << c[1], c[0])
+)
+TRANSFER_ROWS = 50_000
+SYNTHETIC_SHARE = 0.2
+JITTER = 0.1
+LATENCY_ROWS = 1000
+
+
+# ======================================================
+# MEASUREMENTS
+# ======================================================
+def expected_calibration_error(y, prob, bins: int = 10) -> float:
+    idx = np.minimum((prob * bins).astype(int), bins - 1)
+    ece = 0.0
+    for b in range(bins):
+        mask = idx == b
+        if mask.any():
+            ece += mask.mean() * abs(prob[mask].mean() - y[mask].mean())
+    return float(ece)
+
+
+def measure_latency(compiled, X: np.ndarray, rows: int = LATENCY_ROWS) -> dict:
+    """Single-row predict_one latency in microseconds."""
+    X = X[:rows]
+    for row in X[:50]:
+        compiled.predict_one(*row)
+    times = np.empty(len(X))
+    for i, row in enumerate(X):
+        t0 = time.perf_counter_ns()
+        compiled.predict_one(*row)
+        times[i] = time.perf_counter_ns() - t0
+    p50, p99 = np.percentile(times, [50, 99]) / 1e3
+    return {"p50": round(float(p50), 1), "p99": round(float(p99), 1)}
+
+
+def compact_bytes(compiled) -> int:
+    with tempfile.TemporaryDirectory() as tmp:
+        return export_compact(compiled, os.path.join(tmp, "model.compact.bin"), "candidate")["file_bytes"]
+
+
+def describe(model, val, test) -> dict:
+    """Quality, size and latency of one calibrated model."""
+    (X_val, y_val), (X_test, y_test) = val, test
+    X_val = np.asarray(X_val, dtype=np.float64)
+    compiled = compile_model(model)
+    prob_val = compiled.predict_positive(X_val)
+    y_val = np.asarray(y_val)
+    return {
+        "nodes": compiled.node_count,
+        "compact_bytes": compact_bytes(compiled),
+        "latency_us": measure_latency(compiled, X_val),
+        "val_roc_auc": round(float(roc_auc_score(y_val, prob_val)), 6),
+        "val_brier": round(float(brier_score_loss(y_val, prob_val)), 6),
+        "val_ece": round(expected_calibration_error(y_val, prob_val), 6),
+        "test_roc_auc": round(float(roc_auc_score(np.asarray(y_test), compiled.predict_positive(X_test))), 6),
+    }
+
+
+# ======================================================
+# CANDIDATES
+# ======================================================
+def subforest(pipeline: Pipeline, k: int) -> Pipeline:
+    """The fitted pipeline with only its first ``k`` trees."""
+    forest = copy.copy(pipeline.named_steps["clf"])
+    forest.estimators_ = forest.estimators_[:k]
+    forest.n_estimators = k
+    return Pipeline([("imputer", pipeline.named_steps["imputer"]), ("clf", forest)])
+
+
+def transfer_set(pipeline: Pipeline, X_train, n: int = TRANSFER_ROWS, seed: int = 0):
+    """(imputed inputs, teacher probabilities) for distillation. Jittered
+    copies add JITTER column standard deviations of noise, clipped to the
+    column's observed range; missing values stay missing."""
+    features = list(pipeline.feature_names_in_)
+    rng = np.random.default_rng(seed)
+    real = np.asarray(X_train[features] if hasattr(X_train, "columns") else X_train, dtype=np.float64)
+    n_real = max(n - int(n * SYNTHETIC_SHARE), 0)
+    if len(real) > n_real:
+        real = real[rng.choice(len(real), n_real, replace=False)]
+
+    base = real[rng.integers(0, len(real), n_real - len(real))]
+    lo, hi = np.nanmin(real, axis=0), np.nanmax(real, axis=0)
+    jittered = np.clip(base + rng.standard_normal(base.shape) * np.nanstd(real, axis=0) * JITTER, lo, hi)
+
+    X = pd.DataFrame(np.vstack([real, jittered, sample_inputs(features, n - n_real, seed)]), columns=features)
+    return pipeline.named_steps["imputer"].transform(X), pipeline.predict_proba(X)[:, 1]
+
+
+def distilled(pipeline: Pipeline, X_t: np.ndarray, p_t: np.ndarray, trees: int, depth: int, random_state=None) -> Pipeline:
+    forest = RandomForestClassifier(n_estimators=trees, max_depth=depth, random_state=random_state, n_jobs=-1)
+    forest.fit(np.vstack([X_t, X_t]), np.repeat([1, 0], len(X_t)), sample_weight=np.concatenate([p_t, 1.0 - p_t]))
+    return Pipeline([("imputer", pipeline.named_steps["imputer"]), ("clf", forest)])
+
+
+def calibrate(pipeline: Pipeline, X_val, y_val):
+    return CalibratedClassifierCV(pipeline, method="sigmoid", cv="prefit").fit(X_val, y_val)
+
+
+def within_tolerance(entry: dict, full: dict, auc_tolerance: float, brier_tolerance: float) -> bool:
+    return (full["val_roc_auc"] - entry["val_roc_auc"] <= auc_tolerance
+            and entry["val_brier"] - full["val_brier"] <= brier_tolerance)
+
+
+def within_budget(entry: dict, latency_budget_us=None, size_budget_bytes=None) -> bool:
+    if latency_budget_us is not None and entry["latency_us"]["p99"] > latency_budget_us:
+        return False
+    if size_budget_bytes is not None and entry["compact_bytes"] > size_budget_bytes:
+        return False
+    return True
+
+
+def _search(candidates, full: dict, val, test, auc_tolerance, brier_tolerance):
+    """First candidate within tolerance: (model, entry, tried)."""
+    tried = []
+    for params, build in candidates:
+        model = calibrate(build(), *val)
+        entry = {**params, **describe(model, val, test)}
+        entry["within_tolerance"] = within_tolerance(entry, full, auc_tolerance, brier_tolerance)
+        tried.append({k: entry[k] for k in (*params, "nodes", "val_roc_auc", "val_brier", "within_tolerance")})
+        if entry["within_tolerance"]:
+            return model, entry, tried
+    return None, None, tried
+
+
+def compress(calibrated, pipeline: Pipeline, val, test, X_train, latency_budget_us: float = None,
+             size_budget_bytes: int = None, auc_tolerance: float = 0.005, brier_tolerance: float = 0.005,
+             random_state=None):
+    """Search both variants against the full ``calibrated`` model (built
+    from the fitted ``pipeline``); ``X_train`` seeds the distillation
+    transfer set. Returns (model to serve or None to keep
+    the full one, report). Without a budget nothing is replaced."""
+    t0 = time.perf_counter()
+    full = describe(calibrated, val, test)
+    n_full = len(pipeline.named_steps["clf"].estimators_)
+    full["trees"] = n_full
+    full["max_depth"] = pipeline.named_steps["clf"].max_depth
+
+    sub_model, sub, sub_tried = _search(
+        [({"trees": k}, lambda k=k: subforest(pipeline, k)) for k in SUBFOREST_SIZES if k < n_full],
+        full, val, test, auc_tolerance, brier_tolerance
+    )
+
+    X_t, p_t = transfer_set(pipeline, X_train, seed=random_state or 0)
+    dist_model, dist, dist_tried = _search(
+        [({"trees": t, "max_depth": d}, lambda t=t, d=d: distilled(pipeline, X_t, p_t, t, d, random_state))
+         for t, d in DISTILL_GRID],
+        full, val, test, auc_tolerance, brier_tolerance
+    )
+
+    budget = {"latency_p99_us": latency_budget_us, "compact_bytes": size_budget_bytes}
+    variants = {"full": (calibrated, full), "subforest": (sub_model, sub), "distilled": (dist_model, dist)}
+    for _, entry in variants.values():
+        if entry is not None:
+            entry["within_budget"] = within_budget(entry, latency_budget_us, size_budget_bytes)
+
+    selected = "full"
+    if latency_budget_us is not None or size_budget_bytes is not None:
+        eligible = [name for name, (_, entry) in variants.items() if entry is not None and entry["within_budget"]]
+        if eligible:
+            selected = min(eligible, key=lambda name: variants[name][1]["nodes"])
+
+    report = {
+        "budget": budget,
+        "tolerance": {"val_roc_auc": auc_tolerance, "val_brier": brier_tolerance},
+        "transfer_rows": len(X_t),
+        "full": full,
+        "subforest": sub,
+        "distilled": dist,
+        "selected": selected,
+        "tried": {"subforest": sub_tried, "distilled": dist_tried},
+        "search_seconds": round(time.perf_counter() - t0, 2),
+    }
+    return (None if selected == "full" else variants[selected][0]), report
+
+
+def print_report(report: dict):
+    print(f"{'model':<11}{'trees':>6}{'depth':>6}{'nodes':>8}{'KB':>8}{'p50 us':>8}{'p99 us':>8}"
+          f"{'val AUC':>9}{'Brier':>8}{'budget':>8}")
+    for name in ("full", "subforest", "distilled"):
+        e = report[name]
+        if e is None:
+            print(f"{name:<11}  tidak ada kandidat dalam toleransi")
+            continue
+        print(f"{name:<11}{e['trees']:>6}{e.get('max_depth') or '-':>6}{e['nodes']:>8,}{e['compact_bytes'] / 1e3:>8.0f}"
+              f"{e['latency_us']['p50']:>8.0f}{e['latency_us']['p99']:>8.0f}{e['val_roc_auc']:>9.4f}"
+              f"{e['val_brier']:>8.4f}{'ok' if e['within_budget'] else 'over':>8}")
+    print(f"Selected: {report['selected']} ({report['search_seconds']} s)")
@@ -0,0 +1,262 @@
+"""Lazy, thread-safe access to the trained model.
+
+Nothing is deserialized at import time: the first prediction loads the
+model (and compiles the inference engine) under a lock and later calls
+reuse the same objects. Cold starts that only serve the login page or
+dashboards skip the load entirely.
+
+The served artifact is the ACTIVE version of the model registry
+(services/model_registry.py) when there is one, else MODEL_PATH.
+
+Environment:
+    MODEL_PATH      artifact path without a registry
+                    (default: model_kelulusan.joblib)
+    MODEL_MMAP      "1" (default) memory-maps the numpy arrays joblib
+                    stores raw, "0" reads them into private memory
+    MODEL_PRELOAD   "1" loads eagerly in create_app(); combine with
+                    ``gunicorn --preload`` so forked workers share the
+                    loaded pages copy-on-write
+    MODEL_CHECK_INTERVAL
+                    seconds between checks of the registry pointer and
+                    the artifact's mtime/size (default: 5)
+    MODEL_GRID      "1" (default) serves on-grid inputs from the
+                    precomputed ``<model>.grid.npz`` table when present
+    MODEL_COMPACT   "1" (default) loads ``<model>.compact.bin`` instead of
+                    the joblib pickle when it was exported from that exact
+                    artifact (services/compact_model.py); MODEL_PATH may
+                    also point at a compact file directly
+    MODEL_SEGMENTS  "1" (default) loads the per-segment models trained
+                    with this exact artifact (``<model>.segments/``,
+                    services/segment_models.py) and routes students to them
+"""
+import hashlib
+import logging
+import os
+import threading
+import time
+
+import joblib
+
+from services import model_registry
+from services.compact_model import compact_path_for, is_compact_path, load_compact, read_header
+from services.explain import TreeExplainer
+from services.grid_lookup import ProbabilityGrid, grid_path_for
+from services.inference_engine import compile_model
+from services.segment_models import load_segments
+
+MODEL_PATH = os.environ.get("MODEL_PATH", "model_kelulusan.joblib")
+MODEL_MMAP = os.environ.get("MODEL_MMAP", "1") == "1"
+MODEL_CHECK_INTERVAL = float(os.environ.get("MODEL_CHECK_INTERVAL", "5"))
+MODEL_GRID = os.environ.get("MODEL_GRID", "1") == "1"
+MODEL_COMPACT = os.environ.get("MODEL_COMPACT", "1") == "1"
+MODEL_SEGMENTS = os.environ.get("MODEL_SEGMENTS", "1") == "1"
+
+DEFAULT_FEATURE_ORDER = ["ipk", "mengulang", "presensi", "sks_lulus"]
+
+log = logging.getLogger(__name__)
+
+
+class ModelBundle:
+    """Everything derived from one model artifact, loaded together."""
+
+    def __init__(self, model, path: str, version: str, signature=None, load_seconds: float = 0.0, engine=None):
+        # model is None when loaded from a compact artifact (engine only)
+        self.model = model
+        self.path = path
+        # content hash of the artifact; part of every cache key
+        self.version = version
+        self.signature = signature
+        self.load_seconds = load_seconds
+        if model is None:
+            self.feature_order = list(engine.feature_names)
+        else:
+            self.feature_order = list(getattr(model, "feature_names_in_", DEFAULT_FEATURE_ORDER))
+
+        # unsupported model types keep using model.predict_proba
+        if engine is None:
+            try:
+                engine = compile_model(model)
+            except TypeError:
+                engine = None
+        self.engine = engine
+
+        # per-leaf path contributions, precomputed once per model
+        self.explainer = TreeExplainer(self.engine) if self.engine is not None else None
+
+        self.grid = None
+        # services/segment_models.SegmentModels when segment models exist
+        self.segments = None
+
+
+_lock = threading.Lock()
+_reload_lock = threading.Lock()
+_bundle = None
+_next_check = 0.0
+
+
+def artifact_signature(path: str):
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_size)
+
+
+def artifact_version(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()[:12]
+
+
+def _matching_compact(path: str, version: str):
+    """The compact export of this exact joblib artifact, if there is one."""
+    compact = compact_path_for(path)
+    if not os.path.exists(compact):
+        return None
+    try:
+        header = read_header(compact)
+    except (OSError, ValueError):
+        log.warning("Ignoring unreadable %s", compact)
+        return None
+    if header.get("source_version") != version or header.get("precision") != "exact":
+        return None
+    return compact
+
+
+def load_grid(model_path: str, bundle: ModelBundle):
+    """Load the lookup table built for this exact model, if there is one."""
+    path = grid_path_for(model_path)
+    if not os.path.exists(path):
+        return None
+    grid = ProbabilityGrid.load(path)
+    if grid.model_version != bundle.version or grid.features != bundle.feature_order:
+        log.warning("Ignoring %s: built for model %s, loaded model is %s", path, grid.model_version, bundle.version)
+        return None
+    return grid
+
+
+def load_bundle(path: str = MODEL_PATH, mmap: bool = MODEL_MMAP) -> ModelBundle:
+    t0 = time.perf_counter()
+    signature = artifact_signature(path)
+
+    if is_compact_path(path):
+        engine, header = load_compact(path)
+        bundle = ModelBundle(None, path, header["model_version"], signature, engine=engine)
+        # the grid sits next to the joblib file the compact one came from
+        grid_source = os.path.join(os.path.dirname(path), header.get("source") or os.path.basename(path))
+    else:
+        version = artifact_version(path)
+        compact = _matching_compact(path, version) if MODEL_COMPACT else None
+        if compact is not None:
+            engine, _ = load_compact(compact)
+            bundle = ModelBundle(None, path, version, signature, engine=engine)
+        else:
+            model = joblib.load(path, mmap_mode="r" if mmap else None)
+            bundle = ModelBundle(model, path, version, signature)
+        grid_source = path
+
+    if MODEL_GRID:
+        bundle.grid = load_grid(grid_source, bundle)
+    if MODEL_SEGMENTS:
+        bundle.segments = load_segments(grid_source, bundle)
+    bundle.load_seconds = time.perf_counter() - t0
+    return bundle
+
+
+def warm_up(bundle: ModelBundle) -> ModelBundle:
+    """Run one prediction so lazy imports and first-call costs are paid
+    before the bundle starts serving requests."""
+    import numpy as np
+    import pandas as pd
+
+    row = np.array([[3.0, 100.0, 90.0, 0.0]])[:, :len(bundle.feature_order)]
+    if bundle.engine is not None:
+        bundle.engine.predict_positive(row)
+    else:
+        bundle.model.predict_proba(pd.DataFrame(row, columns=bundle.feature_order))
+    if bundle.grid is not None:
+        bundle.grid.lookup_one(row[0])
+    if bundle.segments is not None:
+        for seg in bundle.segments.bundles.values():
+            warm_up(seg)
+    return bundle
+
+
+def resolve_model_path() -> str:
+    """Artifact to serve: the registry's ACTIVE version, else MODEL_PATH."""
+    return model_registry.active_model_path() or MODEL_PATH
+
+
+def _needs_reload(bundle: ModelBundle, path: str) -> bool:
+    if path != bundle.path:
+        return True
+    try:
+        return artifact_signature(path) != bundle.signature
+    except OSError:
+        # artifact being replaced; keep serving the loaded one
+        return False
+
+
+def _refresh() -> ModelBundle:
+    global _bundle, _next_check
+
+    # first load: every caller waits until a model exists
+    if _bundle is None:
+        with _lock:
+            if _bundle is None:
+                _bundle = warm_up(load_bundle(resolve_model_path()))
+                _next_check = time.monotonic() + MODEL_CHECK_INTERVAL
+            return _bundle
+
+    # hot swap: one thread checks and loads, everyone else keeps serving
+    # the current bundle until the new one is warm
+    if not _reload_lock.acquire(blocking=False):
+        return _bundle
+    try:
+        if time.monotonic() < _next_check:
+            return _bundle
+        _next_check = time.monotonic() + MODEL_CHECK_INTERVAL
+
+        path = resolve_model_path()
+        if _needs_reload(_bundle, path):
+            try:
+                new_bundle = warm_up(load_bundle(path))
+            except Exception:
+                log.exception("Loading %s failed; keeping model %s", path, _bundle.version)
+            else:
+                log.info("Model swapped: %s -> %s", _bundle.version, new_bundle.version)
+                # single reference assignment; in-flight requests keep the
+                # bundle they already hold
+                _bundle = new_bundle
+        return _bundle
+    finally:
+        _reload_lock.release()
+
+
+def get_bundle() -> ModelBundle:
+    """Return the loaded model bundle, loading it on first use.
+
+    At most every MODEL_CHECK_INTERVAL seconds the registry pointer and
+    the artifact are checked. A new version is loaded and warmed up by the
+    one request that notices it, while other requests keep using the
+    current bundle, and then swapped in atomically.
+
+    Callers should fetch the bundle once per prediction and use it for
+    every step, so a swap never mixes two models within one request.
+    """
+    bundle = _bundle
+    if bundle is None or time.monotonic() >= _next_check:
+        bundle = _refresh()
+    return bundle
+
+
+def get_model():
+    return get_bundle().model
+
+
+def is_loaded() -> bool:
+    return _bundle is not None
+
+
+def preload():
+    """Eager load, e.g. in the gunicorn master before workers fork."""
+    get_bundle()
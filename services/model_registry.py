@@ -0,0 +1,135 @@
+"""Local registry of versioned model artifacts.
+
+Layout::
+
+    model_registry/
+        ACTIVE                      <- version currently served
+        <version>/
+            model_kelulusan.joblib
+            model_kelulusan.grid.npz   (optional)
+            model_kelulusan.compact.bin (optional)
+            model_kelulusan.segments/  (optional, per-segment models)
+            train_summary.json
+            meta.json
+
+A version is the content hash of its joblib artifact (the same value
+ModelBundle.version and Prediction.model_version carry). ``ACTIVE`` is
+replaced atomically with ``os.replace`` so readers never see a partial
+pointer; the model loader polls it and hot-swaps to the new version.
+"""
+import json
+import os
+import shutil
+from datetime import datetime
+from typing import Optional
+
+from services.compact_model import compact_path_for
+from services.grid_lookup import grid_path_for
+from services.segment_models import read_manifest, segments_dir_for
+
+REGISTRY_DIR = os.environ.get("MODEL_REGISTRY_DIR", "model_registry")
+ACTIVE_FILE = "ACTIVE"
+MODEL_FILE = "model_kelulusan.joblib"
+SUMMARY_FILE = "train_summary.json"
+META_FILE = "meta.json"
+
+
+def version_dir(version: str, registry_dir: str = REGISTRY_DIR) -> str:
+    return os.path.join(registry_dir, version)
+
+
+def model_path(version: str, registry_dir: str = REGISTRY_DIR) -> str:
+    return os.path.join(version_dir(version, registry_dir), MODEL_FILE)
+
+
+def active_version(registry_dir: str = REGISTRY_DIR) -> Optional[str]:
+    try:
+        with open(os.path.join(registry_dir, ACTIVE_FILE), encoding="utf-8") as f:
+            version = f.read().strip()
+    except FileNotFoundError:
+        return None
+    return version or None
+
+
+def active_model_path(registry_dir: str = REGISTRY_DIR) -> Optional[str]:
+    version = active_version(registry_dir)
+    if not version:
+        return None
+    return model_path(version, registry_dir)
+
+
+def activate(version: str, registry_dir: str = REGISTRY_DIR):
+    """Point ACTIVE at ``version`` (write temp file, then atomic rename)."""
+    if not os.path.exists(model_path(version, registry_dir)):
+        raise FileNotFoundError(f"Model version not in registry: {version}")
+    tmp = os.path.join(registry_dir, f".{ACTIVE_FILE}.{os.getpid()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(version + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, os.path.join(registry_dir, ACTIVE_FILE))
+
+
+def publish(model_file: str, summary_file: Optional[str] = None, activate_now: bool = True,
+            registry_dir: str = REGISTRY_DIR) -> str:
+    """Copy a trained artifact (plus summary, grid, compact export and
+    segment models) into the registry.
+
+    Returns the version. Files are staged in a temp directory and renamed
+    into place, so a half-copied version is never visible.
+    """
+    from services.model_loader import artifact_version
+
+    version = artifact_version(model_file)
+    target = version_dir(version, registry_dir)
+    if not os.path.exists(target):
+        os.makedirs(registry_dir, exist_ok=True)
+        staging = os.path.join(registry_dir, f".{version}.{os.getpid()}.tmp")
+        shutil.rmtree(staging, ignore_errors=True)
+        os.makedirs(staging)
+
+        shutil.copy2(model_file, os.path.join(staging, MODEL_FILE))
+        for path_for in (grid_path_for, compact_path_for):
+            extra = path_for(model_file)
+            if os.path.exists(extra):
+                shutil.copy2(extra, path_for(os.path.join(staging, MODEL_FILE)))
+        # segment models only when they were trained with this artifact
+        manifest = read_manifest(model_file)
+        if manifest is not None and manifest.get("global_version") == version:
+            shutil.copytree(segments_dir_for(model_file), segments_dir_for(os.path.join(staging, MODEL_FILE)))
+        if summary_file and os.path.exists(summary_file):
+            shutil.copy2(summary_file, os.path.join(staging, SUMMARY_FILE))
+
+        with open(os.path.join(staging, META_FILE), "w", encoding="utf-8") as f:
+            json.dump({
+                "version": version,
+                "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "source": os.path.abspath(model_file),
+            }, f, indent=2)
+
+        os.replace(staging, target)
+
+    if activate_now:
+        activate(version, registry_dir)
+    return version
+
+
+def list_versions(registry_dir: str = REGISTRY_DIR) -> list[dict]:
+    """All registered versions, oldest first, with their metadata and summary."""
+    if not os.path.isdir(registry_dir):
+        return []
+    active = active_version(registry_dir)
+    versions = []
+    for name in os.listdir(registry_dir):
+        meta_path = os.path.join(registry_dir, name, META_FILE)
+        if name.startswith(".") or not os.path.exists(meta_path):
+            continue
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        summary_path = os.path.join(registry_dir, name, SUMMARY_FILE)
+        if os.path.exists(summary_path):
+            with open(summary_path, encoding="utf-8") as f:
+                meta["summary"] = json.load(f)
+        meta["active"] = name == active
+        versions.append(meta)
+    return sorted(versions, key=lambda m: m.get("created_at", ""))
@@ -0,0 +1,93 @@
+"""Bounded LRU memoization of model probabilities.
+
+Keys are the canonical feature tuple (IPK at two decimals, the other
+inputs as integers), prefixed by the version of the model that scored
+it when segment models are served (model_key), so faculties routed to
+different models share the cache without evicting each other. Entries
+belong to one served (global) model version: the first lookup with a
+different version empties the cache, so a reloaded artifact never
+serves stale probabilities.
+"""
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+PREDICTION_CACHE_SIZE = int(os.environ.get("PREDICTION_CACHE_SIZE", "4096"))
+
+
+def canonical_key(ipk, mengulang, presensi, sks_lulus) -> Optional[tuple]:
+    """Canonical feature tuple, or None when the input is off the grid."""
+    ipk = float(ipk)
+    if round(ipk, 2) != ipk:
+        return None
+    return (ipk, int(mengulang), int(presensi), int(sks_lulus))
+
+
+def model_key(model_version, key) -> Optional[tuple]:
+    """``key`` scoped to the (segment) model that scores it."""
+    return None if key is None else (model_version, key)
+
+
+class PredictionCache:
+    def __init__(self, maxsize: int = PREDICTION_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _check_version(self, version):
+        if version != self._version:
+            if self._data:
+                self.invalidations += 1
+            self._data.clear()
+            self._version = version
+
+    def get(self, version, key) -> Optional[float]:
+        if key is None or self.maxsize <= 0:
+            return None
+        with self._lock:
+            self._check_version(version)
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, version, key, value: float):
+        if key is None or self.maxsize <= 0:
+            return
+        with self._lock:
+            self._check_version(version)
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "model_version": self._version,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+prediction_cache = PredictionCache()
@@ -1,47 +1,112 @@
-import joblib
+import numpy as np
 import pandas as pd
 from datetime import datetime
 import uuid
+from concurrent.futures import Future
 
-from services.auth_service import get_student_profile_by_username
+from services.batching import PredictionBatcher, PREDICTION_BATCHING
+from services.inference_pool import inference_pool
+from services.business_rules import (
+    DEFAULT_CONTEXT,
+    apply_rules_one,
+    assess,
+    classify_risk,
+    recommendation,
+)
+from services.auth_service import get_student_profile_by_username, get_student_profiles_by_usernames
+from services.model_loader import get_bundle
+from services.segment_models import route
+from services.metrics import span
+from services.prediction_cache import prediction_cache, canonical_key, model_key
 
-MODEL_PATH = "model_kelulusan.joblib"
-model = joblib.load(MODEL_PATH)
+def _model_proba(X: np.ndarray, bundle) -> np.ndarray:
+    # compiled engine gives the same probabilities without the sklearn overhead
+    if bundle.engine is not None:
+        return bundle.engine.predict_positive(X)
+    return bundle.model.predict_proba(pd.DataFrame(X, columns=bundle.feature_order))[:, 1]
 
-FEATURE_ORDER = list(getattr(model, "feature_names_in_", ["ipk", "mengulang", "presensi", "sks_lulus"]))
+def predict_proba(X: np.ndarray, bundle=None) -> np.ndarray:
+    """Positive-class probability for a 2-D array in the model's feature order.
 
-def classify_risk(prob: float) -> str:
-    if prob >= 0.85:
-        return "Low Risk"
-    elif prob >= 0.60:
-        return "Medium Risk"
-    return "High Risk"
+    On-grid rows are answered from the precomputed lookup table when the
+    model has one, the rest go through the model.
+    """
+    bundle = bundle or get_bundle()
+    if bundle.grid is None:
+        return _model_proba(X, bundle)
 
-def recommendation(risk: str) -> str:
-    return {
-        "Low Risk": "Pertahankan performa akademik dan tingkatkan konsistensi belajar.",
-        "Medium Risk": "Disarankan bimbingan akademik rutin dan evaluasi strategi belajar.",
-        "High Risk": "Perlu intervensi: konseling, pendampingan intensif, dan monitoring berkala."
-    }[risk]
+    if len(X) == 1:
+        prob = bundle.grid.lookup_one(X[0])
+        return np.array([prob]) if prob is not None else _model_proba(X, bundle)
 
-def predict_for_user(username: str, ipk: float, mengulang: int, presensi: int, sks_lulus: int) -> dict:
-    profile = get_student_profile_by_username(username)
-    if not profile:
-        raise ValueError("Profil mahasiswa tidak ditemukan.")
+    probs, on_grid = bundle.grid.lookup(X)
+    if not on_grid.all():
+        probs[~on_grid] = _model_proba(X[~on_grid], bundle)
+    return probs
+
+def predict_proba_async(X: np.ndarray, bundle=None) -> Future:
+    """Future of predict_proba(X, bundle).
+
+    With PREDICTION_POOL_SIZE > 0 the rows are scored in the inference
+    process pool, so the calling thread does not hold the GIL while the
+    model runs; otherwise they are scored in-process and the Future is
+    already resolved.
+    """
+    bundle = bundle or get_bundle()
+    if inference_pool.enabled:
+        return inference_pool.submit(X, bundle)
+
+    future = Future()
+    try:
+        future.set_result(predict_proba(X, bundle))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+def bundle_groups(bundles) -> list:
+    """(bundle, row indices) for every distinct bundle, first-seen order."""
+    groups = {}
+    for i, b in enumerate(bundles):
+        groups.setdefault(id(b), (b, []))[1].append(i)
+    return [(b, np.array(idx)) for b, idx in groups.values()]
+
+def predict_proba_routed(X: np.ndarray, bundles) -> np.ndarray:
+    """predict_proba where row i is scored by ``bundles[i]`` (segment
+    routing); one batch per distinct bundle, all submitted before waiting."""
+    groups = bundle_groups(bundles)
+    if len(groups) == 1:
+        return predict_proba_async(X, groups[0][0]).result()
+    futures = [(idx, predict_proba_async(X[idx], b)) for b, idx in groups]
+    probs = np.empty(len(X))
+    for idx, future in futures:
+        probs[idx] = future.result()
+    return probs
 
-    raw_input = {
+def _batch_proba(X: np.ndarray, bundle) -> np.ndarray:
+    return predict_proba_async(X, bundle).result()
+
+# concurrent single-row requests share one batched inference per window
+batcher = PredictionBatcher(_batch_proba)
+
+def _predict_one(X: np.ndarray, bundle) -> float:
+    # a table hit is cheaper than waiting for the batch window or the pool
+    if bundle.grid is not None:
+        prob = bundle.grid.lookup_one(X[0])
+        if prob is not None:
+            return prob
+    if PREDICTION_BATCHING:
+        return batcher.predict(X[0], bundle)
+    return float(_batch_proba(X, bundle)[0])
+
+def _raw_input(ipk, mengulang, presensi, sks_lulus) -> dict:
+    return {
         "ipk": float(ipk),
         "mengulang": int(mengulang),
         "presensi": int(presensi),
         "sks_lulus": int(sks_lulus),
     }
 
-    X = pd.DataFrame([[raw_input[f] for f in FEATURE_ORDER]], columns=FEATURE_ORDER)
-    prob = float(model.predict_proba(X)[0][1])
-
-    risk = classify_risk(prob)
-    rec = recommendation(risk)
-
+def _build_result(username: str, profile: dict, raw_input: dict, prob: float, risk: str, rec: str, timestamp: str, model_version: str) -> dict:
     return {
         "record_id": str(uuid.uuid4()),
         "username": username,
@@ -59,5 +124,102 @@ def predict_for_user(username: str, ipk: float, mengulang: int, presensi: int, s
         "probability": str(round(prob * 100, 2)),
         "risk": risk,
         "recommendation": rec,
-        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        "model_version": model_version,
+        "timestamp": timestamp
     }
+
+def explain_rows(X: np.ndarray, bundle) -> list:
+    """Per-feature contributions for every row of X (None per row when the
+    loaded model has no compiled engine)."""
+    if bundle.explainer is None:
+        return [None] * len(X)
+    probs, contribs = bundle.explainer.explain(X)
+    return [bundle.explainer.as_dict(p, c) for p, c in zip(probs, contribs)]
+
+def explain_rows_routed(X: np.ndarray, bundles) -> list:
+    out = [None] * len(X)
+    for b, idx in bundle_groups(bundles):
+        for i, explanation in zip(idx, explain_rows(X[idx], b)):
+            out[i] = explanation
+    return out
+
+def predict_for_user(username: str, ipk: float, mengulang: int, presensi: int, sks_lulus: int, explain: bool = False) -> dict:
+    with span("predict.profile_lookup"):
+        profile = get_student_profile_by_username(username)
+    if not profile:
+        raise ValueError("Profil mahasiswa tidak ditemukan.")
+
+    with span("predict.bundle"):
+        bundle = get_bundle()
+        # segment model of the student's fakultas/prodi/angkatan, else global
+        model = route(bundle, profile)
+
+    with span("predict.features"):
+        raw_input = _raw_input(ipk, mengulang, presensi, sks_lulus)
+        key = canonical_key(raw_input["ipk"], raw_input["mengulang"], raw_input["presensi"], raw_input["sks_lulus"])
+        # one LRU for every segment model; emptied only when the served bundle changes
+        key = model_key(model.version, key)
+        features = {**DEFAULT_CONTEXT, **raw_input}
+        X = np.array([[features[f] for f in model.feature_order]], dtype=float)
+
+    with span("predict.cache"):
+        prob = prediction_cache.get(bundle.version, key)
+    if prob is None:
+        with span("predict.model"):
+            prob = _predict_one(X, model)
+        prediction_cache.put(bundle.version, key, prob)
+
+    # business rule (post ML), dengan default akademik yang sama
+    with span("predict.rules"):
+        prob = apply_rules_one(prob, features)
+        risk = classify_risk(prob)
+        rec = recommendation(risk)
+
+    result = _build_result(username, profile, raw_input, prob, risk, rec, datetime.now().strftime("%Y-%m-%d %H:%M:%S"), bundle.version)
+    if explain:
+        with span("predict.explain"):
+            result["explanation"] = explain_rows(X, model)[0]
+    return result
+
+def predict_many(records, explain: bool = False) -> list[dict]:
+    """Score many students with a single batched predict_proba call and
+    one vectorized pass of the business rules.
+
+    `records` is an iterable of dicts with the same keys as the
+    predict_for_user arguments (username, ipk, mengulang, presensi,
+    sks_lulus). Results come back in input order, in the same shape as
+    predict_for_user. With ``explain`` every result also carries its
+    per-feature contributions, computed in one batched pass.
+    """
+    records = list(records)
+    if not records:
+        return []
+
+    usernames = [str(r.get("username") or "").strip() for r in records]
+    profiles = get_student_profiles_by_usernames(usernames)
+    missing = sorted({u for u in usernames if u not in profiles})
+    if missing:
+        raise ValueError(f"Profil mahasiswa tidak ditemukan: {', '.join(missing)}")
+
+    raw_inputs = [
+        _raw_input(r.get("ipk", 0), r.get("mengulang", 0), r.get("presensi", 0), r.get("sks_lulus", 0))
+        for r in records
+    ]
+
+    bundle = get_bundle()
+    models = [route(bundle, profiles[u]) for u in usernames]
+    X = np.array([[{**DEFAULT_CONTEXT, **raw}[f] for f in bundle.feature_order] for raw in raw_inputs], dtype=float)
+    probs = predict_proba_routed(X, models)
+
+    columns = {f: X[:, j] for j, f in enumerate(bundle.feature_order)}
+    probs, risks, recs = assess(probs, columns)
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    results = [
+        _build_result(username, profiles[username], raw, float(prob), risk, rec, timestamp, bundle.version)
+        for username, raw, prob, risk, rec in zip(usernames, raw_inputs, probs, risks, recs)
+    ]
+    if explain:
+        for result, explanation in zip(results, explain_rows_routed(X, models)):
+            result["explanation"] = explanation
+    return results
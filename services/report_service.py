@@ -1,8 +1,12 @@
+import itertools
 import pandas as pd
 from datetime import datetime
+from decimal import Decimal
 from reportlab.lib.pagesizes import A4
 from reportlab.pdfgen import canvas
 from reportlab.lib.colors import HexColor
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, PatternFill, Alignment
 from openpyxl.utils import get_column_letter
 
@@ -19,23 +23,29 @@ def _df(rows):
     return df
 
 def _summary(df):
+    # same keys as services/risk_summary.summarize()
     if df.empty:
-        return dict(total=0, low=0, med=0, high=0, lowp=0, medp=0, highp=0)
+        return dict(total=0, low=0, med=0, high=0, low_pct=0, med_pct=0, high_pct=0)
 
     total = len(df)
-    low = (df["risk"] == "Low Risk").sum()
-    med = (df["risk"] == "Medium Risk").sum()
-    high = (df["risk"] == "High Risk").sum()
+    low = int((df["risk"] == "Low Risk").sum())
+    med = int((df["risk"] == "Medium Risk").sum())
+    high = int((df["risk"] == "High Risk").sum())
 
     pct = lambda x: round((x / total) * 100, 1) if total else 0
     return {
         "total": total,
-        "low": low, "lowp": pct(low),
-        "med": med, "medp": pct(med),
-        "high": high, "highp": pct(high),
+        "low": low, "low_pct": pct(low),
+        "med": med, "med_pct": pct(med),
+        "high": high, "high_pct": pct(high),
     }
 
-def _latest_high_risk(df):
+def _latest_high_risk(df, latest=None):
+    # latest: rows that already are each student's newest prediction
+    # (prediction_repository latest_only); otherwise derived from df
+    if latest is not None:
+        high = _df(latest)
+        return high if high.empty else high.sort_values("probability", ascending=False)
     if df.empty:
         return df
     latest = df.sort_values("timestamp").drop_duplicates("nim", keep="last")
@@ -44,72 +54,103 @@ def _latest_high_risk(df):
 # =========================
 # EXPORT EXCEL (STYLED)
 # =========================
-def export_excel(rows, path):
-    df = _df(rows)
-    summary = _summary(df)
-    high = _latest_high_risk(df)
+def _cell(v):
+    if v is None or (isinstance(v, float) and v != v):
+        return None
+    return float(v) if isinstance(v, Decimal) else v
+
+
+def _header(ws, names, fill=None, alignment=None):
+    cells = []
+    for name in names:
+        cell = WriteOnlyCell(ws, value=name)
+        cell.font = Font(bold=True)
+        if fill is not None:
+            cell.fill = fill
+        if alignment is not None:
+            cell.alignment = alignment
+        cells.append(cell)
+    return cells
+
+
+def _set_widths(ws, names, sample):
+    # write-only sheets need widths before the first row: header + sample rows
+    for i, name in enumerate(names):
+        length = max([len(str(name))] + [len(str(r[i])) for r in sample if r[i] is not None])
+        ws.column_dimensions[get_column_letter(i + 1)].width = min(length + 4, 30)
+
+
+def _write_excel(path, summary, high, columns, chunks):
+    """Summary / HighRisk / AllData workbook; AllData rows are appended
+    chunk by chunk to a write-only workbook, so only one chunk is held."""
+    wb = Workbook(write_only=True)
+
+    # ---- SUMMARY SHEET ----
+    ws = wb.create_sheet("Summary")
+    ws.freeze_panes = "A2"
+    names = ["Total Prediksi", "Low Risk (%)", "Medium Risk (%)", "High Risk (%)"]
+    values = [
+        summary["total"],
+        f'{summary["low"]} ({summary["low_pct"]}%)',
+        f'{summary["med"]} ({summary["med_pct"]}%)',
+        f'{summary["high"]} ({summary["high_pct"]}%)',
+    ]
+    _set_widths(ws, names, [values])
+    ws.append(_header(ws, names, PatternFill("solid", fgColor="E8F0FE"), Alignment(horizontal="center")))
+    ws.append(values)
+
+    # ---- HIGH RISK SHEET ----
+    ws = wb.create_sheet("HighRisk")
+    ws.freeze_panes = "A2"
+    if not high.empty:
+        names = [
+            "nama_mahasiswa", "nim", "kelas", "probability",
+            "ipk", "presensi", "sks_lulus", "recommendation"
+        ]
+        rows = [[_cell(v) for v in r] for r in high[names].itertuples(index=False, name=None)]
+    else:
+        names, rows = ["nama_mahasiswa", "nim", "risk"], []
+    _set_widths(ws, names, rows)
+    ws.append(_header(ws, names, PatternFill("solid", fgColor="FDECEA")))
+    for r in rows:
+        ws.append(r)
+
+    # ---- ALL DATA ----
+    chunks = iter(chunks)
+    first = next(chunks, None)
+    if first is not None and len(first):
+        ws = wb.create_sheet("AllData")
+        ws.freeze_panes = "A2"
+        _set_widths(ws, columns, first)
+        ws.append(_header(ws, columns))
+        for chunk in itertools.chain([first], chunks):
+            for r in chunk:
+                ws.append([_cell(v) for v in r])
 
-    with pd.ExcelWriter(path, engine="openpyxl") as writer:
+    wb.save(path)
 
-        # ---- SUMMARY SHEET ----
-        summary_df = pd.DataFrame([{
-            "Total Prediksi": summary["total"],
-            "Low Risk (%)": f'{summary["low"]} ({summary["lowp"]}%)',
-            "Medium Risk (%)": f'{summary["med"]} ({summary["medp"]}%)',
-            "High Risk (%)": f'{summary["high"]} ({summary["highp"]}%)',
-        }])
-        summary_df.to_excel(writer, sheet_name="Summary", index=False)
 
-        ws = writer.book["Summary"]
-        ws.freeze_panes = "A2"
+def export_excel(rows, path, latest_high_risk=None):
+    df = _df(rows)
+    chunks = [list(df.itertuples(index=False, name=None))] if not df.empty else []
+    _write_excel(path, _summary(df), _latest_high_risk(df, latest_high_risk), list(df.columns), chunks)
 
-        header_fill = PatternFill("solid", fgColor="E8F0FE")
-        header_font = Font(bold=True)
-
-        for cell in ws[1]:
-            cell.font = header_font
-            cell.fill = header_fill
-            cell.alignment = Alignment(horizontal="center")
-
-        # ---- HIGH RISK SHEET ----
-        if not high.empty:
-            cols = [
-                "nama_mahasiswa", "nim", "kelas", "probability",
-                "ipk", "presensi", "sks_lulus", "recommendation"
-            ]
-            high[cols].to_excel(writer, sheet_name="HighRisk", index=False)
-        else:
-            pd.DataFrame(columns=["nama_mahasiswa","nim","risk"]).to_excel(
-                writer, sheet_name="HighRisk", index=False
-            )
 
-        ws = writer.book["HighRisk"]
-        ws.freeze_panes = "A2"
-        for cell in ws[1]:
-            cell.font = Font(bold=True)
-            cell.fill = PatternFill("solid", fgColor="FDECEA")
-
-        # ---- ALL DATA ----
-        if not df.empty:
-            df.to_excel(writer, sheet_name="AllData", index=False)
-            ws = writer.book["AllData"]
-            ws.freeze_panes = "A2"
-            for cell in ws[1]:
-                cell.font = Font(bold=True)
-
-        # ---- AUTO WIDTH ----
-        for sheet in writer.book.worksheets:
-            for col in sheet.columns:
-                length = max(len(str(c.value)) if c.value else 0 for c in col)
-                sheet.column_dimensions[get_column_letter(col[0].column)].width = min(length + 4, 30)
+def export_excel_stream(chunks, columns, path, summary, latest_high_risk):
+    """export_excel for data that does not fit in memory: ``chunks`` of row
+    tuples in ``columns`` order (prediction_repository.iter_predictions),
+    ``summary`` as risk_summary.summarize() and the latest High Risk rows."""
+    _write_excel(path, summary, _latest_high_risk(pd.DataFrame(), latest_high_risk), list(columns), chunks)
 
 # =========================
 # EXPORT PDF (PROFESSIONAL)
 # =========================
-def export_pdf(rows, path):
+def export_pdf(rows, path, latest_high_risk=None, summary=None):
+    # with summary and latest_high_risk given (from the database) rows is
+    # not needed: the PDF lists no individual predictions
     df = _df(rows)
-    s = _summary(df)
-    high = _latest_high_risk(df)
+    s = summary if summary is not None else _summary(df)
+    high = _latest_high_risk(df, latest_high_risk)
 
     c = canvas.Canvas(path, pagesize=A4)
     width, height = A4
@@ -141,9 +182,9 @@ def export_pdf(rows, path):
     c.setFont("Helvetica", 10)
 
     c.drawString(60, y-40, f"Total Prediksi : {s['total']}")
-    c.drawString(240, y-40, f"Low Risk : {s['low']} ({s['lowp']}%)")
-    c.drawString(60, y-60, f"Medium Risk : {s['med']} ({s['medp']}%)")
-    c.drawString(240, y-60, f"High Risk : {s['high']} ({s['highp']}%)")
+    c.drawString(240, y-40, f"Low Risk : {s['low']} ({s['low_pct']}%)")
+    c.drawString(60, y-60, f"Medium Risk : {s['med']} ({s['med_pct']}%)")
+    c.drawString(240, y-60, f"High Risk : {s['high']} ({s['high_pct']}%)")
 
     y -= 110
 
@@ -0,0 +1,202 @@
+"""Re-score every student's latest inputs with a new model version.
+
+After a retrain every stored prediction carries the old model's output.
+rescore_all() streams the newest prediction row per student (nim, via
+latest_predictions) out of the database through a server-side cursor,
+scores each chunk with one
+vectorized predict_proba + business-rule pass, and bulk-inserts the new
+rows tagged with the new model version, one transaction per chunk that
+also moves those students' latest_predictions rows to the new ones.
+
+Resuming is safe at any point:
+- students are read in nim order and a checkpoint file records the last
+  nim committed for the target version, so a restart skips ahead;
+- a student whose newest row already carries the target version is never
+  selected, so a chunk that committed before the checkpoint was written
+  is not inserted twice.
+
+Dialects other than Postgres (SQLite in development) cannot write while a
+read cursor is open, so there the chunks are fetched as keyset pages on
+nim instead of one streamed cursor.
+
+Must run inside a Flask app context (see scripts/rescore_predictions.py).
+"""
+import json
+import logging
+import os
+import time
+import uuid
+from datetime import datetime
+
+import numpy as np
+from sqlalchemy import insert, text
+
+from extensions import db
+from models.db_models import Prediction
+from models.prediction_repository import refresh_latest
+from services.business_rules import DEFAULT_CONTEXT, assess
+from services.model_loader import get_bundle
+from services.prediction_service import predict_proba_routed
+from services.segment_models import route
+
+RESCORE_CHUNK_SIZE = int(os.environ.get("RESCORE_CHUNK_SIZE", "5000"))
+RESCORE_CHECKPOINT = os.environ.get("RESCORE_CHECKPOINT", "rescore_checkpoint.json")
+
+INPUT_FEATURES = ("ipk", "mengulang", "presensi", "sks_lulus")
+PROFILE_COLUMNS = ("user_id", "username", "nama_mahasiswa", "nim", "prodi", "angkatan", "kelas")
+
+log = logging.getLogger(__name__)
+
+_COLUMNS = ", ".join(f"p.{c}" for c in PROFILE_COLUMNS + INPUT_FEATURES + ("model_version",))
+
+# newest row per nim: one latest_predictions row each, joined by primary key
+_LATEST_SQL = f"""
+SELECT {_COLUMNS}
+FROM latest_predictions l
+JOIN predictions p ON p.id = l.prediction_id
+WHERE l.nim > :after
+  AND (p.model_version IS NULL OR p.model_version <> :version)
+ORDER BY l.nim
+"""
+
+_COUNT_SQL = "SELECT COUNT(*) FROM latest_predictions WHERE nim > :after"
+
+
+# ======================================================
+# CHECKPOINT
+# ======================================================
+def load_checkpoint(path: str, version: str) -> dict:
+    """Checkpoint for ``version``; a checkpoint of another version is ignored."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            checkpoint = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+    return checkpoint if checkpoint.get("model_version") == version else {}
+
+
+def save_checkpoint(path: str, checkpoint: dict):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f, indent=2)
+    os.replace(tmp, path)
+
+
+# ======================================================
+# SCORING
+# ======================================================
+def _to_float(values) -> np.ndarray:
+    return np.array([np.nan if v is None else float(v) for v in values], dtype=float)
+
+
+def score_chunk(rows: list, bundle, timestamp: datetime) -> list[dict]:
+    """New Prediction rows (as dicts for a Core insert) for one chunk."""
+    columns = {f: _to_float([r[f] for r in rows]) for f in INPUT_FEATURES}
+    n = len(rows)
+    X = np.column_stack([
+        columns[f] if f in columns else np.full(n, float(DEFAULT_CONTEXT[f]))
+        for f in bundle.feature_order
+    ])
+    # stored rows carry prodi/angkatan/kelas, so they route like live requests
+    probs = predict_proba_routed(X, [route(bundle, r) for r in rows])
+    probs, risks, recs = assess(probs, columns)
+
+    out = []
+    for r, prob, risk, rec in zip(rows, probs, risks, recs):
+        row = {c: r[c] for c in PROFILE_COLUMNS}
+        row.update(
+            id=str(uuid.uuid4()),
+            ipk=r["ipk"],
+            mengulang=r["mengulang"],
+            presensi=r["presensi"],
+            sks_lulus=r["sks_lulus"],
+            probability=round(float(prob) * 100, 2),
+            risk=risk,
+            recommendation=rec,
+            model_version=bundle.version,
+            timestamp=timestamp,
+            created_at=timestamp,
+        )
+        out.append(row)
+    return out
+
+
+# ======================================================
+# JOB
+# ======================================================
+def _latest_inputs(engine, after: str, version: str, chunk_size: int, report: dict):
+    """Yield chunks (lists of row mappings) of the newest row per nim > after."""
+    with engine.connect() as reader:
+        remaining = reader.execute(text(_COUNT_SQL), {"after": after}).scalar() or 0
+        report["remaining_at_start"] = int(remaining)
+
+    if engine.dialect.name == "postgresql":
+        # one server-side cursor over the whole run; writes go through another
+        # connection so committing a chunk does not close it
+        with engine.connect() as reader:
+            result = reader.execution_options(stream_results=True, yield_per=chunk_size).execute(
+                text(_LATEST_SQL), {"after": after, "version": version}
+            )
+            for chunk in result.mappings().partitions(chunk_size):
+                yield chunk
+        return
+
+    # SQLite & co. cannot write while a read cursor is open: page by nim instead
+    sql = text(_LATEST_SQL + " LIMIT :limit")
+    while True:
+        with engine.connect() as reader:
+            chunk = reader.execute(sql, {"after": after, "version": version, "limit": chunk_size}).mappings().all()
+        if not chunk:
+            return
+        yield chunk
+        after = chunk[-1]["nim"]
+
+
+def rescore_all(bundle=None, chunk_size: int = RESCORE_CHUNK_SIZE, checkpoint_path: str = RESCORE_CHECKPOINT,
+                resume: bool = True, progress=None) -> dict:
+    """Re-score the latest inputs of every student with ``bundle``
+    (default: the served model). Returns the final checkpoint/report.
+
+    ``progress(report)`` is called after every committed chunk.
+    """
+    bundle = bundle or get_bundle()
+    checkpoint = load_checkpoint(checkpoint_path, bundle.version) if resume else {}
+    after = checkpoint.get("last_nim", "")
+    report = {
+        "model_version": bundle.version,
+        "last_nim": after,
+        "rescored": checkpoint.get("rescored", 0),
+        "chunks": checkpoint.get("chunks", 0),
+        "started_at": checkpoint.get("started_at") or datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "finished": False,
+    }
+
+    engine = db.engine
+    table = Prediction.__table__
+    t0 = time.perf_counter()
+    done_this_run = 0
+
+    for chunk in _latest_inputs(engine, after, bundle.version, chunk_size, report):
+        rows = score_chunk(chunk, bundle, datetime.utcnow())
+        with engine.begin() as writer:
+            writer.execute(insert(table), rows)
+            refresh_latest(writer, [r["nim"] for r in rows])
+
+        done_this_run += len(rows)
+        elapsed = time.perf_counter() - t0
+        report.update(
+            last_nim=rows[-1]["nim"],
+            rescored=report["rescored"] + len(rows),
+            chunks=report["chunks"] + 1,
+            updated_at=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            rate_per_minute=round(done_this_run / elapsed * 60) if elapsed else None,
+        )
+        save_checkpoint(checkpoint_path, report)
+        if progress:
+            progress(dict(report))
+
+    report["finished"] = True
+    report["seconds"] = round(time.perf_counter() - t0, 2)
+    save_checkpoint(checkpoint_path, report)
+    log.info("Rescored %d students with model %s", report["rescored"], bundle.version)
+    return report
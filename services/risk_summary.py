@@ -0,0 +1,56 @@
+"""Risk summaries (counts and percentages per risk level) for the
+dashboards and the risk-summary API.
+
+Counting happens in the database: summarize() issues one
+``GROUP BY risk`` query (models/prediction_repository.count_by_risk), so
+the cost does not grow with the number of stored predictions beyond the
+index scan, and no prediction row is loaded into Python. Slicing by
+fakultas, kelas, prodi, angkatan, advisor or time bucket is part of the
+same query. ``latest_only=True`` counts each student once, by their
+current risk (latest_predictions).
+"""
+from models.prediction_repository import count_by_risk
+
+RISK_LEVELS = (("low", "Low Risk"), ("med", "Medium Risk"), ("high", "High Risk"))
+
+
+def _pct(x: int, total: int) -> float:
+    return round((x / total) * 100, 1) if total else 0
+
+
+def empty_summary() -> dict:
+    return build_summary({})
+
+
+def build_summary(counts: dict) -> dict:
+    """{risk label: count} -> {"total", "low", "low_pct", "med", ...}.
+
+    Rows with another label (or none) count towards the total only.
+    """
+    total = sum(counts.values())
+    out = {"total": total}
+    for key, label in RISK_LEVELS:
+        n = counts.get(label, 0)
+        out[key] = n
+        out[f"{key}_pct"] = _pct(n, total)
+    return out
+
+
+def summarize(filters: dict = None, latest_only: bool = False) -> dict:
+    """Summary of every prediction matching ``filters`` (see
+    prediction_repository.FILTER_KEYS)."""
+    return build_summary({r["risk"]: r["count"] for r in count_by_risk(filters, latest_only=latest_only)})
+
+
+def summarize_by(filters: dict = None, group_by=(), bucket: str = None, latest_only: bool = False) -> list[dict]:
+    """One summary per group: [{<group keys>..., ["bucket"], "summary"}],
+    in the order of the group values."""
+    keys = list(group_by or ()) + (["bucket"] if bucket else [])
+    groups = {}
+    for r in count_by_risk(filters, group_by=group_by, bucket=bucket, latest_only=latest_only):
+        group = tuple(r[k] for k in keys)
+        groups.setdefault(group, {})[r["risk"]] = r["count"]
+    return [
+        {**dict(zip(keys, group)), "summary": build_summary(counts)}
+        for group, counts in groups.items()
+    ]
@@ -0,0 +1,175 @@
+"""Per-segment models (one per fakultas, prodi or angkatan) next to the
+global model.
+
+``train_model.py --segment-by ...`` writes::
+
+    model_kelulusan.segments/
+        manifest.json                 segment column, global model version,
+                                      one entry per segment model
+        <segment>.joblib              calibrated pipeline of one segment
+        <segment>.compact.bin         its compact export
+
+The loader attaches the segment bundles to the global bundle when the
+manifest was written for that exact global version (like the grid).
+Predictions route each student to their segment's bundle and fall back to
+the global one for students without a segment value or whose segment has
+no model. Stored predictions keep the global version: the manifest
+belongs to it, so a retrain still marks every row for re-scoring.
+
+Fakultas is not on the student profile; it is resolved through the
+student's kelas with one small cached query.
+
+Environment:
+    SEGMENT_MAP_TTL   seconds the kelas -> fakultas map is cached (default: 300)
+"""
+import json
+import logging
+import math
+import os
+import re
+import threading
+import time
+import zlib
+
+SEGMENT_MAP_TTL = float(os.environ.get("SEGMENT_MAP_TTL", "300"))
+
+SEGMENT_COLUMNS = ("fakultas", "prodi", "angkatan")
+SEGMENTS_SUFFIX = ".segments"
+MANIFEST_FILE = "manifest.json"
+
+log = logging.getLogger(__name__)
+
+
+def segments_dir_for(model_path: str) -> str:
+    """model_kelulusan.joblib -> model_kelulusan.segments"""
+    return os.path.splitext(model_path)[0] + SEGMENTS_SUFFIX
+
+
+def segment_key(value):
+    """Canonical segment value: stripped text, integral numbers without
+    ".0" (angkatan 2023 and "2023" are one segment); None when missing."""
+    if value is None:
+        return None
+    if isinstance(value, float):
+        if math.isnan(value):
+            return None
+        if value.is_integer():
+            value = int(value)
+    key = str(value).strip()
+    return key or None
+
+
+def segment_file(value: str) -> str:
+    """File stem for a segment value (any text; the checksum keeps
+    values that differ only in punctuation apart)."""
+    slug = re.sub(r"[^A-Za-z0-9_-]+", "_", value).strip("_")[:40] or "segment"
+    return f"{slug}-{zlib.crc32(value.encode('utf-8')):08x}"
+
+
+# ======================================================
+# KELAS -> FAKULTAS
+# ======================================================
+_fakultas_map = None
+_fakultas_map_expires = 0.0
+_fakultas_lock = threading.Lock()
+
+
+def _load_fakultas_map() -> dict:
+    from extensions import db
+    from models.db_models import Fakultas, Kelas
+
+    rows = (
+        db.session.query(Kelas.id, Kelas.code, Fakultas.code)
+        .join(Fakultas, Kelas.fakultas_id == Fakultas.id)
+        .all()
+    )
+    mapping = {}
+    for kelas_id, kelas_code, fakultas_code in rows:
+        # profiles carry the kelas id; older rows the kelas code
+        mapping[str(kelas_id)] = fakultas_code
+        mapping[kelas_code] = fakultas_code
+    return mapping
+
+
+def fakultas_for_kelas(kelas):
+    global _fakultas_map, _fakultas_map_expires
+
+    kelas = segment_key(kelas)
+    if kelas is None:
+        return None
+    if _fakultas_map is None or time.monotonic() >= _fakultas_map_expires:
+        with _fakultas_lock:
+            if _fakultas_map is None or time.monotonic() >= _fakultas_map_expires:
+                try:
+                    _fakultas_map = _load_fakultas_map()
+                except Exception:
+                    log.exception("Loading the kelas -> fakultas map failed")
+                    _fakultas_map = _fakultas_map or {}
+                _fakultas_map_expires = time.monotonic() + SEGMENT_MAP_TTL
+    return _fakultas_map.get(kelas)
+
+
+def profile_segment(by: str, profile: dict):
+    """Segment value of a student profile (or a stored prediction row)."""
+    if not profile:
+        return None
+    if by == "fakultas":
+        return fakultas_for_kelas(profile.get("kelas"))
+    return segment_key(profile.get(by))
+
+
+# ======================================================
+# LOADED SEGMENTS
+# ======================================================
+class SegmentModels:
+    """Segment bundles of one global bundle, keyed by segment value."""
+
+    def __init__(self, by: str, bundles: dict, manifest: dict):
+        self.by = by
+        self.bundles = bundles
+        self.manifest = manifest
+
+    def bundle_for(self, profile: dict, default):
+        return self.bundles.get(profile_segment(self.by, profile), default)
+
+
+def read_manifest(model_path: str):
+    path = os.path.join(segments_dir_for(model_path), MANIFEST_FILE)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        log.warning("Ignoring unreadable %s", path)
+        return None
+
+
+def load_segments(model_path: str, bundle):
+    """Segment bundles trained together with ``bundle``, if there are any."""
+    from services.model_loader import load_bundle
+
+    manifest = read_manifest(model_path)
+    if manifest is None:
+        return None
+    if manifest.get("global_version") != bundle.version:
+        log.warning("Ignoring segment models of %s: built for model %s, loaded model is %s",
+                    model_path, manifest.get("global_version"), bundle.version)
+        return None
+
+    directory = segments_dir_for(model_path)
+    bundles = {}
+    for value, entry in manifest.get("segments", {}).items():
+        seg = load_bundle(os.path.join(directory, entry["file"]))
+        if seg.version != entry.get("version") or seg.feature_order != bundle.feature_order:
+            log.warning("Ignoring segment model %s=%s: artifact does not match the manifest", manifest["by"], value)
+            continue
+        bundles[value] = seg
+    return SegmentModels(manifest["by"], bundles, manifest) if bundles else None
+
+
+def route(bundle, profile: dict):
+    """The bundle that scores this student: their segment's, else ``bundle``."""
+    if bundle.segments is None:
+        return bundle
+    return bundle.segments.bundle_for(profile, bundle)
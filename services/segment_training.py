@@ -0,0 +1,244 @@
+"""Parallel training of one model per segment (fakultas, prodi, angkatan).
+
+The rows are sorted by segment once and the feature matrix and labels are
+copied into one shared-memory block (multiprocessing.shared_memory), so
+every segment is a contiguous slice of it. Worker processes attach to the
+block by name: a task pickles only the slice bounds and the unfitted
+pipeline, never the data. The largest segments are submitted first so
+the pool does not end on one long task.
+
+Rows keep the train/val/test assignment of the global model's split
+(``split`` codes), so a segment model never trains on rows the global
+model is tested on and both are compared on the same held-out rows.
+Each worker fits the pipeline with the global model's best parameters on
+its segment's training rows, calibrates it on the segment's validation
+rows and writes it, with its compact export, into the segment directory
+(services/segment_models.py). Segments below ``min_rows`` rows or with a
+single class in a split are skipped; their students keep using the
+global model.
+
+Environment:
+    SEGMENT_MIN_ROWS     smallest segment that gets its own model (default: 200)
+    SEGMENT_TRAIN_START  multiprocessing start method (default: spawn)
+"""
+import json
+import multiprocessing
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+from joblib import dump, effective_n_jobs
+from sklearn.base import clone
+from sklearn.metrics import roc_auc_score
+
+from services.segment_models import MANIFEST_FILE, segment_file, segment_key, segments_dir_for
+
+SEGMENT_MIN_ROWS = int(os.environ.get("SEGMENT_MIN_ROWS", "200"))
+SEGMENT_TRAIN_START = os.environ.get("SEGMENT_TRAIN_START", "spawn")
+
+
+# ======================================================
+# SHARED DATASET
+# ======================================================
+class SharedDataset:
+    """Feature matrix (float64), labels (int8) and split codes (int8) in
+    one block. Rows are written in ``order`` straight into the block,
+    without an intermediate sorted copy."""
+
+    def __init__(self, X: np.ndarray, y: np.ndarray, split: np.ndarray, order: np.ndarray):
+        self.n_rows, self.n_cols = len(order), X.shape[1]
+        self.shm = shared_memory.SharedMemory(create=True, size=max(self.n_rows * (self.n_cols * 8 + 2), 1))
+        self.X, self.y, self.split = self.views(self.shm.buf, self.n_rows, self.n_cols)
+        np.take(X, order, axis=0, out=self.X)
+        np.take(y, order, out=self.y)
+        np.take(split, order, out=self.split)
+
+    @staticmethod
+    def views(buf, n_rows: int, n_cols: int):
+        X = np.ndarray((n_rows, n_cols), dtype=np.float64, buffer=buf)
+        y = np.ndarray((n_rows,), dtype=np.int8, buffer=buf, offset=n_rows * n_cols * 8)
+        split = np.ndarray((n_rows,), dtype=np.int8, buffer=buf, offset=n_rows * (n_cols * 8 + 1))
+        return X, y, split
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def close(self):
+        # views must be gone before the block can be closed
+        self.X = self.y = self.split = None
+        self.shm.close()
+        self.shm.unlink()
+
+
+# ======================================================
+# WORKER
+# ======================================================
+def _fit_segment(shm_name, n_rows, n_cols, start, stop, value, pipeline, features, out_dir):
+    """Fit, calibrate and save one segment model; runs in a worker."""
+    from sklearn.calibration import CalibratedClassifierCV
+
+    from services.compact_model import compact_path_for, export_compact, validate_compact
+    from services.inference_engine import compile_model
+    from services.model_loader import artifact_version
+
+    t0 = time.perf_counter()
+    cpu0 = time.process_time()
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        X_all, y_all, split_all = SharedDataset.views(shm.buf, n_rows, n_cols)
+        # copy the slice out: the block is unmapped when closed
+        X = pd.DataFrame(X_all[start:stop].copy(), columns=features)
+        y = pd.Series(y_all[start:stop].astype(int))
+        split = split_all[start:stop].copy()
+        del X_all, y_all, split_all
+    finally:
+        shm.close()
+
+    report = {"segment": value, "rows": stop - start, "positive_rate": round(float(y.mean()), 4)}
+    train, val, test = ((X[split == code], y[split == code]) for code in (0, 1, 2))
+    if min(train[1].nunique(), val[1].nunique(), test[1].nunique()) < 2:
+        return {**report, "skipped": "single class in a split"}
+
+    model = pipeline.fit(*train)
+    calibrated = CalibratedClassifierCV(model, method="sigmoid", cv="prefit").fit(*val)
+
+    stem = segment_file(value)
+    path = os.path.join(out_dir, f"{stem}.joblib")
+    dump(calibrated, path)
+    version = artifact_version(path)
+    compact = export_compact(compile_model(calibrated), compact_path_for(path), version, source=os.path.basename(path))
+    if not validate_compact(calibrated, compact["path"], test[0].to_numpy(dtype=float))["exact"]:
+        os.remove(compact["path"])
+
+    return {
+        **report,
+        "file": os.path.basename(path),
+        "version": version,
+        "split_rows": {"train": len(train[1]), "val": len(val[1]), "test": len(test[1])},
+        "val_roc_auc": round(float(roc_auc_score(val[1], calibrated.predict_proba(val[0])[:, 1])), 6),
+        "test_roc_auc": round(float(roc_auc_score(test[1], calibrated.predict_proba(test[0])[:, 1])), 6),
+        "test_index": (start + np.flatnonzero(split == 2)).tolist(),
+        "fit_seconds": round(time.perf_counter() - t0, 2),
+        "cpu_seconds": round(time.process_time() - cpu0, 2),
+        "pid": os.getpid(),
+    }
+
+
+# ======================================================
+# PARENT
+# ======================================================
+def _segment_slices(segments):
+    """Stable sort order and (value, start, stop) per segment; rows
+    without a segment value are left out."""
+    keys = np.array([segment_key(v) or "" for v in segments], dtype=object)
+    order = np.argsort(keys, kind="stable")
+    order = order[keys[order] != ""]
+    sorted_keys = keys[order]
+    values, starts = np.unique(sorted_keys, return_index=True)
+    stops = list(starts[1:]) + [len(order)]
+    return order, [(str(v), int(a), int(b)) for v, a, b in zip(values, starts, stops)]
+
+
+def train_segments(X: pd.DataFrame, y, split, segments, pipeline, model_path: str, global_model, global_version: str,
+                   by: str, n_jobs: int = -1, min_rows: int = SEGMENT_MIN_ROWS,
+                   start_method: str = SEGMENT_TRAIN_START) -> dict:
+    """Train one model per segment value in parallel and write them next to
+    ``model_path``. ``split`` holds the global split per row (0 train,
+    1 val, 2 test), ``pipeline`` is the unfitted template (the global
+    model's parameters) and ``global_model`` (optional) is only used for
+    comparison. Returns the training report (also summarized in the
+    manifest)."""
+    t0 = time.perf_counter()
+    cpu0 = time.process_time()
+    features = list(X.columns)
+    order, slices = _segment_slices(segments)
+
+    trainable = [s for s in slices if s[2] - s[1] >= min_rows]
+    skipped = {v: f"{b - a} rows < {min_rows}" for v, a, b in slices if b - a < min_rows}
+    # one thread per worker; the workers are the parallelism
+    template = clone(pipeline).set_params(clf__n_jobs=1)
+
+    final_dir = segments_dir_for(model_path)
+    staging = f"{final_dir}.{os.getpid()}.tmp"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+
+    jobs = min(effective_n_jobs(n_jobs), max(len(trainable), 1))
+    data = SharedDataset(X.to_numpy(dtype=np.float64), np.asarray(y, dtype=np.int8), np.asarray(split, dtype=np.int8), order)
+    shared_bytes = data.shm.size
+    entries = {}
+    worker_cpu = 0.0
+    try:
+        with ProcessPoolExecutor(max_workers=jobs, mp_context=multiprocessing.get_context(start_method)) as pool:
+            futures = [
+                pool.submit(_fit_segment, data.name, data.n_rows, data.n_cols, a, b, v, template, features, staging)
+                for v, a, b in sorted(trainable, key=lambda s: s[1] - s[2])
+            ]
+            results = [f.result() for f in futures]
+
+        for r in results:
+            if "skipped" in r:
+                skipped[r["segment"]] = r["skipped"]
+                continue
+            idx = np.array(r.pop("test_index"))
+            r["global_test_roc_auc"] = None
+            if global_model is not None:
+                prob = global_model.predict_proba(pd.DataFrame(data.X[idx], columns=features))[:, 1]
+                r["global_test_roc_auc"] = round(float(roc_auc_score(data.y[idx], prob)), 6)
+            if r.pop("pid") != os.getpid():
+                worker_cpu += r["cpu_seconds"]
+            entries[r["segment"]] = r
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    finally:
+        data.close()
+
+    wall = time.perf_counter() - t0
+    report = {
+        "by": by,
+        "segments_total": len(slices),
+        "segments_trained": len(entries),
+        "rows_without_segment": len(X) - len(order),
+        "n_jobs": jobs,
+        "start_method": start_method,
+        "shared_bytes": shared_bytes,
+        "wall_seconds": round(wall, 2),
+        "cpu_seconds": round(worker_cpu + time.process_time() - cpu0, 2),
+        "segments": entries,
+        "skipped": skipped,
+    }
+
+    manifest = {
+        "by": by,
+        "global_version": global_version,
+        "features": features,
+        "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "segments": {v: {k: e[k] for k in ("file", "version", "rows", "val_roc_auc", "test_roc_auc",
+                                           "global_test_roc_auc")} for v, e in entries.items()},
+        "skipped": skipped,
+    }
+    with open(os.path.join(staging, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+    # replace the previous set as a whole
+    shutil.rmtree(final_dir, ignore_errors=True)
+    os.replace(staging, final_dir)
+    return report
+
+
+def print_report(report: dict):
+    print(f"{report['by']:<16}{'rows':>9}{'fit s':>8}{'test AUC':>10}{'global':>8}")
+    for value, e in sorted(report["segments"].items(), key=lambda kv: -kv[1]["rows"]):
+        glob = f"{e['global_test_roc_auc']:>8.4f}" if e["global_test_roc_auc"] is not None else f"{'-':>8}"
+        print(f"{value:<16}{e['rows']:>9,}{e['fit_seconds']:>8.1f}{e['test_roc_auc']:>10.4f}{glob}")
+    for value, reason in report["skipped"].items():
+        print(f"{value:<16}  dilewati: {reason}")
+    print(f"{report['segments_trained']} model segmen, {report['n_jobs']} proses, {report['wall_seconds']} s "
+          f"(CPU {report['cpu_seconds']} s)")
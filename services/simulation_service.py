@@ -0,0 +1,136 @@
+"""Read-only what-if simulation over one or two input features.
+
+A simulation takes a base input (ipk, mengulang, presensi, sks_lulus) and
+a sweep range for one or two features, scores every point of the grid
+with one batched predict_proba call (the precomputed lookup table answers
+on-grid points, which is all of them since sweep values are snapped to
+each feature's step) and applies the business rules to the whole surface
+in one pass.
+
+For every risk threshold it also reports the smallest change from the
+base that reaches it, measured as the sum of |change| / feature range over
+the swept features. Nothing is written to the database.
+"""
+import time
+
+import numpy as np
+
+from services.business_rules import DEFAULT_CONTEXT, RISK_THRESHOLDS, apply_rules, classify_risk
+from services.grid_lookup import GRID_SPEC
+from services.model_loader import get_bundle
+from services.prediction_service import predict_proba
+from services.segment_models import route
+
+SIMULATION_FEATURES = ("ipk", "mengulang", "presensi", "sks_lulus")
+MAX_SWEEPS = 2
+MAX_STEPS = 200
+DEFAULT_STEPS = 100
+
+
+def _parse_base(base: dict) -> dict:
+    out = {}
+    for f in SIMULATION_FEATURES:
+        if f not in base or base[f] in (None, ""):
+            raise ValueError(f"Nilai dasar '{f}' wajib diisi.")
+        try:
+            out[f] = float(base[f])
+        except (TypeError, ValueError):
+            raise ValueError(f"Nilai dasar '{f}' tidak valid.")
+    return out
+
+
+def base_from_prediction(row) -> dict:
+    """Simulation base taken from a stored prediction row (may be empty)."""
+    if not row:
+        return {}
+    return {f: row[f] for f in SIMULATION_FEATURES if row.get(f) not in (None, "")}
+
+
+def _sweep_values(sweep: dict) -> tuple:
+    feature = sweep.get("feature")
+    if feature not in SIMULATION_FEATURES:
+        raise ValueError(f"Fitur simulasi tidak dikenal: {feature}")
+
+    lo, hi, step = GRID_SPEC[feature]
+    try:
+        start = float(sweep.get("min", lo))
+        stop = float(sweep.get("max", hi))
+        steps = int(sweep.get("steps", DEFAULT_STEPS))
+    except (TypeError, ValueError):
+        raise ValueError(f"Rentang simulasi '{feature}' tidak valid.")
+    if not (lo <= start <= stop <= hi):
+        raise ValueError(f"Rentang '{feature}' harus di dalam {lo}..{hi}.")
+    if not 1 <= steps <= MAX_STEPS:
+        raise ValueError(f"Jumlah langkah '{feature}' harus 1..{MAX_STEPS}.")
+
+    # snap to the feature's natural step so every point hits the lookup table
+    values = np.linspace(start, stop, steps) if steps > 1 else np.array([start])
+    values = np.unique(np.round(np.round(values / step) * step, 10))
+    return feature, values
+
+
+def simulate(base: dict, sweeps: list, bundle=None, profile: dict = None) -> dict:
+    """Probability surface over 1 or 2 swept features around ``base``.
+
+    ``sweeps`` is a list of {"feature", "min", "max", "steps"}; min/max
+    default to the feature's full range and steps to DEFAULT_STEPS.
+    ``profile`` (prodi/angkatan/kelas) selects the student's segment model.
+    Raises ValueError for invalid input.
+    """
+    t0 = time.perf_counter()
+    base = _parse_base(base or {})
+    if not sweeps or len(sweeps) > MAX_SWEEPS:
+        raise ValueError(f"Simulasi membutuhkan 1 sampai {MAX_SWEEPS} fitur.")
+    axes = [_sweep_values(s) for s in sweeps]
+    if len({f for f, _ in axes}) != len(axes):
+        raise ValueError("Fitur simulasi tidak boleh sama.")
+
+    bundle = route(bundle or get_bundle(), profile)
+    mesh = np.meshgrid(*[v for _, v in axes], indexing="ij")
+    shape = mesh[0].shape
+    n = mesh[0].size
+
+    # row 0 is the base input itself, scored in the same batch
+    columns = {f: np.full(n + 1, v, dtype=float) for f, v in {**DEFAULT_CONTEXT, **base}.items()}
+    for (feature, _), grid in zip(axes, mesh):
+        columns[feature][1:] = grid.ravel()
+
+    X = np.column_stack([columns[f] for f in bundle.feature_order])
+    probs = apply_rules(predict_proba(X, bundle), columns)
+    base_prob, probs = float(probs[0]), probs[1:]
+    columns = {f: c[1:] for f, c in columns.items()}
+
+    # jarak ternormalisasi dari nilai dasar, hanya untuk fitur yang disimulasikan
+    distance = np.zeros(n)
+    for feature, _ in axes:
+        lo, hi, _ = GRID_SPEC[feature]
+        distance += np.abs(columns[feature] - base[feature]) / (hi - lo)
+
+    targets = []
+    for threshold, label in reversed(RISK_THRESHOLDS):
+        reached = probs >= threshold
+        already = base_prob >= threshold
+        target = {"risk": label, "threshold": threshold, "already": already, "reachable": already or bool(reached.any())}
+        if already:
+            target.update(change={f: 0.0 for f, _ in axes}, probability=round(base_prob, 4))
+        elif reached.any():
+            # nearest point first, higher probability breaks ties
+            i = int(np.lexsort((-probs, np.where(reached, distance, np.inf)))[0])
+            target.update(
+                point={f: float(columns[f][i]) for f, _ in axes},
+                change={f: round(float(columns[f][i] - base[f]), 4) for f, _ in axes},
+                probability=round(float(probs[i]), 4),
+            )
+        targets.append(target)
+
+    return {
+        "model_version": bundle.version,
+        "base": base,
+        "base_probability": round(base_prob, 4),
+        "base_risk": classify_risk(base_prob),
+        "axes": [{"feature": f, "values": v.tolist()} for f, v in axes],
+        "probability": np.round(probs.reshape(shape), 4).tolist(),
+        "targets": targets,
+        "points": n,
+        "elapsed_ms": round((time.perf_counter() - t0) * 1e3, 2),
+    }
@@ -0,0 +1,172 @@
+"""Synthetic datasets shaped like dataset_kelulusan_mahasiswa.csv.
+
+The real dataset (500 rows) is profiled once:
+
+- every column's marginal distribution, kept as its sorted values, so
+  generated columns have the same ranges, steps and frequencies (IPK to
+  two decimals, the rest integers, binary flags stay binary);
+- the dependence between columns, as the correlation of their normal
+  scores (a Gaussian copula);
+- the label, as a logistic regression of lulus_tepat_waktu on the other
+  columns, so the relation between inputs and outcome (and the positive
+  rate) carries over.
+
+Rows are drawn from the copula, mapped through each column's empirical
+quantiles, and labelled by sampling the fitted probability. Generation is
+chunked and seeded per chunk, so any size can be streamed to CSV with
+constant memory and the same seed always produces the same file.
+
+Optionally a segment column (fakultas, prodi, angkatan) is added: rows
+are spread evenly over the given values and every segment labels them
+with its own perturbed label model (shifted intercept, rescaled
+coefficients), so segments graduate differently, as real faculties do.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+SOURCE_PATH = "dataset_kelulusan_mahasiswa.csv"
+COLUMNS = ["ipk", "sks_lulus", "presensi", "mengulang", "semester", "bekerja", "cuti"]
+TARGET = "lulus_tepat_waktu"
+DECIMALS = {"ipk": 2}
+CHUNK_ROWS = 500_000
+# per-segment label model: intercept shift (logit sd) and coefficient scale range
+SEGMENT_SHIFT = 1.0
+SEGMENT_COEF_SPREAD = 0.5
+
+
+def parse_rows(value: str) -> int:
+    """Row counts like "10k", "1M", "10_000"."""
+    value = value.strip().lower().replace("_", "")
+    scale = {"k": 1_000, "m": 1_000_000}.get(value[-1:], 1)
+    return int(float(value[:-1] if scale > 1 else value) * scale)
+
+
+def _normal_scores(values: np.ndarray) -> np.ndarray:
+    from scipy.stats import norm, rankdata
+
+    return norm.ppf(rankdata(values) / (len(values) + 1))
+
+
+def fit_profile(df: pd.DataFrame) -> dict:
+    """Marginals, copula correlation and label model of a real dataset."""
+    from sklearn.linear_model import LogisticRegression
+
+    df = df[COLUMNS + [TARGET]].apply(pd.to_numeric, errors="coerce").dropna()
+    X = df[COLUMNS].to_numpy(dtype=float)
+    y = df[TARGET].to_numpy(dtype=int)
+
+    scores = np.column_stack([_normal_scores(X[:, j]) for j in range(X.shape[1])])
+    corr = np.corrcoef(scores, rowvar=False)
+    # keep it positive definite for the Cholesky factor
+    corr = corr + np.eye(len(COLUMNS)) * 1e-6
+
+    mean, std = X.mean(axis=0), X.std(axis=0)
+    std[std == 0] = 1.0
+    logit = LogisticRegression(max_iter=1000).fit((X - mean) / std, y)
+
+    return {
+        "columns": list(COLUMNS),
+        "marginals": [np.sort(X[:, j]) for j in range(X.shape[1])],
+        "cholesky": np.linalg.cholesky(corr),
+        "scale_mean": mean,
+        "scale_std": std,
+        "coef": logit.coef_[0],
+        "intercept": float(logit.intercept_[0]),
+        "source_rows": len(df),
+        "positive_rate": float(y.mean()),
+    }
+
+
+def load_profile(path: str = SOURCE_PATH) -> dict:
+    return fit_profile(pd.read_csv(path))
+
+
+def generate(profile: dict, n: int, seed: int = 0, offset: int = 0) -> pd.DataFrame:
+    """``n`` synthetic rows; chunk ``offset`` makes chunks independent."""
+    from scipy.stats import norm
+
+    rng = np.random.default_rng([seed, offset])
+    z = rng.standard_normal((n, len(profile["columns"]))) @ profile["cholesky"].T
+    u = norm.cdf(z)
+
+    data = {}
+    for j, col in enumerate(profile["columns"]):
+        values = profile["marginals"][j]
+        # inverse empirical CDF: interpolate continuous columns, pick observed values otherwise
+        if col in DECIMALS:
+            q = np.interp(u[:, j], np.linspace(0, 1, len(values)), values)
+            data[col] = np.round(q, DECIMALS[col])
+        else:
+            idx = np.minimum((u[:, j] * len(values)).astype(np.int64), len(values) - 1)
+            data[col] = values[idx].astype(np.int64)
+
+    X = np.column_stack([data[c] for c in profile["columns"]]).astype(float)
+    logit = ((X - profile["scale_mean"]) / profile["scale_std"]) @ profile["coef"] + profile["intercept"]
+    prob = 1.0 / (1.0 + np.exp(-logit))
+    data[TARGET] = (rng.random(n) < prob).astype(np.int8)
+    return pd.DataFrame(data, columns=profile["columns"] + [TARGET])
+
+
+def segment_profiles(profile: dict, values, seed: int = 0) -> list:
+    """[(value, profile)] with one perturbed label model per segment value."""
+    rng = np.random.default_rng([seed, len(values), 7919])
+    out = []
+    for value in values:
+        scale = rng.uniform(1 - SEGMENT_COEF_SPREAD, 1 + SEGMENT_COEF_SPREAD, len(profile["coef"]))
+        out.append((value, {
+            **profile,
+            "intercept": profile["intercept"] + rng.normal(0, SEGMENT_SHIFT),
+            "coef": profile["coef"] * scale,
+        }))
+    return out
+
+
+def generate_segmented(segments: list, column: str, n: int, seed: int = 0, offset: int = 0) -> pd.DataFrame:
+    """``n`` rows spread evenly over ``segments`` (from segment_profiles),
+    with the segment value in ``column``, in random order."""
+    rng = np.random.default_rng([seed, offset, len(segments)])
+    counts = np.bincount(rng.integers(0, len(segments), n), minlength=len(segments))
+    parts = []
+    for k, ((value, profile), count) in enumerate(zip(segments, counts)):
+        part = generate(profile, int(count), seed, offset * len(segments) + k)
+        part.insert(len(part.columns) - 1, column, value)
+        parts.append(part)
+    df = pd.concat(parts, ignore_index=True)
+    return df.iloc[rng.permutation(len(df))].reset_index(drop=True)
+
+
+def iter_chunks(profile: dict, rows: int, seed: int = 0, chunk_rows: int = CHUNK_ROWS, segments: tuple = None):
+    """Chunks of ``rows`` rows; ``segments`` is (column, values) or None."""
+    if segments:
+        column, values = segments
+        seg_profiles = segment_profiles(profile, values, seed)
+    for i, start in enumerate(range(0, rows, chunk_rows)):
+        n = min(chunk_rows, rows - start)
+        yield generate_segmented(seg_profiles, column, n, seed, i) if segments else generate(profile, n, seed, i)
+
+
+def write_csv(path: str, rows: int, seed: int = 0, profile: dict = None, chunk_rows: int = CHUNK_ROWS,
+              segments: tuple = None) -> dict:
+    """Stream ``rows`` synthetic rows to ``path``; returns a small report.
+    ``segments`` is (column, values), e.g. ("fakultas", ["FTI", "FEB"])."""
+    profile = profile or load_profile()
+    tmp = f"{path}.{os.getpid()}.tmp"
+    positives = 0
+    with open(tmp, "w", newline="", encoding="utf-8") as f:
+        for i, chunk in enumerate(iter_chunks(profile, rows, seed, chunk_rows, segments)):
+            chunk.to_csv(f, index=False, header=i == 0)
+            positives += int(chunk[TARGET].sum())
+    os.replace(tmp, path)
+    report = {
+        "path": path,
+        "rows": rows,
+        "seed": seed,
+        "positive_rate": round(positives / rows, 4) if rows else None,
+        "source_positive_rate": round(profile["positive_rate"], 4),
+        "file_bytes": os.path.getsize(path),
+    }
+    if segments:
+        report["segments"] = {"column": segments[0], "values": list(segments[1])}
+    return report
@@ -0,0 +1,4 @@
+-- latest prediction per student (DISTINCT ON (nim) ... ORDER BY nim, timestamp DESC)
+-- is read straight from this index by the re-scoring job (Postgres)
+CREATE INDEX IF NOT EXISTS ix_predictions_nim_timestamp
+  ON predictions (nim, timestamp DESC);
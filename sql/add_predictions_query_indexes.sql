@@ -0,0 +1,9 @@
+-- keyset pagination of the dashboards (prediction_repository.query_predictions):
+-- ORDER BY timestamp, id with WHERE (timestamp, id) < (:ts, :id) reads one
+-- page straight from this index, at any depth
+CREATE INDEX IF NOT EXISTS ix_predictions_timestamp_id
+  ON predictions (timestamp, id);
+
+-- mahasiswa dashboard: history of the logged-in user
+CREATE INDEX IF NOT EXISTS ix_predictions_username
+  ON predictions (username);
@@ -0,0 +1,5 @@
+-- record which model version produced each prediction (Postgres)
+ALTER TABLE predictions
+  ADD COLUMN IF NOT EXISTS model_version VARCHAR(64);
+
+CREATE INDEX IF NOT EXISTS ix_predictions_model_version ON predictions(model_version);
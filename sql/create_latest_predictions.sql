@@ -0,0 +1,17 @@
+-- newest prediction per student (nim), maintained by prediction_repository
+-- on every insert/delete; fill it once with
+--   python scripts/backfill_latest_predictions.py
+CREATE TABLE IF NOT EXISTS latest_predictions (
+  nim VARCHAR(50) PRIMARY KEY,
+  prediction_id VARCHAR(36) NOT NULL REFERENCES predictions (id) ON DELETE CASCADE,
+  username VARCHAR(50),
+  risk VARCHAR(20),
+  probability NUMERIC(5, 2),
+  timestamp TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS ix_latest_predictions_username
+  ON latest_predictions (username);
+
+CREATE INDEX IF NOT EXISTS ix_latest_predictions_risk
+  ON latest_predictions (risk);
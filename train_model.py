@@ -3,6 +3,9 @@ warnings.filterwarnings("ignore")
 
 import os
 import json
+import time
+import argparse
+import numpy as np
 import pandas as pd
 
 from joblib import dump
@@ -27,6 +30,14 @@ DATA_PATH = "dataset_kelulusan_mahasiswa.csv"
 OUTPUT_MODEL = "model_kelulusan.joblib"
 SUMMARY_JSON = "train_summary_80_10_10_sigmoid.json"
 
+# ruang pencarian --search warm: 16 jumlah pohon x 9 kombinasi lain = 144
+# kandidat; satu hutan per (kombinasi, fold) ditumbuhkan bertahap (warm_start)
+WARM_PARAM_GRID = {
+    "clf__n_estimators": list(range(25, 401, 25)),
+    "clf__max_depth": [8, 10, 12],
+    "clf__min_samples_leaf": [3, 5, 8]
+}
+
 # ⚠️ HARUS SAMA DENGAN DATASET & PREDICTION_SERVICE
 FEATURES = [
     "ipk",
@@ -52,14 +63,30 @@ def prepare_features(df):
     if missing:
         raise KeyError(f"Missing required columns: {missing}")
 
-    X = df[FEATURES].copy()
+    # to_numeric hands numeric columns (dataset cache) back without a copy
+    X = pd.DataFrame({col: pd.to_numeric(df[col], errors="coerce") for col in FEATURES}, copy=False)
     y = df[TARGET].astype(int)
 
-    for col in FEATURES:
-        X[col] = pd.to_numeric(X[col], errors="coerce")
-
     return X, y
 
+
+def split_codes(y):
+    """0 = train, 1 = val, 2 = test per row: the same stratified 80/10/10
+    partition fit_in_memory gets from train_test_split (it depends only on
+    y and RANDOM_STATE)."""
+    idx = np.arange(len(y))
+    idx_tmp, idx_test = train_test_split(idx, test_size=0.10, stratify=y, random_state=RANDOM_STATE)
+    _, idx_val = train_test_split(
+        idx_tmp,
+        test_size=0.10 / 0.90,
+        stratify=np.asarray(y)[idx_tmp],
+        random_state=RANDOM_STATE
+    )
+    codes = np.zeros(len(y), dtype=np.int8)
+    codes[idx_val] = 1
+    codes[idx_test] = 2
+    return codes
+
 # ======================================================
 # PIPELINE — RANDOM FOREST
 # ======================================================
@@ -94,12 +121,132 @@ def evaluate(model, X, y, label):
     return {"accuracy": acc, "roc_auc": auc}
 
 # ======================================================
-# MAIN TRAINING FLOW
+# CLI
+# ======================================================
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Train model prediksi kelulusan")
+    parser.add_argument(
+        "--export-grid",
+        action="store_true",
+        help="simpan tabel probabilitas (grid) di samping model untuk lookup O(1)"
+    )
+    parser.add_argument(
+        "--no-register",
+        action="store_true",
+        help="jangan salin model ke model registry"
+    )
+    parser.add_argument(
+        "--no-activate",
+        action="store_true",
+        help="daftarkan ke registry tanpa menjadikannya versi aktif"
+    )
+    parser.add_argument(
+        "--search",
+        choices=["random", "warm"],
+        default="random",
+        help="random: RandomizedSearchCV 10 kandidat; warm: grid 144 kandidat dengan warm_start + cache fold"
+    )
+    parser.add_argument(
+        "--search-jobs",
+        type=int,
+        default=-1,
+        help="jumlah proses paralel untuk --search warm (default: semua CPU)"
+    )
+    parser.add_argument(
+        "--no-dataset-cache",
+        action="store_true",
+        help="parse CSV langsung tanpa cache kolom biner (.dataset_cache)"
+    )
+    parser.add_argument(
+        "--out-of-core",
+        action="store_true",
+        help="baca dataset per chunk (CSV/DB besar) dan bangun forest bertahap, tanpa hyperparameter search"
+    )
+    parser.add_argument(
+        "--source",
+        default=DATA_PATH,
+        help="--out-of-core: path CSV atau URL database (default: dataset_kelulusan_mahasiswa.csv)"
+    )
+    parser.add_argument(
+        "--table",
+        help="--out-of-core dengan URL database: nama tabel atau query SELECT"
+    )
+    parser.add_argument(
+        "--chunk-rows",
+        type=int,
+        help="--out-of-core: jumlah baris per chunk (default: TRAIN_CHUNK_ROWS atau 1.000.000)"
+    )
+    parser.add_argument(
+        "--trees",
+        type=int,
+        help="--out-of-core: jumlah pohon (default: n_estimators dari build_pipeline)"
+    )
+    parser.add_argument(
+        "--compress",
+        action="store_true",
+        help="cari sub-forest dan model distilasi terkecil dalam toleransi (laporan saja tanpa budget)"
+    )
+    parser.add_argument(
+        "--latency-budget-us",
+        type=float,
+        help="budget latensi p99 satu baris (mikrodetik); model terkecil yang memenuhi dipakai"
+    )
+    parser.add_argument(
+        "--size-budget-kb",
+        type=float,
+        help="budget ukuran artefak compact (KB); model terkecil yang memenuhi dipakai"
+    )
+    parser.add_argument(
+        "--auc-tolerance",
+        type=float,
+        default=0.005,
+        help="penurunan ROC AUC validasi maksimum terhadap model penuh (default: 0.005)"
+    )
+    parser.add_argument(
+        "--brier-tolerance",
+        type=float,
+        default=0.005,
+        help="kenaikan Brier score validasi maksimum terhadap model penuh (default: 0.005)"
+    )
+    parser.add_argument(
+        "--segment-by",
+        choices=["fakultas", "prodi", "angkatan"],
+        help="latih juga satu model per segmen (kolom dataset) secara paralel; prediksi memakai model segmen, fallback ke global"
+    )
+    parser.add_argument(
+        "--segment-jobs",
+        type=int,
+        default=-1,
+        help="jumlah proses paralel untuk --segment-by (default: semua CPU)"
+    )
+    parser.add_argument(
+        "--segment-min-rows",
+        type=int,
+        help="jumlah baris minimum agar segmen mendapat model sendiri (default: SEGMENT_MIN_ROWS atau 200)"
+    )
+    parser.add_argument(
+        "--rescore",
+        action="store_true",
+        help="jalankan re-scoring semua mahasiswa di background setelah training"
+    )
+    args = parser.parse_args(argv)
+    if args.segment_by and args.out_of_core:
+        parser.error("--segment-by hanya untuk training in-memory")
+    return args
+
 # ======================================================
-def main():
+# FIT — IN MEMORY (DEFAULT)
+# ======================================================
+def fit_in_memory(args):
+    """Split in memory, search hyperparameters, return the best pipeline."""
     print("Loading dataset...")
-    df = load_data(DATA_PATH)
+    from services.dataset_cache import DATASET_CACHE_DIR, load_dataset
+
+    df, dataset_report = load_dataset(DATA_PATH, None if args.no_dataset_cache else DATASET_CACHE_DIR)
     X, y = prepare_features(df)
+    print(f"Dataset: {len(X):,} baris, cache: {dataset_report['cache']}"
+          + (f", load {dataset_report['columnar']['hash_seconds'] + dataset_report['columnar']['load_seconds']:.3f} s"
+             f" vs CSV {dataset_report['csv']['parse_seconds']:.3f} s" if "columnar" in dataset_report else ""))
 
     # -----------------------
     # SPLIT 80 / 10 / 10
@@ -132,21 +279,98 @@ def main():
     }
 
     print("\nTraining + Hyperparameter Search...")
-    rs = RandomizedSearchCV(
-        pipe,
-        param_distributions=param_dist,
-        n_iter=10,
-        scoring="roc_auc",
-        cv=4,
-        random_state=RANDOM_STATE,
-        n_jobs=-1,
-        verbose=1
-    )
+    t_search = time.perf_counter()
+    if args.search == "warm":
+        from services.hyperparam_search import WarmStartSearch
+
+        rs = WarmStartSearch(
+            pipe,
+            param_grid=WARM_PARAM_GRID,
+            cv=4,
+            n_jobs=args.search_jobs
+        )
+    else:
+        rs = RandomizedSearchCV(
+            pipe,
+            param_distributions=param_dist,
+            n_iter=10,
+            scoring="roc_auc",
+            cv=4,
+            random_state=RANDOM_STATE,
+            n_jobs=-1,
+            verbose=1
+        )
 
     rs.fit(X_train, y_train)
-    best_model = rs.best_estimator_
+
+    search_report = getattr(rs, "report_", None) or {
+        "mode": "random",
+        "candidates": len(rs.cv_results_["params"]),
+        "folds": 4,
+        "wall_seconds": round(time.perf_counter() - t_search, 2),
+        "best_score": round(float(rs.best_score_), 6)
+    }
 
     print("Best params:", rs.best_params_)
+    print(
+        f"Search: {search_report['candidates']} kandidat dalam {search_report['wall_seconds']} s"
+        + (f", CPU {search_report['cpu_seconds']} s (utilisasi {search_report['cpu_utilization']:.0%})"
+           if "cpu_seconds" in search_report else "")
+    )
+
+    info = {"best_params": rs.best_params_, "search": search_report, "dataset": dataset_report}
+    return rs.best_estimator_, X_train, (X_val, y_val), (X_test, y_test), info
+
+# ======================================================
+# FIT — OUT OF CORE (DATASET BESAR)
+# ======================================================
+def fit_out_of_core(args):
+    """Stream the source in chunks and grow the forest chunk by chunk
+    (services/chunked_training.py); no hyperparameter search."""
+    from services.chunked_training import CHUNK_ROWS, train_out_of_core
+
+    pipe = build_pipeline()
+    chunk_rows = args.chunk_rows or CHUNK_ROWS
+    print(f"Streaming {args.source} in chunks of {chunk_rows:,} rows...")
+    best_model, splits, report = train_out_of_core(
+        args.source,
+        FEATURES,
+        TARGET,
+        pipe,
+        n_estimators=args.trees,
+        chunk_rows=chunk_rows,
+        table=args.table,
+        seed=RANDOM_STATE
+    )
+
+    rows = report["split_rows"]
+    print(f"Rows: {report['rows']:,} -> Train: {rows['train']:,}, Val: {rows['val']:,}, Test: {rows['test']:,}")
+    print(
+        f"Forest: {report['trees']} trees over {report['fit_chunks']} chunks, "
+        f"ingest {report['ingest_seconds']} s, fit {report['fit_seconds']} s, peak RSS {report['peak_rss_mb']} MB"
+    )
+
+    as_frame = lambda X: pd.DataFrame(X, columns=FEATURES).astype(float)
+    X_val, y_val = splits["val"]
+    X_test, y_test = splits["test"]
+    params = {k: v for k, v in pipe.get_params().items() if k in ("clf__max_depth", "clf__min_samples_leaf")}
+    info = {
+        "best_params": {**params, "clf__n_estimators": report["trees"]},
+        "out_of_core": report
+    }
+    return (best_model, as_frame(splits["train_sample"]), (as_frame(X_val), pd.Series(y_val)),
+            (as_frame(X_test), pd.Series(y_test)), info)
+
+# ======================================================
+# MAIN TRAINING FLOW
+# ======================================================
+def main(argv=None):
+    args = parse_args(argv)
+
+    if args.out_of_core:
+        best_model, X_train, (X_val, y_val), (X_test, y_test), fit_info = fit_out_of_core(args)
+    else:
+        best_model, X_train, (X_val, y_val), (X_test, y_test), fit_info = fit_in_memory(args)
 
     # -----------------------
     # VALIDATION (UNCALIBRATED)
@@ -171,34 +395,187 @@ def main():
     print("\nFinal Test Evaluation")
     test_cal = evaluate(calibrated, X_test, y_test, "TEST-Calibrated")
 
+    # -----------------------
+    # COMPRESSION (OPSIONAL)
+    # -----------------------
+    compression_report = None
+    if args.compress or args.latency_budget_us or args.size_budget_kb:
+        from services.model_compression import compress, print_report
+
+        print("\nSearching smaller models (sub-forest, distilled)...")
+        compressed, compression_report = compress(
+            calibrated,
+            best_model,
+            (X_val, y_val),
+            (X_test, y_test),
+            X_train,
+            latency_budget_us=args.latency_budget_us,
+            size_budget_bytes=int(args.size_budget_kb * 1000) if args.size_budget_kb else None,
+            auc_tolerance=args.auc_tolerance,
+            brier_tolerance=args.brier_tolerance,
+            random_state=RANDOM_STATE
+        )
+        print_report(compression_report)
+        if compressed is not None:
+            calibrated = compressed
+            print(f"\nFinal Test Evaluation ({compression_report['selected']})")
+            test_cal = evaluate(calibrated, X_test, y_test, "TEST-Calibrated")
+
     # -----------------------
     # SAVE MODEL
     # -----------------------
-    dump(calibrated, OUTPUT_MODEL)
+    # written next to OUTPUT_MODEL and moved over it (os.replace) only after
+    # the grid, segment and compact artifacts exist: a loader polling
+    # MODEL_PATH never reads a half-written pickle nor swaps to a model
+    # whose side artifacts are still missing
+    staged_model = f"{OUTPUT_MODEL}.{os.getpid()}.tmp"
+    dump(calibrated, staged_model)
+
+    # -----------------------
+    # LOOKUP GRID (OPSIONAL)
+    # -----------------------
+    from services.model_loader import artifact_version
+    model_version = artifact_version(staged_model)
+
+    grid_report = None
+    if args.export_grid:
+        from services.grid_lookup import export_grid, print_report
+
+        print("\nBuilding probability grid...")
+        grid_report = export_grid(calibrated, OUTPUT_MODEL, model_version)
+        print_report(grid_report)
+
+    # -----------------------
+    # SEGMENT MODELS (OPSIONAL)
+    # -----------------------
+    from services.segment_models import segments_dir_for
+
+    segment_report = None
+    if args.segment_by:
+        from services.dataset_cache import DATASET_CACHE_DIR, load_dataset
+        from services.segment_training import SEGMENT_MIN_ROWS, print_report as print_segments, train_segments
+
+        df, _ = load_dataset(DATA_PATH, None if args.no_dataset_cache else DATASET_CACHE_DIR)
+        if args.segment_by not in df.columns:
+            raise KeyError(f"Dataset has no '{args.segment_by}' column to segment by")
+        X_all, y_all = prepare_features(df)
+
+        print(f"\nTraining one model per {args.segment_by}...")
+        segment_report = train_segments(
+            X_all,
+            y_all,
+            split_codes(y_all),
+            df[args.segment_by],
+            build_pipeline().set_params(**fit_info["best_params"]),
+            OUTPUT_MODEL,
+            calibrated,
+            model_version,
+            args.segment_by,
+            n_jobs=args.segment_jobs,
+            min_rows=args.segment_min_rows or SEGMENT_MIN_ROWS
+        )
+        print_segments(segment_report)
+    elif os.path.isdir(segments_dir_for(OUTPUT_MODEL)):
+        # segment models of the previous model no longer match
+        import shutil
+
+        shutil.rmtree(segments_dir_for(OUTPUT_MODEL))
+
+    # -----------------------
+    # COMPACT ARTIFACT
+    # -----------------------
+    from services.compact_model import compact_path_for, export_compact, sample_inputs, validate_compact
+    from services.inference_engine import compile_model
+
+    compiled = compile_model(calibrated)
+    compact_report = export_compact(
+        compiled,
+        compact_path_for(OUTPUT_MODEL),
+        model_version,
+        source=os.path.basename(OUTPUT_MODEL)
+    )
+    X_check = pd.concat([
+        X_test,
+        pd.DataFrame(sample_inputs(FEATURES, 20000), columns=FEATURES)
+    ])[list(compiled.feature_names)].to_numpy(dtype=float)
+    compact_report["validation"] = validate_compact(calibrated, compact_report["path"], X_check)
+    print(
+        f"\nCompact model saved to: {compact_report['path']} "
+        f"({compact_report['file_bytes'] / 1e3:.0f} KB vs {os.path.getsize(staged_model) / 1e3:.0f} KB joblib, "
+        f"parity: {'exact' if compact_report['validation']['exact'] else 'MISMATCH'})"
+    )
+    if not compact_report["validation"]["exact"]:
+        # loader only picks up exact exports; keep serving the joblib model
+        os.remove(compact_report["path"])
+        print("Compact model removed: predictions differ from the joblib model")
+
+    os.replace(staged_model, OUTPUT_MODEL)
     print(f"\nModel saved to: {OUTPUT_MODEL}")
 
     # -----------------------
     # SAVE SUMMARY
     # -----------------------
+    from services.chunked_training import peak_rss_mb
+
     summary = {
         "algorithm": "RandomForestClassifier + Sigmoid Calibration",
         "features": FEATURES,
         "target": TARGET,
         "split": {"train": 0.8, "val": 0.1, "test": 0.1},
-        "best_params": rs.best_params_,
+        **fit_info,
         "metrics": {
             "val_uncalibrated": val_uncal,
             "val_calibrated": val_cal,
             "test_calibrated": test_cal
         },
-        "model_path": OUTPUT_MODEL
+        "peak_rss_mb": peak_rss_mb(),
+        "model_path": OUTPUT_MODEL,
+        "model_version": model_version
     }
+    if compression_report is not None:
+        summary["compression"] = compression_report
+    if grid_report is not None:
+        summary["grid"] = grid_report
+    if segment_report is not None:
+        summary["segments"] = segment_report
+    summary["compact"] = compact_report
 
     with open(SUMMARY_JSON, "w") as f:
         json.dump(summary, f, indent=2)
 
     print(f"Summary saved to: {SUMMARY_JSON}")
 
+    # -----------------------
+    # MODEL REGISTRY
+    # -----------------------
+    if not args.no_register:
+        from services import model_registry
+
+        version = model_registry.publish(
+            OUTPUT_MODEL,
+            SUMMARY_JSON,
+            activate_now=not args.no_activate
+        )
+        state = "active" if not args.no_activate else "registered"
+        print(f"Registry: {model_registry.version_dir(version)} ({state})")
+
+    # -----------------------
+    # RE-SCORING (BACKGROUND)
+    # -----------------------
+    if args.rescore:
+        import subprocess
+        import sys
+
+        log_path = f"rescore_{model_version}.log"
+        with open(log_path, "ab") as log:
+            proc = subprocess.Popen(
+                [sys.executable, os.path.join("scripts", "rescore_predictions.py"), "--model", OUTPUT_MODEL],
+                stdout=log,
+                stderr=subprocess.STDOUT,
+                start_new_session=True,
+            )
+        print(f"Re-scoring started in background (pid {proc.pid}), log: {log_path}")
+
 # ======================================================
 # ENTRY POINT
 # ======================================================